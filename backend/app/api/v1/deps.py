@@ -1,9 +1,12 @@
 """API dependencies."""
 
-from typing import Generator
+from typing import Callable, Generator, Optional
+from fastapi import Header, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.profiling import token_matches
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -17,4 +20,31 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_session_factory() -> Callable[[], Session]:
+    """
+    Dependency to get a factory for database sessions.
+    
+    Used by long-lived connections that run several operations at once,
+    each of which needs its own session.
+    
+    Returns:
+        Callable returning a new database session
+    """
+    return SessionLocal
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency restricting an endpoint to holders of ``ADMIN_TOKEN``.
+    
+    Raises:
+        HTTPException: 404 when no admin token is configured, 403 when the
+            ``X-Admin-Token`` header does not match it
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not token_matches(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,95 @@
+"""Admin API endpoints."""
+
+import logging
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_db, require_admin
+from app.core.profiling import profile_store
+from app.schemas.admin import ProfileInfo, TranscriptionCacheStats
+from app.services.transcription_cache import TranscriptionCache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get(
+    "/profiles",
+    response_model=List[ProfileInfo],
+    status_code=status.HTTP_200_OK,
+    summary="List request profiles",
+    description="List stored request profiles, newest first"
+)
+async def list_profiles() -> List[ProfileInfo]:
+    """
+    List stored request profiles.
+    
+    Profiles are recorded for requests sent with an ``X-Profile`` header
+    (or ``profile`` query parameter) holding the admin token; the name of
+    each is returned in that request's ``X-Profile-ID`` header.
+    
+    Returns:
+        Stored profiles, newest first
+    """
+    return [ProfileInfo(**profile) for profile in profile_store.list()]
+
+
+@router.get(
+    "/profiles/{name}",
+    status_code=status.HTTP_200_OK,
+    summary="Download a request profile",
+    description="Download a stored profile in speedscope format",
+    response_class=FileResponse
+)
+async def download_profile(name: str) -> FileResponse:
+    """
+    Download a stored request profile.
+    
+    The file opens directly in https://www.speedscope.app.
+    
+    Args:
+        name: Profile name as listed or returned in ``X-Profile-ID``
+        
+    Returns:
+        FileResponse with the speedscope JSON
+        
+    Raises:
+        HTTPException: If the profile does not exist
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {name} not found"
+        )
+    
+    return FileResponse(path, media_type="application/json", filename=name)
+
+
+
+@router.get(
+    "/transcription-cache",
+    response_model=TranscriptionCacheStats,
+    status_code=status.HTTP_200_OK,
+    summary="Transcription cache statistics",
+    description="Hit rate and transcription time saved by the transcription cache"
+)
+async def transcription_cache_stats(db: Session = Depends(get_db)) -> TranscriptionCacheStats:
+    """
+    Report how much transcription work the cache has avoided.
+    
+    Counts are kept with the cached transcripts, so they cover every
+    worker process since the cache was created. Live per-process rates are
+    exported as ``cache_requests_total{cache="transcription"}`` and
+    ``transcription_cache_saved_seconds_total``.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        TranscriptionCacheStats
+    """
+    return TranscriptionCache(db).stats()
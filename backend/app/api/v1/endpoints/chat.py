@@ -2,10 +2,12 @@
 
 import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.v1.deps import get_db
+from app.core.caching import make_etag, etag_matches, set_cache_headers, not_modified
+from app.core.responses import ORJSONResponse
 from app.schemas.chat import ChatHistoryResponse
 from app.services.chat import ChatService
 
@@ -25,19 +27,29 @@ async def get_chat_history(
     session_id: Optional[str] = Query(None, description="Session ID to filter by"),
     limit: int = Query(50, ge=1, le=200, description="Number of messages to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-) -> ChatHistoryResponse:
+) -> Response:
     """
     Retrieve chat history with optional filtering by session.
     
+    The response carries an ETag derived from the session's version
+    counter, so polls that send it back in ``If-None-Match`` get a 304
+    before any message rows are loaded.
+    
+    The service builds the response from trusted database rows once, so it
+    is serialized directly instead of being validated again against
+    ``response_model``.
+    
     Args:
         session_id: Optional session ID to filter messages
         limit: Maximum number of messages to return
         offset: Pagination offset
+        if_none_match: ETag from a previous response
         db: Database session
         
     Returns:
-        ChatHistoryResponse with messages and metadata
+        ChatHistoryResponse with messages and metadata, or 304 Not Modified
         
     Raises:
         HTTPException: If retrieval fails
@@ -45,16 +57,27 @@ async def get_chat_history(
     try:
         service = ChatService(db)
         
+        etag = None
+        resolved = service.get_session_version(session_id)
+        if resolved:
+            session_id, version = resolved
+            etag = make_etag(session_id, version, limit, offset)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
         response = service.get_chat_history(
             session_id=session_id,
             limit=limit,
             offset=offset
         )
         
-        return response
+        result = ORJSONResponse(response)
+        if etag:
+            set_cache_headers(result, etag)
+        return result
         
     except Exception as e:
-        logger.error(f"Error retrieving chat history: {e}")
+        logger.error("Error retrieving chat history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve chat history: {str(e)}"
@@ -69,23 +92,42 @@ async def get_chat_history(
 )
 async def get_session_summary(
     session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> dict:
     """
     Get summary statistics for a session.
     
+    Supports conditional GET with the same version-based ETag scheme as
+    chat history.
+    
     Args:
         session_id: Session ID
+        response: Response used to set caching headers
+        if_none_match: ETag from a previous response
         db: Database session
         
     Returns:
-        Dictionary with session statistics
+        Dictionary with session statistics, or 304 Not Modified
         
     Raises:
         HTTPException: If session not found
     """
     try:
         service = ChatService(db)
+        
+        resolved = service.get_session_version(session_id)
+        if not resolved:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Session {session_id} not found"
+            )
+        
+        etag = make_etag(session_id, resolved[1], "summary")
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
         summary = service.get_session_summary(session_id)
         
         if not summary.get("exists"):
@@ -94,12 +136,13 @@ async def get_session_summary(
                 detail=f"Session {session_id} not found"
             )
         
+        set_cache_headers(response, etag)
         return summary
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting session summary: {e}")
+        logger.error("Error getting session summary: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get session summary: {str(e)}"
@@ -139,7 +182,7 @@ async def clear_session_history(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error clearing session history: {e}")
+        logger.error("Error clearing session history: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to clear session history: {str(e)}"
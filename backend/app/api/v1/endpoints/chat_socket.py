@@ -0,0 +1,59 @@
+"""Chat WebSocket endpoint."""
+
+import logging
+from typing import Callable
+
+from fastapi import APIRouter, Depends, WebSocket
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_session_factory
+from app.core.config import settings
+from app.services.chat import ChatService
+from app.services.chat_channel import ChatChannel
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["chat"])
+
+
+@router.websocket("/ws/chat/{session_id}")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: str,
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+) -> None:
+    """
+    Persistent chat channel for logging meals.
+    
+    Clients send ``{"type": "meal", "id": "...", "message": "..."}`` frames
+    and receive ``progress``, ``result`` and ``intake`` frames tagged with
+    the same ``id``. Several meals can be in flight at once, each charged
+    to the ``/api/analyze-meal`` rate limit. The session is created if it
+    does not exist yet.
+    
+    Args:
+        websocket: WebSocket connection
+        session_id: Session to log meals to
+        session_factory: Factory for per-analysis database sessions
+    """
+    await websocket.accept()
+    
+    db = session_factory()
+    try:
+        session_id = ChatService(db).get_or_create_session(session_id)
+    finally:
+        db.close()
+    
+    channel = ChatChannel(
+        websocket,
+        session_factory,
+        session_id,
+        max_concurrent=settings.WS_MAX_CONCURRENT_ANALYSES,
+        max_pending=settings.WS_MAX_PENDING_MESSAGES,
+        send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+        heartbeat_interval=settings.WS_HEARTBEAT_SECONDS,
+        idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+        rate_limit=getattr(websocket.state, "rate_limit", None)
+    )
+    await channel.run()
+    logger.info("Chat socket closed for session %s", session_id)
@@ -0,0 +1,65 @@
+"""History export API endpoints."""
+
+import logging
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_db
+from app.services.export import ExportService, EXPORT_FORMATS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["export"])
+
+
+@router.get(
+    "/export/{session_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Export session history",
+    description="Stream a session's full history with nutrition and food items as NDJSON or CSV",
+    response_class=StreamingResponse
+)
+async def export_session(
+    session_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format"),
+    compress: bool = Query(False, description="Gzip the export on the fly"),
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Stream a session's history.
+    
+    Rows are read through a server-side cursor and written out as they
+    arrive, so memory use does not grow with the size of the history.
+    
+    Args:
+        session_id: Session ID to export
+        export_format: ``ndjson`` (one message per line) or ``csv`` (one food item per row)
+        compress: Whether to gzip the output
+        db: Database session
+        
+    Returns:
+        StreamingResponse with the exported history
+        
+    Raises:
+        HTTPException: If the session is not found
+    """
+    service = ExportService(db)
+    
+    if not service.session_exists(session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session {session_id} not found"
+        )
+    
+    filename = f"cal-ai-{session_id}.{export_format}"
+    media_type = EXPORT_FORMATS[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    
+    return StreamingResponse(
+        service.stream(session_id, export_format, compress=compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,105 @@
+"""Food suggestion API endpoints."""
+
+import logging
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_db
+from app.core.responses import ORJSONResponse
+from app.schemas.food import FrequentFoodsResponse, FoodRelogRequest
+from app.schemas.meal import MealAnalysisResponse
+from app.services.food_frequency import food_frequency_tracker
+from app.services.meal_analysis import MealAnalysisService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["food"])
+
+
+@router.get(
+    "/foods/frequent",
+    response_model=FrequentFoodsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get frequent and recent foods",
+    description="Get the most frequently and most recently logged foods for a session"
+)
+async def get_frequent_foods(
+    session_id: str = Query(..., description="Session ID"),
+    limit: int = Query(10, ge=1, le=50, description="Number of foods to return per list"),
+    db: Session = Depends(get_db)
+) -> FrequentFoodsResponse:
+    """
+    Get frequent and recent foods for one-tap re-logging.
+    
+    Args:
+        session_id: Session ID
+        limit: Maximum number of foods per list
+        db: Database session
+        
+    Returns:
+        FrequentFoodsResponse with frequent and recent foods
+        
+    Raises:
+        HTTPException: If retrieval fails
+    """
+    try:
+        food_frequency_tracker.ensure_loaded(db, session_id)
+        
+        return FrequentFoodsResponse(
+            session_id=session_id,
+            frequent=food_frequency_tracker.get_frequent(session_id, limit),
+            recent=food_frequency_tracker.get_recent(session_id, limit)
+        )
+        
+    except Exception as e:
+        logger.error("Error retrieving frequent foods: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve frequent foods: {str(e)}"
+        )
+
+
+@router.post(
+    "/foods/relog",
+    response_model=MealAnalysisResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Log previous foods again",
+    description="Log previously recorded foods again using their stored nutrition, without AI analysis"
+)
+async def relog_foods(
+    request: FoodRelogRequest,
+    db: Session = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Log previously recorded foods again.
+    
+    Args:
+        request: Relog request with session and food item IDs
+        db: Database session
+        
+    Returns:
+        MealAnalysisResponse for the newly logged meal
+        
+    Raises:
+        HTTPException: If the foods are not found or logging fails
+    """
+    try:
+        service = MealAnalysisService(db)
+        
+        return ORJSONResponse(service.relog_foods(
+            session_id=request.session_id,
+            food_item_ids=request.food_item_ids,
+            language=request.language
+        ))
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Error relogging foods: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to relog foods: {str(e)}"
+        )
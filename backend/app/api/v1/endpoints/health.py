@@ -73,7 +73,7 @@ async def database_health_check(
         )
         
     except Exception as e:
-        logger.error(f"Database health check failed: {e}")
+        logger.error("Database health check failed: %s", e)
         return HealthCheck(
             status="unhealthy",
             version=settings.APP_VERSION,
@@ -0,0 +1,110 @@
+"""History import API endpoints."""
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_db
+from app.core.config import settings
+from app.schemas.history_import import ImportProgress
+from app.services.history_import import HistoryImportService, IMPORT_FORMATS, MISSING_NUTRITION_MODES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["import"])
+
+
+@router.post(
+    "/import",
+    response_model=ImportProgress,
+    status_code=status.HTTP_200_OK,
+    summary="Import meal history",
+    description="Bulk import meal logs from CSV, JSON array or NDJSON files exported by other trackers"
+)
+async def import_history(
+    file: UploadFile = File(..., description="CSV or JSON file with meal logs"),
+    session_id: Optional[str] = Form(None, description="Session to import into; created if missing"),
+    file_format: Optional[str] = Form(None, alias="format", description="csv or json; detected from the filename if omitted"),
+    missing_nutrition: str = Form("skip", description="Foods without nutrition: skip, local or ai"),
+    language: str = Form("auto", description="Language preference for AI analysis"),
+    db: Session = Depends(get_db)
+) -> ImportProgress:
+    """
+    Import historical meals in bulk.
+    
+    Rows that already carry nutrition are inserted directly in batches
+    without any AI call. Rows without nutrition are skipped, matched against
+    previously stored foods (``local``) or analyzed by the AI (``ai``).
+    
+    Args:
+        file: Uploaded file
+        session_id: Optional session ID to import into
+        file_format: File format, detected from the extension if omitted
+        missing_nutrition: How to handle foods without nutrition
+        language: Language preference for AI analysis
+        db: Database session
+        
+    Returns:
+        ImportProgress summary of the finished import
+        
+    Raises:
+        HTTPException: If the file is invalid or the import fails
+    """
+    max_size_bytes = settings.IMPORT_MAX_FILE_MB * 1024 * 1024
+    if file.size is not None and file.size > max_size_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import file too large. Maximum size: {settings.IMPORT_MAX_FILE_MB}MB"
+        )
+    
+    if file_format is None:
+        extension = Path(file.filename or "").suffix.lower().lstrip(".")
+        file_format = "json" if extension in ("json", "ndjson", "jsonl") else extension
+    
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format. Supported formats: {', '.join(IMPORT_FORMATS)}"
+        )
+    if missing_nutrition not in MISSING_NUTRITION_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported missing_nutrition mode. Supported modes: {', '.join(MISSING_NUTRITION_MODES)}"
+        )
+    
+    try:
+        service = HistoryImportService(db)
+        session_id = await asyncio.to_thread(service.get_or_create_session, session_id)
+        
+        result = None
+        async for result in service.import_file(
+            file.file,
+            file_format=file_format,
+            session_id=session_id,
+            missing_nutrition=missing_nutrition,
+            language=language
+        ):
+            pass
+        
+        logger.info(
+            "Imported %d meals into %s (%.0f rows/s)",
+            result.meals_imported, session_id, result.rows_per_second
+        )
+        return result
+        
+    except (ValueError, UnicodeDecodeError) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid import file: {str(e)}"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error("Error importing history: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import history: {str(e)}"
+        )
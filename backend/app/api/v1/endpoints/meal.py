@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.v1.deps import get_db
+from app.core.responses import ORJSONResponse
 from app.schemas.meal import MealAnalysisRequest, MealAnalysisResponse
 from app.services.meal_analysis import MealAnalysisService
 
@@ -23,7 +24,7 @@ router = APIRouter(prefix="/api", tags=["meal"])
 async def analyze_meal(
     request: MealAnalysisRequest,
     db: Session = Depends(get_db)
-) -> MealAnalysisResponse:
+) -> ORJSONResponse:
     """
     Analyze a meal description and calculate nutrition information.
     
@@ -46,10 +47,10 @@ async def analyze_meal(
             language=request.language
         )
         
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
-        logger.error(f"Error analyzing meal: {e}")
+        logger.error("Error analyzing meal: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to analyze meal: {str(e)}"
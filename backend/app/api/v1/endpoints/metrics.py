@@ -0,0 +1,25 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    summary="Prometheus metrics",
+    description="Expose request, database, AI provider and cache metrics"
+)
+async def get_metrics() -> Response:
+    """
+    Prometheus scrape endpoint.
+    
+    Returns:
+        Metrics in the Prometheus text exposition format, aggregated
+        across workers when ``PROMETHEUS_MULTIPROC_DIR`` is set
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
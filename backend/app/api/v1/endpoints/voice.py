@@ -1,12 +1,22 @@
 """Voice processing API endpoints."""
 
+import asyncio
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import JSONResponse
+from typing import AsyncIterator, Callable, Optional
 
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_db, get_session_factory
 from app.schemas.voice import VoiceToTextResponse, VoiceProcessingError
+from app.services.audio_store import StagingFullError
+from app.services.meal_analysis import MealAnalysisService
 from app.services.voice import VoiceService
+from app.services.transcription import TranscriptionBusyError
 from app.core.config import settings
+from app.core.uploads import FileFieldStream, UploadTooLargeError, MULTIPART_OVERHEAD_BYTES
 
 logger = logging.getLogger(__name__)
 
@@ -20,62 +30,275 @@ router = APIRouter(prefix="/api", tags=["voice"])
     summary="Convert voice to text",
     description="Transcribe audio file to text for meal description",
     responses={
-        400: {"model": VoiceProcessingError, "description": "Invalid audio format or file too large"},
+        400: {"model": VoiceProcessingError, "description": "Invalid audio format"},
+        413: {"model": VoiceProcessingError, "description": "Audio file too large"},
+        503: {"model": VoiceProcessingError, "description": "Transcription queue or staging storage full"},
         500: {"description": "Internal server error"}
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["audio"],
+                        "properties": {
+                            "audio": {
+                                "type": "string",
+                                "format": "binary",
+                                "description": "Audio file to transcribe"
+                            }
+                        }
+                    }
+                }
+            }
+        }
     }
 )
 async def voice_to_text(
-    audio: UploadFile = File(..., description="Audio file to transcribe")
+    request: Request,
+    db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
 ) -> VoiceToTextResponse:
     """
     Convert audio file to text.
     
+    The multipart body is parsed as it arrives and the ``audio`` field is
+    streamed straight to staging storage. Uploads whose ``Content-Length``
+    is over the limit are rejected before any of the body is read, and
+    others are cut off as soon as they pass it. While staging storage is
+    over its quota the upload waits briefly for space, then gets a 503.
+    Audio is hashed on the way in, and a clip that was already transcribed
+    is answered from the transcription cache.
+    
     Args:
-        audio: Uploaded audio file
+        request: Request with a multipart ``audio`` file field
+        db: Database session for the transcription cache
+        session_factory: Factory for the session a new transcript is
+            stored with, which outlives the request's
         
     Returns:
         VoiceToTextResponse with transcribed text
         
     Raises:
-        HTTPException: If transcription fails or file is invalid
+        HTTPException: If transcription fails
     """
+    service = VoiceService(db, session_factory)
+    
     try:
-        service = VoiceService()
-        
-        # Validate file
-        if not audio.filename:
+        return await _transcribe_upload(request, service)
+    except Exception as e:
+        return _upload_error(e)
+
+
+async def _transcribe_upload(request: Request, service: VoiceService) -> VoiceToTextResponse:
+    """Stage the request's ``audio`` field, transcribe it and release it."""
+    staged = None
+    
+    try:
+        upload = FileFieldStream(
+            request,
+            "audio",
+            max_body_bytes=service.max_size_bytes + MULTIPART_OVERHEAD_BYTES
+        )
+        filename = await upload.start()
+        if not filename:
             raise ValueError("No filename provided")
         
+        staged = await service.stage_upload(upload, filename)
+        
         # Transcribe audio
-        result = await service.transcribe_audio(
-            audio_file=audio.file,
-            filename=audio.filename
+        return await service.transcribe_audio(staged)
+    
+    finally:
+        # Release the staged upload
+        if staged is not None:
+            service.release(staged)
+
+
+def _upload_error(e: Exception) -> JSONResponse:
+    """
+    Error response for a failed voice upload.
+    
+    Raises:
+        HTTPException: For unexpected errors
+    """
+    if isinstance(e, UploadTooLargeError):
+        logger.warning("Rejected oversized audio upload")
+        return _error_response(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "file_too_large",
+            f"Audio file too large. Maximum size: {settings.MAX_AUDIO_SIZE_MB}MB"
         )
+    
+    if isinstance(e, TranscriptionBusyError):
+        logger.warning("Rejected voice upload: %s", e)
+        return _error_response(status.HTTP_503_SERVICE_UNAVAILABLE, "busy", str(e))
+    
+    if isinstance(e, StagingFullError):
+        logger.warning("Rejected voice upload: %s", e)
+        return _error_response(status.HTTP_503_SERVICE_UNAVAILABLE, "storage_full", str(e))
+    
+    if isinstance(e, ValueError):
+        logger.warning("Invalid audio file: %s", e)
+        return _error_response(status.HTTP_400_BAD_REQUEST, "invalid_input", str(e))
+    
+    logger.error("Error processing audio: %s", e)
+    raise HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Failed to process audio: {str(e)}"
+    )
+
+
+def _error_response(status_code: int, error: str, message: str) -> JSONResponse:
+    error_response = VoiceProcessingError(
+        error=error,
+        message=message,
+        supported_formats=settings.SUPPORTED_AUDIO_FORMATS
+    )
+    return JSONResponse(status_code=status_code, content=error_response.model_dump())
+
+
+@router.post(
+    "/voice-meal",
+    status_code=status.HTTP_200_OK,
+    summary="Log a meal by voice",
+    description="Transcribe a spoken meal description and analyze it in one request, streaming NDJSON",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "Transcript line, then result or error line"},
+        400: {"model": VoiceProcessingError, "description": "Invalid audio format"},
+        413: {"model": VoiceProcessingError, "description": "Audio file too large"},
+        422: {"model": VoiceProcessingError, "description": "No speech recognized"},
+        503: {"model": VoiceProcessingError, "description": "Transcription queue or staging storage full"},
+        500: {"description": "Internal server error"}
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["audio"],
+                        "properties": {
+                            "audio": {
+                                "type": "string",
+                                "format": "binary",
+                                "description": "Recording of the meal description"
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def voice_meal(
+    request: Request,
+    session_id: Optional[str] = Query(None, description="Session ID for tracking"),
+    language: str = Query("auto", description="Language preference (auto, en, zh)"),
+    db: Session = Depends(get_db),
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+) -> StreamingResponse:
+    """
+    Transcribe a spoken meal and analyze it in one request.
+    
+    The upload is staged and transcribed exactly as by ``/voice-to-text``,
+    and failures up to that point get the same error responses. Once the
+    transcript is ready the response starts: its first NDJSON line is
+    ``{"type": "transcript", "data": VoiceToTextResponse}``, sent while the
+    meal is already being analyzed, and the second is ``{"type": "result",
+    "data": MealAnalysisResponse}`` or ``{"type": "error", "code": ...,
+    "message": ...}``. The transcript's language and confidence are given
+    to the analysis prompt.
+    
+    Args:
+        request: Request with a multipart ``audio`` file field
+        session_id: Session to log the meal to; a new one is started if omitted or unknown
+        language: Language preference for the reply
+        db: Database session for the transcription cache
+        session_factory: Factory for the analysis's database session,
+            which outlives the request's
         
-        return result
-        
-    except ValueError as e:
-        logger.warning(f"Invalid audio file: {e}")
-        error_response = VoiceProcessingError(
-            error="invalid_input",
-            message=str(e),
-            supported_formats=settings.SUPPORTED_AUDIO_FORMATS
-        )
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content=error_response.model_dump()
-        )
+    Returns:
+        StreamingResponse with the transcript and analysis lines
         
+    Raises:
+        HTTPException: If transcription fails
+    """
+    service = VoiceService(db, session_factory)
+    
+    try:
+        transcript = await _transcribe_upload(request, service)
     except Exception as e:
-        logger.error(f"Error processing audio: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process audio: {str(e)}"
+        return _upload_error(e)
+    
+    if not transcript.text.strip():
+        return _error_response(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "no_speech",
+            "No speech was recognized in the audio"
         )
     
+    return StreamingResponse(
+        _voice_meal_lines(transcript, session_factory, session_id, language),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _voice_meal_lines(
+    transcript: VoiceToTextResponse,
+    session_factory: Callable[[], Session],
+    session_id: Optional[str],
+    language: str
+) -> AsyncIterator[bytes]:
+    """Yield the transcript line, then the analysis result or error line."""
+    
+    async def analyze():
+        db = session_factory()
+        try:
+            return await MealAnalysisService(db).analyze_meal(
+                description=transcript.text,
+                session_id=session_id,
+                language=language,
+                transcript=transcript
+            )
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    # Analysis starts before the transcript is written to the client
+    analysis = asyncio.create_task(analyze())
+    try:
+        yield _ndjson_line("transcript", transcript)
+        
+        try:
+            response = await analysis
+        except Exception as e:
+            logger.error("Error analyzing voice meal: %s", e)
+            yield orjson.dumps({
+                "type": "error",
+                "code": "analysis_failed",
+                "message": f"Failed to analyze meal: {str(e)}"
+            }) + b"\n"
+            return
+        
+        yield _ndjson_line("result", response)
     finally:
-        # Close the uploaded file
-        await audio.close()
+        # The client went away before the result was sent
+        analysis.cancel()
+
+
+def _ndjson_line(line_type: str, model) -> bytes:
+    """A ``{"type": ..., "data": ...}`` line with the model serialized once."""
+    return (
+        b'{"type":' + orjson.dumps(line_type)
+        + b',"data":' + model.__pydantic_serializer__.to_json(model) + b"}\n"
+    )
 
 
 @router.get(
@@ -95,5 +318,5 @@ async def get_supported_formats() -> dict:
         "supported_formats": settings.SUPPORTED_AUDIO_FORMATS,
         "max_file_size_mb": settings.MAX_AUDIO_SIZE_MB,
         "recommended_format": "mp3",
-        "sample_rate_hz": 16000
+        "sample_rate_hz": settings.AUDIO_SAMPLE_RATE
     }
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Voice WebSocket endpoint."""
+
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Query, WebSocket
+
+from app.core.config import settings
+from app.services.voice import VoiceService
+from app.services.voice_channel import VoiceChannel
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["voice"])
+
+
+@router.websocket("/ws/voice")
+async def voice_socket(
+    websocket: WebSocket,
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    language: Optional[str] = Query(None, max_length=10)
+) -> None:
+    """
+    Live transcription of audio as it is recorded.
+    
+    Clients send 16-bit little-endian mono PCM at ``sample_rate`` as binary
+    frames and receive ``partial`` hypotheses while speaking and a
+    ``final`` transcript once they pause (or send ``{"type": "end"}``).
+    Earlier speech is transcribed while the user is still talking, so the
+    final transcript only waits for the last few seconds of audio.
+    Utterances are charged to the ``/api/voice-to-text`` rate limit.
+    
+    Args:
+        websocket: WebSocket connection
+        sample_rate: Sample rate of the client's audio
+        language: Language code, detected from the audio if omitted
+    """
+    await websocket.accept()
+    
+    channel = VoiceChannel(
+        websocket,
+        VoiceService().open_stream(sample_rate, language),
+        sample_rate,
+        max_frame_bytes=settings.VOICE_WS_MAX_FRAME_BYTES,
+        partial_interval=settings.VOICE_WS_PARTIAL_INTERVAL_MS / 1000,
+        send_queue_size=settings.WS_SEND_QUEUE_SIZE,
+        heartbeat_interval=settings.WS_HEARTBEAT_SECONDS,
+        idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+        rate_limit=getattr(websocket.state, "rate_limit", None),
+        seconds_per_request=settings.VOICE_WS_MAX_SEGMENT_SECONDS
+    )
+    await channel.run()
+    logger.info("Voice socket closed")
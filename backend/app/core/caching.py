@@ -0,0 +1,50 @@
+"""HTTP caching helpers for conditional GET requests."""
+
+from typing import Optional
+
+from fastapi import Response, status
+
+from app.core.metrics import record_cache
+
+# Polled per-user data: cache privately but revalidate on every use
+CACHE_CONTROL = "private, no-cache"
+
+# Bump when the JSON shape of cached endpoints changes
+REPRESENTATION_VERSION = 1
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a weak ETag from version counters and request parameters.
+    
+    No body hashing is involved, so the tag can be computed before any
+    rows are loaded. It is weak because the body may be re-encoded.
+    """
+    return 'W/"' + "-".join(str(part) for part in (REPRESENTATION_VERSION, *parts)) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    
+    opaque = etag.removeprefix("W/")
+    matched = if_none_match.strip() == "*" or any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+    record_cache("etag", matched)
+    return matched
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Attach ETag and Cache-Control headers to a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response for a matching ETag."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,227 @@
+"""Content-negotiated response compression middleware."""
+
+import gzip
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Server preference when the client weights encodings equally
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def build_encoders(
+    gzip_level: int = 6,
+    brotli_quality: int = 4,
+    zstd_level: int = 3
+) -> Dict[str, Callable[[bytes], bytes]]:
+    """
+    Build compressors for the available encodings.
+
+    brotli and zstandard are optional; encodings whose package is not
+    installed are simply not offered.
+    """
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+
+    try:
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=zstd_level)
+        encoders["zstd"] = compressor.compress
+    except ImportError:
+        logger.debug("zstandard not installed, zstd compression disabled")
+
+    try:
+        import brotli
+        encoders["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    except ImportError:
+        logger.debug("brotli not installed, br compression disabled")
+
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, available) -> Optional[str]:
+    """
+    Pick the best available encoding for an ``Accept-Encoding`` header.
+
+    Honors q-values, including ``*`` and ``q=0`` exclusions, and breaks ties
+    with ``ENCODING_PREFERENCE``.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class PayloadCache:
+    """Byte-bounded LRU of compressed bodies keyed by resource and ETag."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[bytes]:
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def put(self, key: Tuple[str, str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete response bodies with zstd, brotli or gzip.
+
+    Bodies under ``minimum_size``, non-text content, streamed responses and
+    responses that already set ``Content-Encoding`` pass through unchanged.
+    Responses that carry an ETag are compressed once per encoding and the
+    compressed bytes are reused while the ETag stays the same.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        cache_max_bytes: int = 8 * 1024 * 1024
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = build_encoders(gzip_level, brotli_quality, zstd_level)
+        self.cache = PayloadCache(cache_max_bytes)
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "responses": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "cpu_seconds": 0.0,
+            "cache_hits": 0
+        })
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+
+            if message.get("more_body", False) or not self._should_compress(headers, body):
+                # Streamed or unsuitable: send everything as it comes
+                passthrough = True
+                if "content-encoding" not in headers:
+                    headers.add_vary_header("Accept-Encoding")
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(scope, headers, body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        """Whether a complete body is worth compressing."""
+        if len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, scope: Scope, headers: MutableHeaders, body: bytes, encoding: str) -> bytes:
+        """Compress a body, reusing a cached payload for unchanged ETags."""
+        stats = self.stats[encoding]
+        stats["responses"] += 1
+        stats["bytes_in"] += len(body)
+
+        etag = headers.get("etag")
+        key = None
+        if etag:
+            resource = scope["path"] + "?" + scope.get("query_string", b"").decode("latin-1")
+            key = (resource, etag, encoding)
+            cached = self.cache.get(key)
+            record_cache("compressed_payload", cached is not None)
+            if cached is not None:
+                logger.debug("Reusing %s body for %s", encoding, resource, extra={"sample_rate": 0.01})
+                stats["cache_hits"] += 1
+                stats["bytes_out"] += len(cached)
+                return cached
+
+        started = time.process_time()
+        compressed = self.encoders[encoding](body)
+        stats["cpu_seconds"] += time.process_time() - started
+        stats["bytes_out"] += len(compressed)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
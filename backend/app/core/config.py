@@ -1,6 +1,6 @@
 """Application configuration settings."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import secrets
@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # Options: json, text
+    LOG_SQL: bool = False  # Log every SQL statement; independent of DEBUG
     
     # Database
     DATABASE_URL: str = Field(default="sqlite:///./cal_ai.db")
@@ -30,17 +32,109 @@ class Settings(BaseSettings):
     SESSION_EXPIRY_DAYS: int = 30
     SESSION_SECRET_KEY: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
     
+    # Response Compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_MB: int = 8  # Reused compressed bodies for ETagged responses
+    
+    # Request Timing
+    SERVER_TIMING_ENABLED: bool = True  # Server-Timing header and per-request access log
+    
+    # Chat WebSocket
+    WS_MAX_CONCURRENT_ANALYSES: int = 3  # Per socket
+    WS_MAX_PENDING_MESSAGES: int = 10  # Running or waiting before meals are rejected
+    WS_SEND_QUEUE_SIZE: int = 32  # Outgoing frames buffered per socket
+    WS_HEARTBEAT_SECONDS: float = 20.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 60.0
+    
+    # Metrics
+    METRICS_ENABLED: bool = True  # Set PROMETHEUS_MULTIPROC_DIR when running several workers
+    
+    # Profiling
+    ADMIN_TOKEN: Optional[str] = None  # Enables profiling and the admin endpoints when set
+    PROFILING_DIR: str = "./profiles"
+    PROFILING_MAX_PER_HOUR: int = 20  # Across all clients
+    PROFILING_MAX_FILES: int = 50  # Oldest profiles are deleted beyond this
+    
     # Rate Limiting
-    MAX_REQUESTS_PER_MINUTE: int = 60
+    RATE_LIMIT_ENABLED: bool = True
+    MAX_REQUESTS_PER_MINUTE: int = 60  # Default for routes not listed below
+    RATE_LIMIT_ROUTES: Dict[str, int] = {  # Path prefix -> requests per minute, 0 = unlimited
+        "/api/analyze-meal": 10,
+        "/api/voice-to-text": 10,
+        "/api/voice-meal": 10,
+        "/api/foods/relog": 30,
+        "/api/import": 5,
+        "/health": 0,
+        "/metrics": 0
+    }
+    RATE_LIMIT_BACKEND: str = "memory"  # Options: memory, redis
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Key clients by X-Forwarded-For behind a proxy
+    RATE_LIMIT_SOCKETS_PER_CLIENT: int = 4  # Open WebSockets per client IP and worker, 0 = unlimited
     
     # Voice Processing
     MAX_AUDIO_SIZE_MB: int = 10
-    SUPPORTED_AUDIO_FORMATS: List[str] = ["mp3", "wav", "m4a", "webm"]
+    SUPPORTED_AUDIO_FORMATS: List[str] = ["mp3", "wav", "m4a", "webm"]  # Recognized by magic bytes
+    AUDIO_STAGING_DIR: str = "uploads/audio"
+    AUDIO_STAGING_QUOTA_MB: int = 512  # Shared by all workers using the directory
+    AUDIO_STAGING_QUOTA_WAIT_SECONDS: float = 5.0  # Uploads wait this long for space before 503; 0 rejects at once
+    AUDIO_STAGING_TTL_SECONDS: int = 3600  # Older staged files are treated as abandoned
+    AUDIO_STAGING_JANITOR_SECONDS: int = 300  # Between sweeps for abandoned files
+    
+    # Audio Preprocessing
+    AUDIO_PREPROCESSING_ENABLED: bool = True  # Decode, resample, trim silence and normalize before transcription
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_VAD_THRESHOLD_DB: float = -45.0  # Frames quieter than this (dBFS) count as silence
+    AUDIO_VAD_PADDING_MS: int = 200  # Silence kept next to speech
+    AUDIO_TARGET_LEVEL_DB: float = -20.0  # RMS level of speech after normalization
+    
+    # Transcription
+    TRANSCRIPTION_ENGINE: str = "mock"  # Options: mock, faster-whisper, or a module:Class path
+    TRANSCRIPTION_MODEL_PATH: Optional[str] = None  # Model directory or size name for local engines
+    TRANSCRIPTION_WORKERS: int = 2  # Worker processes, each with the model loaded
+    TRANSCRIPTION_MAX_QUEUE: int = 8  # Waiting clips before uploads get 503
+    TRANSCRIPTION_CPU_THREADS: int = 2  # Per worker
+    TRANSCRIPTION_PREWARM: Optional[bool] = None  # Start workers and load models at startup; unset means on unless the engine is mock
+    TRANSCRIPTION_CACHE_ENABLED: bool = True  # Reuse transcripts of clips uploaded again
+    TRANSCRIPTION_CACHE_MAX_ENTRIES: int = 10000  # Least recently used transcripts beyond this are pruned
+    TRANSCRIPTION_CACHE_TTL_DAYS: int = 30  # Transcripts unused for this long are pruned
+    
+    # Voice WebSocket
+    VOICE_WS_MAX_FRAME_BYTES: int = 64 * 1024  # Largest binary audio frame
+    VOICE_WS_PARTIAL_INTERVAL_MS: int = 1000  # Between partial hypotheses while speaking
+    VOICE_WS_PARTIAL_MAX_SECONDS: float = 5.0  # Latest audio of the open segment transcribed for a partial
+    VOICE_WS_SEGMENT_PAUSE_MS: int = 300  # Pause after which speech so far is transcribed in the background
+    VOICE_WS_END_SILENCE_MS: int = 800  # Silence that finalizes an utterance
+    VOICE_WS_MAX_SEGMENT_SECONDS: float = 10.0
     
     # AI Prompts Configuration
     MEAL_ANALYSIS_MODEL: str = "claude-3-haiku-20240307"  # or "gpt-4-turbo"
-    MAX_TOKENS: int = 1500
+    MAX_TOKENS: int = 1500  # Output limit for profiles not in MAX_TOKENS_BY_PROFILE
+    MAX_TOKENS_BY_PROFILE: Dict[str, int] = {  # Prompt profile -> output token limit
+        "full": 1500,
+        "compact": 700,
+        "minimal": 500
+    }
     TEMPERATURE: float = 0.7
+    PROMPT_PROFILE: str = "full"  # Options: full, compact, minimal
+    PROMPT_TOKEN_BUDGET: int = 2000  # Estimated input tokens per meal prompt; optional context is dropped first
+    # Mark the static system prompt for Anthropic prompt caching once it reaches the model's minimum
+    # (1024 tokens, 2048 for Haiku). Inactive for the shipped profiles, whose prefixes are all shorter.
+    PROMPT_CACHE_ENABLED: bool = True
+    
+    # Food Suggestions
+    FREQUENT_FOODS_TOP_K: int = 10
+    FREQUENT_FOODS_HALF_LIFE_DAYS: float = 14.0
+    FREQUENT_FOODS_MAX_SESSIONS: int = 10000  # Sessions whose counters stay in memory; others are rebuilt on use
+    
+    # History Import
+    IMPORT_MAX_FILE_MB: int = 50
+    IMPORT_BATCH_SIZE: int = 500  # Meals per executemany batch
+    IMPORT_COMMIT_EVERY: int = 10  # Batches between commits
     
     class Config:
         env_file = ".env"
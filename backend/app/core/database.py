@@ -1,9 +1,12 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+import hashlib
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete, inspect, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Generator, Optional
 
 from app.core.config import settings
 
@@ -11,7 +14,6 @@ from app.core.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,
     future=True
 )
 
@@ -27,6 +29,15 @@ SessionLocal = sessionmaker(
 # Create base class for models
 Base = declarative_base()
 
+# Fingerprint of the schema the database was last initialized with. Kept out
+# of Base.metadata so it does not feed into the fingerprint itself.
+schema_metadata = MetaData()
+schema_version_table = Table(
+    "schema_version",
+    schema_metadata,
+    Column("fingerprint", String, primary_key=True)
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -42,7 +53,75 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def init_db() -> None:
-    """Initialize database tables."""
-    from app.models import message, nutrition, session  # Import models to register them
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+def init_db(bind: Optional[Engine] = None) -> None:
+    """
+    Initialize database tables.
+    
+    Skipped when the database was already initialized with the current
+    schema fingerprint, so warm databases cost a single query at startup.
+    
+    Args:
+        bind: Engine to initialize, defaults to the application engine
+    """
+    from app.models import message, nutrition, session, transcription  # Import models to register them
+    bind = bind or engine
+    
+    fingerprint = schema_fingerprint(bind)
+    if stored_schema_fingerprint(bind) == fingerprint:
+        return
+    
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    
+    schema_metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        connection.execute(delete(schema_version_table))
+        connection.execute(insert(schema_version_table).values(fingerprint=fingerprint))
+
+
+def schema_fingerprint(bind: Optional[Engine] = None) -> str:
+    """Hash the tables, columns and indexes declared by the models."""
+    dialect = (bind or engine).dialect
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        for column in table.columns:
+            default = column.server_default.arg if column.server_default is not None else ""
+            parts.append(f"{column.name}:{column.type.compile(dialect=dialect)}:{column.nullable}:{default}")
+        parts.extend(sorted(index.name for index in table.indexes))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def stored_schema_fingerprint(bind: Optional[Engine] = None) -> Optional[str]:
+    """Fingerprint recorded by the last ``init_db``, if any."""
+    try:
+        with (bind or engine).connect() as connection:
+            return connection.execute(select(schema_version_table.c.fingerprint)).scalar()
+    except DBAPIError:
+        # Not initialized by this version yet
+        return None
+
+
+def add_missing_columns(bind: Optional[Engine] = None) -> None:
+    """
+    Add columns introduced after a table was first created.
+    
+    ``create_all`` never alters existing tables, so columns with a server
+    default are added here to keep older databases usable.
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or column.server_default is None:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} "
+                    f"NOT NULL DEFAULT {column.server_default.arg}"
+                ))
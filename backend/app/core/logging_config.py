@@ -0,0 +1,177 @@
+"""Non-blocking, structured logging setup."""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "session_id", "sample_rate"
+}
+
+
+def bind_session_id(session_id: Optional[str]) -> None:
+    """Attach a session ID to log records emitted by the current request or task."""
+    session_id_var.set(session_id)
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Queue handler that does as little as possible on the calling thread.
+
+    Only the message %-formatting, the traceback text and the request and
+    session IDs (which live in context variables) are resolved here;
+    formatting and writing happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep records passed with ``extra={"sample_rate": rate}`` with that probability.
+
+    Meant for debug logs on hot paths, e.g.
+    ``logger.debug("Cache hit for %s", key, extra={"sample_rate": 0.01})``.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        return rate is None or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class _TextFormatter(logging.Formatter):
+    """Plain text formatter tolerant of records without a request ID."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = None
+        return super().format(record)
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = True,
+    sql_echo: bool = False,
+    stream: Optional[TextIO] = None
+) -> QueueListener:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Args:
+        level: Root log level
+        json_format: Write JSON lines instead of plain text
+        sql_echo: Log SQL statements through ``sqlalchemy.engine``
+        stream: Output stream, defaults to stderr
+
+    Returns:
+        The started listener, stopped (and flushed) at interpreter exit
+    """
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if json_format else _TextFormatter(TEXT_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = ContextQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level))
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if sql_echo else logging.WARNING)
+    
+    # Send uvicorn's own loggers through the queue as well
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class RequestContextMiddleware:
+    """
+    Assign each HTTP request an ID for log correlation.
+
+    Reuses an incoming ``X-Request-ID`` and echoes it on the response. The
+    session ID is taken from ``X-Session-ID`` or the ``session_id`` query
+    parameter when present; services bind it later when it comes from the
+    request body.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id") or uuid.uuid4().hex
+        session_id = headers.get("x-session-id") or QueryParams(scope.get("query_string", b"")).get("session_id")
+        request_token = request_id_var.set(request_id)
+        session_token = session_id_var.set(session_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(request_token)
+            session_id_var.reset(session_token)
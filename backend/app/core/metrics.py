@@ -0,0 +1,282 @@
+"""Prometheus metrics collection and exposition."""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AI_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+PROMPT_TOKEN_BUCKETS = (50, 100, 200, 400, 800, 1200, 1600, 2400, 3200)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=POOL_WAIT_BUCKETS
+)
+AI_LATENCY = Histogram(
+    "ai_request_duration_seconds",
+    "AI provider call latency",
+    ["provider", "model"],
+    buckets=AI_LATENCY_BUCKETS
+)
+AI_ERRORS = Counter(
+    "ai_request_errors_total",
+    "Failed AI provider calls",
+    ["provider", "model", "error"]
+)
+AI_PROMPT_TOKENS = Histogram(
+    "ai_prompt_tokens",
+    "Estimated input tokens of meal analysis prompts sent to the provider",
+    ["profile"],
+    buckets=PROMPT_TOKEN_BUCKETS
+)
+AI_TOKENS = Counter(
+    "ai_tokens_total",
+    "Tokens billed by AI providers: uncached input, cache reads, cache writes and output",
+    ["provider", "model", "kind"]
+)
+TRANSCRIPTION_QUEUE_WAIT = Histogram(
+    "transcription_queue_wait_seconds",
+    "Time transcription jobs wait for a pool worker",
+    ["engine"],
+    buckets=LATENCY_BUCKETS
+)
+TRANSCRIPTION_LATENCY = Histogram(
+    "transcription_duration_seconds",
+    "Time a pool worker spends transcribing one clip",
+    ["engine"],
+    buckets=LATENCY_BUCKETS
+)
+TRANSCRIPTION_REAL_TIME_FACTOR = Histogram(
+    "transcription_real_time_factor",
+    "Transcription time divided by audio duration",
+    ["engine"],
+    buckets=REAL_TIME_FACTOR_BUCKETS
+)
+TRANSCRIPTION_REJECTED = Counter(
+    "transcription_rejected_total",
+    "Transcription jobs rejected because the pool queue was full",
+    ["engine"]
+)
+AUDIO_SECONDS = Counter(
+    "audio_seconds_total",
+    "Seconds of voice audio received, and left for transcription after trimming silence",
+    ["stage"]
+)
+AUDIO_STAGING_BYTES = Gauge(
+    "audio_staging_bytes",
+    "Disk space taken by staged voice audio",
+    multiprocess_mode="livemostrecent"
+)
+AUDIO_STAGING_FILES = Gauge(
+    "audio_staging_files",
+    "Staged voice audio files, counting hard-linked copies once",
+    multiprocess_mode="livemostrecent"
+)
+AUDIO_STAGING_REJECTED = Counter(
+    "audio_staging_rejected_total",
+    "Voice uploads rejected because staging storage stayed over its quota"
+)
+AUDIO_STAGING_EXPIRED = Counter(
+    "audio_staging_expired_files_total",
+    "Abandoned staged audio files removed by the janitor"
+)
+TRANSCRIPTION_CACHE_SAVED_SECONDS = Counter(
+    "transcription_cache_saved_seconds_total",
+    "Preprocessing and transcription time avoided by transcription cache hits",
+    ["engine"]
+)
+TRANSCRIPTION_CACHE_PRUNED = Counter(
+    "transcription_cache_pruned_total",
+    "Stored transcripts removed by the janitor for age or to stay under the entry limit"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+STORE_ENTRIES = Gauge(
+    "in_memory_store_entries",
+    "Entries held in process-local stores",
+    ["store"],
+    multiprocess_mode="livesum"
+)
+
+# In-memory stores reported by ``STORE_ENTRIES``, name -> size callback
+_stores: Dict[str, Callable[[], int]] = {}
+
+
+def register_store(name: str, size: Callable[[], int]) -> None:
+    """Report the size of an in-memory store as ``in_memory_store_entries``."""
+    _stores[name] = size
+
+
+def refresh_store_sizes() -> None:
+    """Update store entry gauges from their size callbacks."""
+    for name, size in _stores.items():
+        STORE_ENTRIES.labels(name).set(size())
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one lookup against a named cache."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def observe_ai_call(provider: str, model: str) -> Iterator[None]:
+    """Record latency, and errors by exception type, of one provider call."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        AI_ERRORS.labels(provider, model, type(e).__name__).inc()
+        raise
+    finally:
+        AI_LATENCY.labels(provider, model).observe(time.perf_counter() - started)
+
+
+def observe_ai_usage(
+    provider: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0
+) -> None:
+    """Count the tokens of one provider call; ``input_tokens`` excludes cached ones."""
+    for kind, tokens in (
+        ("input", input_tokens),
+        ("cache_read", cache_read_tokens),
+        ("cache_write", cache_write_tokens),
+        ("output", output_tokens)
+    ):
+        if tokens:
+            AI_TOKENS.labels(provider, model, kind).inc(tokens)
+
+
+def observe_transcription(engine: str, queue_wait: float, seconds: float, audio_seconds: float) -> None:
+    """Record queue wait, compute time and real-time factor of one transcription."""
+    TRANSCRIPTION_QUEUE_WAIT.labels(engine).observe(queue_wait)
+    TRANSCRIPTION_LATENCY.labels(engine).observe(seconds)
+    if audio_seconds > 0:
+        TRANSCRIPTION_REAL_TIME_FACTOR.labels(engine).observe(seconds / audio_seconds)
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    Record how long connection checkouts wait on the engine's pool.
+
+    SQLAlchemy only emits pool events once a connection has been handed
+    out, so the pool's ``connect`` is wrapped to time the wait itself.
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    When ``PROMETHEUS_MULTIPROC_DIR`` is set (several uvicorn workers),
+    values written by every worker are aggregated from that directory.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    refresh_store_sizes()
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Drop a stopped worker's live gauges in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """
+    Count and time HTTP requests by route template.
+
+    Routes are labelled with their path template (``/api/export/{session_id}``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    Store size gauges are refreshed at most every ``store_refresh_seconds``.
+    """
+
+    def __init__(self, app: ASGIApp, store_refresh_seconds: float = 5.0):
+        self.app = app
+        self.store_refresh_seconds = store_refresh_seconds
+        self.stores_refreshed = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            labels = (method, getattr(route, "path", "unmatched"), str(status_code))
+            HTTP_REQUESTS.labels(*labels).inc()
+            HTTP_LATENCY.labels(*labels).observe(time.perf_counter() - started)
+
+            if started - self.stores_refreshed >= self.store_refresh_seconds:
+                self.stores_refreshed = started
+                refresh_store_sizes()
@@ -0,0 +1,153 @@
+"""Opt-in sampling profiler for individual requests."""
+
+import asyncio
+import logging
+import re
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import InMemoryBackend
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".speedscope.json"
+PROFILE_NAME = re.compile(r"^[\w.-]+\.speedscope\.json$")
+
+
+class ProfileStore:
+    """Directory of speedscope profiles, keeping only the newest files."""
+
+    def __init__(self, directory: str, max_files: int = 50):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, name: str, data: str) -> Path:
+        """Write a profile and drop the oldest ones beyond ``max_files``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        path.write_text(data, encoding="utf-8")
+
+        profiles = sorted(self.directory.glob("*" + PROFILE_SUFFIX), key=lambda p: p.stat().st_mtime)
+        for old in profiles[:-self.max_files]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def list(self) -> List[Dict]:
+        """Stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in self.directory.glob("*" + PROFILE_SUFFIX):
+            stat = path.stat()
+            profiles.append({
+                "name": path.name,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime)
+            })
+        return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a stored profile, or None for unknown or unsafe names."""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+def token_matches(candidate: Optional[str], token: Optional[str]) -> bool:
+    """Constant-time comparison that never matches an unset token."""
+    return bool(token and candidate) and secrets.compare_digest(candidate, token)
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests that opt in with the admin token.
+
+    A request sending ``X-Profile: <token>`` (or ``?profile=<token>``) runs
+    under pyinstrument's sampling profiler in async mode, so time spent
+    awaiting is attributed to the request rather than to whatever else the
+    event loop ran. The speedscope output is stored in ``store`` and named
+    in the ``X-Profile-ID`` response header. Profiled requests share one
+    global token bucket of ``max_per_hour``; requests over it, or without
+    pyinstrument installed, run unprofiled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: Optional[str],
+        interval: float = 0.001,
+        max_per_hour: int = 20
+    ):
+        self.app = app
+        self.store = store
+        self.token = token
+        self.interval = interval
+        self.max_per_hour = max_per_hour
+        self.budget = InMemoryBackend(shards=1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.token:
+            await self.app(scope, receive, send)
+            return
+
+        candidate = Headers(scope=scope).get("x-profile")
+        if candidate is None and b"profile=" in scope.get("query_string", b""):
+            candidate = QueryParams(scope["query_string"]).get("profile")
+        if not token_matches(candidate, self.token):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = await self._start_profiler()
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        name = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}-{scope['method']}"
+            f"{re.sub(r'[^A-Za-z0-9]+', '_', scope['path']).rstrip('_')}{PROFILE_SUFFIX}"
+        )
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])["X-Profile-ID"] = name
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            data = profiler.output(SpeedscopeRenderer())
+            await asyncio.to_thread(self.store.save, name, data)
+            logger.info("Stored profile %s", name)
+
+    async def _start_profiler(self):
+        """Start a profiler if pyinstrument is installed and the budget allows."""
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("Profiling requested but pyinstrument is not installed")
+            return None
+
+        allowed, _, _ = await self.budget.acquire("profiles", self.max_per_hour, self.max_per_hour / 3600)
+        if not allowed:
+            logger.warning("Profiling budget exhausted, running request unprofiled")
+            return None
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        return profiler
+
+
+# Global profile store
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
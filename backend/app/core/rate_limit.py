@@ -0,0 +1,249 @@
+"""Token-bucket rate limiting middleware."""
+
+import logging
+import math
+import threading
+import time
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# (allowed, tokens remaining, seconds until the next token)
+Decision = Tuple[bool, float, float]
+
+# Charges a route group's buckets from inside a WebSocket: (path, session ID) -> (allowed, retry after)
+SocketRateLimit = Callable[[str, Optional[str]], Awaitable[Tuple[bool, float]]]
+
+
+class InMemoryBackend:
+    """
+    Token buckets in a sharded in-process map.
+
+    Buckets refill lazily when touched. A shard that grows past its cap
+    drops buckets that have refilled completely, which is lossless because
+    a full bucket behaves exactly like a missing one.
+    """
+
+    def __init__(self, shards: int = 16, max_buckets_per_shard: int = 4096):
+        self.max_buckets_per_shard = max_buckets_per_shard
+        self.shards: List[Dict[str, List[float]]] = [{} for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> Decision:
+        index = zlib.crc32(key.encode("utf-8")) % len(self.shards)
+        shard = self.shards[index]
+        now = time.monotonic()
+
+        with self.locks[index]:
+            bucket = shard.get(key)
+            if bucket is None:
+                if len(shard) >= self.max_buckets_per_shard:
+                    self._evict(shard, now, refill_per_second, capacity)
+                bucket = shard[key] = [float(capacity), now]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, bucket[0], 0.0
+            return False, bucket[0], (1 - bucket[0]) / refill_per_second
+
+    def _evict(self, shard: Dict[str, List[float]], now: float, refill_per_second: float, capacity: int) -> None:
+        """Drop buckets that would be full by now."""
+        idle_seconds = capacity / refill_per_second
+        for key in [key for key, (_, last) in shard.items() if now - last >= idle_seconds]:
+            del shard[key]
+
+
+class RedisBackend:
+    """Token buckets shared across workers through Redis."""
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url: str, prefix: str = "cal-ai:ratelimit:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> Decision:
+        try:
+            allowed, tokens = await self.script(
+                keys=[self.prefix + key],
+                args=[capacity, refill_per_second, time.time()]
+            )
+        except Exception as e:
+            # Fail open: an unavailable limiter should not take the API down
+            logger.warning("Rate limit backend unavailable: %s", e)
+            return True, float(capacity), 0.0
+
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (1 - tokens) / refill_per_second
+        return bool(allowed), tokens, retry_after
+
+
+class RateLimitMiddleware:
+    """
+    Enforce per-IP and per-session request limits.
+
+    Each route group (longest matching path prefix in ``routes``, or the
+    default) has its own buckets, so strict limits on AI-backed routes do
+    not eat into the budget for cheap reads. A limit of 0 disables limiting
+    for that group. Sessions are identified by the ``X-Session-ID`` header
+    or a ``session_id`` query parameter.
+
+    WebSockets are not charged on connect. Instead each client may hold at
+    most ``max_sockets_per_client`` open sockets (counted per worker), and
+    the socket's ``state.rate_limit`` charges a route group's buckets, so
+    work started by a frame shares the limit of the equivalent HTTP route.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_per_minute: int = 60,
+        routes: Optional[Dict[str, int]] = None,
+        backend=None,
+        trust_forwarded: bool = False,
+        max_sockets_per_client: int = 0
+    ):
+        self.app = app
+        self.default_per_minute = default_per_minute
+        self.routes = sorted((routes or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.backend = backend or InMemoryBackend()
+        self.trust_forwarded = trust_forwarded
+        self.max_sockets_per_client = max_sockets_per_client
+        self.sockets: Dict[str, int] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "websocket":
+            await self._serve_socket(scope, receive, send)
+            return
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        group, limit = self._match(scope["path"])
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        refill = limit / 60.0
+        headers = Headers(scope=scope)
+        session_id = headers.get("x-session-id") or QueryParams(scope.get("query_string", b"")).get("session_id")
+        denied_key, remaining, retry_after = await self._take(
+            group, limit, self._client_ip(scope, headers), session_id
+        )
+
+        rate_headers = {
+            "RateLimit-Limit": str(limit),
+            "RateLimit-Remaining": str(int(remaining)),
+            "RateLimit-Reset": str(math.ceil((limit - remaining) / refill)),
+        }
+
+        if denied_key is not None:
+            logger.info("Rate limited %s", denied_key, extra={"sample_rate": 0.1})
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "error": "rate_limited",
+                    "message": "Too many requests, please slow down",
+                    "status_code": status.HTTP_429_TOO_MANY_REQUESTS
+                },
+                headers={**rate_headers, "Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(raw=message["headers"])
+                for name, value in rate_headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _serve_socket(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Cap open sockets per client and let the endpoint charge buckets."""
+        ip = self._client_ip(scope, Headers(scope=scope))
+        if self.max_sockets_per_client and self.sockets.get(ip, 0) >= self.max_sockets_per_client:
+            logger.info("Rejected socket over the per-client limit from %s", ip, extra={"sample_rate": 0.1})
+            await receive()
+            await send({"type": "websocket.close", "code": status.WS_1008_POLICY_VIOLATION})
+            return
+
+        async def rate_limit(path: str, session_id: Optional[str] = None) -> Tuple[bool, float]:
+            group, limit = self._match(path)
+            if limit <= 0:
+                return True, 0.0
+            denied_key, _, retry_after = await self._take(group, limit, ip, session_id)
+            if denied_key is not None:
+                logger.info("Rate limited %s", denied_key, extra={"sample_rate": 0.1})
+            return denied_key is None, retry_after
+
+        scope.setdefault("state", {})["rate_limit"] = rate_limit
+        self.sockets[ip] = self.sockets.get(ip, 0) + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sockets[ip] -= 1
+            if not self.sockets[ip]:
+                del self.sockets[ip]
+
+    async def _take(
+        self, group: str, limit: int, ip: str, session_id: Optional[str]
+    ) -> Tuple[Optional[str], float, float]:
+        """Charge the IP and session buckets; returns (denied key, remaining, retry after)."""
+        refill = limit / 60.0
+        keys = [f"{group}|ip|{ip}"]
+        if session_id:
+            keys.append(f"{group}|session|{session_id}")
+
+        remaining = float(limit)
+        for key in keys:
+            allowed, key_remaining, retry_after = await self.backend.acquire(key, limit, refill)
+            remaining = min(remaining, key_remaining)
+            if not allowed:
+                return key, remaining, retry_after
+        return None, remaining, 0.0
+
+    def _match(self, path: str) -> Tuple[str, int]:
+        """Find the route group and per-minute limit for a path."""
+        for prefix, limit in self.routes:
+            if path.startswith(prefix):
+                return prefix, limit
+        return "default", self.default_per_minute
+
+    def _client_ip(self, scope: Scope, headers: Headers) -> str:
+        """Client address, optionally taken from X-Forwarded-For."""
+        if self.trust_forwarded:
+            forwarded = headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
@@ -0,0 +1,27 @@
+"""Fast JSON response classes."""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.timing import timed
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Pydantic models are dumped straight to bytes with their compiled
+    serializer, so endpoints can return a model built once by the service
+    without FastAPI validating and re-encoding it against ``response_model``.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            if isinstance(content, BaseModel):
+                return content.__pydantic_serializer__.to_json(content)
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
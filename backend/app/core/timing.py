@@ -0,0 +1,171 @@
+"""Per-request phase timing reported through ``Server-Timing``."""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.access")
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated duration and count of each phase within one request."""
+
+    __slots__ = ("durations", "counts")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: float) -> str:
+        """Format phases as a ``Server-Timing`` header value."""
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]}x"'
+            for name, seconds in self.durations.items()
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> str:
+        """Format phases for the access log."""
+        return " ".join(
+            f"{name}={seconds * 1000:.1f}ms/{self.counts[name]}"
+            for name, seconds in self.durations.items()
+        )
+
+
+class _Phase:
+    """Context manager adding its elapsed time to a phase."""
+
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoPhase:
+    """Shared no-op used when no request is being timed."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def timed(name: str):
+    """
+    Time a block as phase ``name`` of the current request.
+
+    Outside a timed request this returns a shared no-op, so instrumented
+    code costs one context variable lookup when timing is disabled.
+
+    Example:
+        with timed("prompt"):
+            prompt = prompt_manager.get_meal_analysis_prompt(...)
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NO_PHASE
+    return _Phase(timings, name)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Add time measured elsewhere (e.g. in another process) to phase ``name``."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record SQL statement execution time as the ``db`` phase."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        timings = _current.get()
+        started = conn.info.get("query_started")
+        if timings is not None and started:
+            timings.add("db", time.perf_counter() - started.pop())
+
+
+class ServerTimingMiddleware:
+    """
+    Collect phase timings for each HTTP request.
+
+    Adds a ``Server-Timing`` header with every recorded phase plus the
+    total time to the response head, and writes one access log line per
+    request once the body has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, access_log: bool = True):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append("Server-Timing", timings.header(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if self.access_log and logger.isEnabledFor(logging.INFO):
+                total = (time.perf_counter() - started) * 1000
+                logger.info(
+                    "%s %s %d %.1fms %s",
+                    scope["method"], scope["path"], status_code, total, timings.summary(),
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(total, 1),
+                        "phases_ms": {
+                            name: round(seconds * 1000, 1)
+                            for name, seconds in timings.durations.items()
+                        }
+                    }
+                )
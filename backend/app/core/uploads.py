@@ -0,0 +1,121 @@
+"""Streaming reads of file uploads without buffering the request body."""
+
+from typing import AsyncIterator, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+# Room for multipart boundaries, part headers and small form fields
+# on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised as soon as an upload is known to exceed its size limit."""
+
+
+class FileFieldStream:
+    """
+    Stream one file field of a ``multipart/form-data`` request.
+
+    The body is fed to the multipart parser as it arrives; data of the
+    requested field is handed out chunk by chunk and everything else is
+    dropped, so memory use does not depend on the upload size. The declared
+    ``Content-Length`` is checked before anything is read, and reading stops
+    with ``UploadTooLargeError`` once more than ``max_body_bytes`` arrive.
+
+    Example:
+        stream = FileFieldStream(request, "audio", max_body_bytes=limit)
+        filename = await stream.start()
+        async for chunk in stream:
+            ...
+    """
+
+    def __init__(self, request: Request, field: str, max_body_bytes: int):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise ValueError("Expected a multipart/form-data upload")
+
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+            raise UploadTooLargeError(f"Upload of {content_length} bytes exceeds the size limit")
+
+        self.field = field
+        self.max_body_bytes = max_body_bytes
+        self.filename: Optional[str] = None
+        self.bytes_received = 0
+
+        self._body = request.stream()
+        self._parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end
+        })
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_field = False
+        self._field_done = False
+        self._pending: List[bytes] = []
+
+    async def start(self) -> str:
+        """Read up to the start of the field's content and return its filename."""
+        while self.filename is None:
+            if not await self._feed():
+                raise ValueError(f"Missing file field '{self.field}'")
+        return self.filename
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        await self.start()
+        while True:
+            while self._pending:
+                yield self._pending.pop(0)
+            if self._field_done or not await self._feed():
+                return
+
+    async def _feed(self) -> bool:
+        """Parse the next body chunk; False once the body is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        self.bytes_received += len(chunk)
+        if self.bytes_received > self.max_body_bytes:
+            raise UploadTooLargeError("Upload exceeds the size limit")
+        self._parser.write(chunk)
+        return True
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name == self.field and b"filename" in options and self.filename is None:
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self._in_field = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self._field_done = True
@@ -3,5 +3,6 @@
 from app.models.message import Message
 from app.models.nutrition import NutritionInfo, FoodItem
 from app.models.session import UserSession
+from app.models.transcription import CachedTranscription
 
-__all__ = ["Message", "NutritionInfo", "FoodItem", "UserSession"]
\ No newline at end of file
+__all__ = ["Message", "NutritionInfo", "FoodItem", "UserSession", "CachedTranscription"]
\ No newline at end of file
@@ -1,7 +1,7 @@
 """User session model."""
 
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy import Column, String, DateTime, Integer, Index
 from sqlalchemy.orm import relationship
 import uuid
 
@@ -17,6 +17,7 @@ class UserSession(Base):
     session_token = Column(String, unique=True, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     last_activity = Column(DateTime, default=datetime.utcnow, nullable=False)
+    version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped when messages change
     
     # Relationships
     messages = relationship("Message", back_populates="session", cascade="all, delete-orphan")
@@ -28,4 +29,8 @@ class UserSession(Base):
     
     def update_activity(self):
         """Update last activity timestamp."""
-        self.last_activity = datetime.utcnow()
\ No newline at end of file
+        self.last_activity = datetime.utcnow()
+    
+    def bump_version(self):
+        """Mark the session's messages as changed, atomically in SQL."""
+        self.version = UserSession.version + 1
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Transcription cache model."""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Float, Integer, Text, DateTime
+
+from app.core.database import Base
+
+
+class CachedTranscription(Base):
+    """Transcript of an audio clip, keyed by its content hash and how it was transcribed."""
+    
+    __tablename__ = "transcription_cache"
+    
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the uploaded audio
+    engine = Column(String, primary_key=True)
+    model = Column(String, primary_key=True)
+    requested_language = Column(String, primary_key=True)  # Empty when detected by the engine
+    text = Column(Text, nullable=False)
+    language = Column(String, nullable=False)
+    confidence = Column(Float, nullable=False)
+    duration_seconds = Column(Float, nullable=True)
+    compute_seconds = Column(Float, nullable=False, default=0)  # Preprocessing and transcription time
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -8,10 +8,25 @@ from app.schemas.meal import (
 )
 from app.schemas.chat import (
     ChatMessage,
-    ChatHistoryResponse
+    ChatHistoryResponse,
+    ChatSocketMessage,
+    DailyIntake
+)
+from app.schemas.food import (
+    FoodSuggestion,
+    FrequentFoodsResponse,
+    FoodRelogRequest
+)
+from app.schemas.history_import import (
+    ImportProgress
 )
 from app.schemas.voice import (
-    VoiceToTextResponse
+    VoiceToTextResponse,
+    VoiceSocketMessage
+)
+from app.schemas.admin import (
+    ProfileInfo,
+    TranscriptionCacheStats
 )
 from app.schemas.common import (
     HealthCheck,
@@ -25,7 +40,16 @@ __all__ = [
     "NutritionInfoSchema",
     "ChatMessage",
     "ChatHistoryResponse",
+    "ChatSocketMessage",
+    "DailyIntake",
+    "FoodSuggestion",
+    "FrequentFoodsResponse",
+    "FoodRelogRequest",
+    "ImportProgress",
     "VoiceToTextResponse",
+    "VoiceSocketMessage",
+    "ProfileInfo",
+    "TranscriptionCacheStats",
     "HealthCheck",
     "ErrorResponse"
 ]
\ No newline at end of file
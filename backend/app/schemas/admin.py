@@ -0,0 +1,37 @@
+"""Admin related schemas."""
+
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class ProfileInfo(BaseModel):
+    """A stored request profile."""
+    name: str = Field(..., description="Profile name, as returned in X-Profile-ID")
+    size_bytes: int = Field(..., ge=0, description="File size in bytes")
+    created_at: datetime = Field(..., description="When the profile was written")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "name": "20240115T123000-1a2b3c4d-POST_api_analyze_meal.speedscope.json",
+            "size_bytes": 48213,
+            "created_at": "2024-01-15T12:30:00"
+        }
+    })
+
+
+
+class TranscriptionCacheStats(BaseModel):
+    """Effectiveness of the transcription cache."""
+    entries: int = Field(..., ge=0, description="Cached transcripts, one per distinct clip transcribed")
+    hits: int = Field(..., ge=0, description="Uploads answered from the cache")
+    hit_rate: float = Field(..., ge=0, le=1, description="Hits over all cacheable uploads")
+    compute_seconds_saved: float = Field(..., ge=0, description="Preprocessing and transcription time avoided by hits")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "entries": 120,
+            "hits": 45,
+            "hit_rate": 0.2727,
+            "compute_seconds_saved": 61.3
+        }
+    })
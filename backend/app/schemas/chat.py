@@ -1,6 +1,6 @@
 """Chat history related schemas."""
 
-from typing import Optional, List
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from enum import Enum
@@ -61,4 +61,32 @@ class ChatHistoryResponse(BaseModel):
             "session_id": "session-uuid",
             "has_more": True
         }
-    })
\ No newline at end of file
+    })
+
+
+class ChatSocketMessage(BaseModel):
+    """Client frame on the chat WebSocket."""
+    type: Literal["meal", "ping", "pong"] = Field(..., description="Frame type")
+    id: Optional[str] = Field(None, max_length=100, description="Client message ID echoed on replies")
+    message: Optional[str] = Field(None, min_length=1, max_length=5000, description="Meal description")
+    language: str = Field("auto", description="Language preference (auto, en, zh)")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "type": "meal",
+            "id": "client-msg-1",
+            "message": "一碗牛肉面",
+            "language": "zh"
+        }
+    })
+
+
+class DailyIntake(BaseModel):
+    """Nutrition logged in a session today (UTC)."""
+    session_id: str = Field(..., description="Session ID")
+    date: str = Field(..., description="Day in ISO format")
+    meals: int = Field(..., description="Meals analyzed today")
+    calories: float = Field(..., description="Total calories")
+    protein: float = Field(..., description="Total protein in grams")
+    carbs: float = Field(..., description="Total carbohydrates in grams")
+    fat: float = Field(..., description="Total fat in grams")
@@ -0,0 +1,46 @@
+"""Food suggestion related schemas."""
+
+from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+
+from app.schemas.meal import FoodItemSchema
+
+
+class FoodSuggestion(FoodItemSchema):
+    """Previously logged food with its stored nutrition values."""
+    key: str = Field(..., description="Normalized food name used for counting")
+    food_item_id: str = Field(..., description="ID of the most recent logged instance")
+    count: int = Field(..., ge=1, description="Number of times this food was logged")
+    score: float = Field(..., ge=0, description="Frequency score with time decay applied")
+    last_logged: datetime = Field(..., description="When this food was last logged")
+
+
+class FrequentFoodsResponse(BaseModel):
+    """Frequent and recent foods for a session."""
+    session_id: str = Field(..., description="Session ID")
+    frequent: List[FoodSuggestion] = Field(..., description="Most frequently logged foods")
+    recent: List[FoodSuggestion] = Field(..., description="Most recently logged foods, newest first")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "session_id": "session-uuid",
+            "frequent": [],
+            "recent": []
+        }
+    })
+
+
+class FoodRelogRequest(BaseModel):
+    """Request to log previously recorded foods again without AI analysis."""
+    session_id: str = Field(..., description="Session ID the foods were logged in")
+    food_item_ids: List[str] = Field(..., min_length=1, max_length=50, description="Food item IDs to log again")
+    language: Optional[str] = Field("auto", description="Language preference (auto, en, zh)")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "session_id": "session-uuid",
+            "food_item_ids": ["food-item-uuid"],
+            "language": "zh"
+        }
+    })
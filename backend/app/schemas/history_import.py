@@ -0,0 +1,31 @@
+"""History import related schemas."""
+
+from typing import List
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class ImportProgress(BaseModel):
+    """Progress of a history import; the final update has ``done`` set."""
+    session_id: str = Field(..., description="Session the history was imported into")
+    rows_read: int = Field(..., ge=0, description="Records read from the file so far")
+    meals_imported: int = Field(..., ge=0, description="Meals inserted so far")
+    food_items_imported: int = Field(..., ge=0, description="Food items inserted so far")
+    rows_skipped: int = Field(..., ge=0, description="Rows that could not be imported")
+    seconds: float = Field(..., ge=0, description="Elapsed time in seconds")
+    rows_per_second: float = Field(..., ge=0, description="Import throughput")
+    errors: List[str] = Field(default_factory=list, description="First few row errors")
+    done: bool = Field(False, description="Whether the import has finished")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "session_id": "session-uuid",
+            "rows_read": 12000,
+            "meals_imported": 4000,
+            "food_items_imported": 11950,
+            "rows_skipped": 50,
+            "seconds": 1.8,
+            "rows_per_second": 6666.7,
+            "errors": ["row 17: Missing food name"],
+            "done": True
+        }
+    })
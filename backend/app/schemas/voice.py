@@ -1,6 +1,6 @@
 """Voice processing related schemas."""
 
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -33,4 +33,14 @@ class VoiceProcessingError(BaseModel):
             "message": "The uploaded audio format is not supported",
             "supported_formats": ["mp3", "wav", "m4a", "webm"]
         }
-    })
\ No newline at end of file
+    })
+
+
+class VoiceSocketMessage(BaseModel):
+    """Client text frame on the voice WebSocket; audio is sent as binary frames."""
+    type: Literal["end", "ping", "pong"] = Field(..., description="Frame type")
+    id: Optional[str] = Field(None, max_length=100, description="Client frame ID echoed on replies")
+    
+    model_config = ConfigDict(json_schema_extra={
+        "example": {"type": "end"}
+    })
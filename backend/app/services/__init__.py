@@ -1,13 +1,27 @@
-"""Services package."""
-
-from app.services.meal_analysis import MealAnalysisService
-from app.services.chat import ChatService
-from app.services.voice import VoiceService
-from app.services.ai_integration import AIIntegrationService
-
-__all__ = [
-    "MealAnalysisService",
-    "ChatService",
-    "VoiceService",
-    "AIIntegrationService"
-]
\ No newline at end of file
+"""Services package.
+
+Services are imported on first attribute access, so importing one service
+module does not load every other service and its dependencies.
+"""
+
+from importlib import import_module
+
+_SERVICES = {
+    "MealAnalysisService": "app.services.meal_analysis",
+    "ChatService": "app.services.chat",
+    "ChatChannel": "app.services.chat_channel",
+    "VoiceService": "app.services.voice",
+    "AIIntegrationService": "app.services.ai_integration",
+    "ExportService": "app.services.export",
+    "HistoryImportService": "app.services.history_import"
+}
+
+__all__ = list(_SERVICES)
+
+
+def __getattr__(name: str):
+    if name not in _SERVICES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_SERVICES[name]), name)
+    globals()[name] = value
+    return value
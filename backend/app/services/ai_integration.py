@@ -2,21 +2,53 @@
 
 import json
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from abc import ABC, abstractmethod
 
 from app.core.config import settings
-from app.services.ai_prompts import prompt_manager
+from app.core.metrics import observe_ai_call, observe_ai_usage
+from app.core.timing import timed
+from app.services.ai_prompts import MealPrompt, expand_meal_analysis, prompt_manager
 from app.services.session_manager import session_manager
 
 logger = logging.getLogger(__name__)
 
+# Shortest prompt prefix Anthropic caches (Haiku models need more). A cache
+# breakpoint on anything shorter is ignored and the prompt billed in full.
+ANTHROPIC_CACHE_MIN_TOKENS = 1024
+ANTHROPIC_HAIKU_CACHE_MIN_TOKENS = 2048
+
+
+@lru_cache(maxsize=None)
+def get_anthropic_client(api_key: str):
+    """
+    Shared Anthropic SDK client.
+    
+    The SDK is imported on first use rather than at startup, and the client
+    (with its connection pool) is reused across requests.
+    """
+    import anthropic
+    return anthropic.AsyncAnthropic(api_key=api_key)
+
+
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: str):
+    """Shared OpenAI SDK client, imported and created on first use."""
+    import openai
+    return openai.AsyncOpenAI(api_key=api_key)
+
 
 class AIClient(ABC):
     """Abstract base class for AI clients."""
     
     @abstractmethod
-    async def analyze_meal(self, description: str, language: str = "auto") -> Dict[str, Any]:
+    async def analyze_meal(
+        self,
+        description: str,
+        language: str = "auto",
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Analyze meal description and return nutrition information."""
         pass
 
@@ -27,14 +59,23 @@ class AnthropicClient(AIClient):
     def __init__(self):
         self.api_key = settings.ANTHROPIC_API_KEY
         self.model = settings.MEAL_ANALYSIS_MODEL or "claude-3-haiku-20240307"
+        self.cache_min_tokens = (
+            ANTHROPIC_HAIKU_CACHE_MIN_TOKENS if "haiku" in self.model else ANTHROPIC_CACHE_MIN_TOKENS
+        )
         
-    async def analyze_meal(self, description: str, language: str = "auto") -> Dict[str, Any]:
+    async def analyze_meal(
+        self,
+        description: str,
+        language: str = "auto",
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze meal using Claude AI.
         
         Args:
             description: Meal description
             language: Language preference (auto, en, zh)
+            transcript: Language and confidence when the description was spoken
             
         Returns:
             Analyzed nutrition data
@@ -43,34 +84,67 @@ class AnthropicClient(AIClient):
             return self._get_mock_response(description)
             
         try:
-            import anthropic
-            
-            client = anthropic.AsyncAnthropic(api_key=self.api_key)
+            client = get_anthropic_client(self.api_key)
             
             # Get user context if available (for future enhancement)
             context = self._get_user_context()
-            prompt = self._create_prompt(description, language, context)
+            with timed("prompt"):
+                prompt = self._create_prompt(description, language, context, transcript)
             
-            response = await client.messages.create(
-                model=self.model,
-                max_tokens=settings.MAX_TOKENS,
-                temperature=settings.TEMPERATURE,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            # The static instructions go in the system prompt, marked as a
+            # cache breakpoint when they are long enough for the model to cache
+            system = {"type": "text", "text": prompt.system}
+            if (
+                settings.PROMPT_CACHE_ENABLED
+                and prompt_manager.meal_analysis_prefix_tokens[prompt.profile] >= self.cache_min_tokens
+            ):
+                system["cache_control"] = {"type": "ephemeral"}
+            
+            with timed("ai"), observe_ai_call("anthropic", self.model):
+                response = await client.messages.create(
+                    model=self.model,
+                    max_tokens=prompt.max_tokens,
+                    temperature=settings.TEMPERATURE,
+                    system=[system],
+                    messages=[
+                        {"role": "user", "content": prompt.user}
+                    ]
+                )
+            self._record_usage(response.usage)
             
             # Parse the response
             content = response.content[0].text
             return self._parse_ai_response(content)
             
         except Exception as e:
-            logger.error(f"Error calling Anthropic API: {e}")
+            logger.error("Error calling Anthropic API: %s", e)
             return self._get_mock_response(description)
     
-    def _create_prompt(self, description: str, language: str, context: Dict = None) -> str:
+    def _create_prompt(
+        self,
+        description: str,
+        language: str,
+        context: Dict = None,
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> MealPrompt:
         """Create prompt for meal analysis using optimized prompt manager."""
-        return prompt_manager.get_meal_analysis_prompt(description, language, context)
+        prompt = prompt_manager.build_meal_analysis_prompt(description, language, context, transcript)
+        prompt_manager.observe_meal_prompt(prompt)
+        return prompt
+    
+    def _record_usage(self, usage: Any) -> None:
+        """Count billed tokens, including prompt cache reads and writes."""
+        if usage is None:
+            return
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        observe_ai_usage(
+            "anthropic", self.model, usage.input_tokens, usage.output_tokens, cache_read, cache_write
+        )
+        logger.info(
+            "AI usage: %d input tokens, %d read from and %d written to the prompt cache, %d output tokens",
+            usage.input_tokens, cache_read, cache_write, usage.output_tokens
+        )
     
     def _get_user_context(self, session_id: str = None) -> Dict:
         """Get user context for personalized responses."""
@@ -85,12 +159,16 @@ class AnthropicClient(AIClient):
             import re
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
-                return json.loads(json_match.group())
+                return expand_meal_analysis(json.loads(json_match.group()))
             else:
                 # If no JSON found, return mock response
                 return self._get_mock_response("")
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse AI response as JSON: {content}")
+        except json.JSONDecodeError as e:
+            # Model output can be long and user-specific; log its size and a short prefix
+            logger.error(
+                "Failed to parse AI response as JSON (%d chars): %s; starts with %.200r",
+                len(content), e, content
+            )
             return self._get_mock_response("")
     
     def _get_mock_response(self, description: str) -> Dict[str, Any]:
@@ -123,13 +201,19 @@ class OpenAIClient(AIClient):
         self.api_key = settings.OPENAI_API_KEY
         self.model = "gpt-4-turbo-preview"
         
-    async def analyze_meal(self, description: str, language: str = "auto") -> Dict[str, Any]:
+    async def analyze_meal(
+        self,
+        description: str,
+        language: str = "auto",
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze meal using OpenAI.
         
         Args:
             description: Meal description
             language: Language preference
+            transcript: Language and confidence when the description was spoken
             
         Returns:
             Analyzed nutrition data
@@ -138,34 +222,57 @@ class OpenAIClient(AIClient):
             return self._get_mock_response(description)
             
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=self.api_key)
+            client = get_openai_client(self.api_key)
             
             context = self._get_user_context()
-            prompt = self._create_prompt(description, language, context)
+            with timed("prompt"):
+                prompt = self._create_prompt(description, language, context, transcript)
             
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a professional nutritionist AI assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=settings.TEMPERATURE,
-                max_tokens=settings.MAX_TOKENS,
-                response_format={"type": "json_object"}
-            )
+            with timed("ai"), observe_ai_call("openai", self.model):
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    # OpenAI caches repeated prompt prefixes automatically, so
+                    # the static instructions lead as the system message
+                    messages=[
+                        {"role": "system", "content": prompt.system},
+                        {"role": "user", "content": prompt.user}
+                    ],
+                    temperature=settings.TEMPERATURE,
+                    max_tokens=prompt.max_tokens,
+                    response_format={"type": "json_object"}
+                )
+            self._record_usage(response.usage)
             
             content = response.choices[0].message.content
-            return json.loads(content)
+            return expand_meal_analysis(json.loads(content))
             
         except Exception as e:
-            logger.error(f"Error calling OpenAI API: {e}")
+            logger.error("Error calling OpenAI API: %s", e)
             return self._get_mock_response(description)
     
-    def _create_prompt(self, description: str, language: str, context: Dict = None) -> str:
+    def _create_prompt(
+        self,
+        description: str,
+        language: str,
+        context: Dict = None,
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> MealPrompt:
         """Create prompt for meal analysis using optimized prompt manager."""
-        return prompt_manager.get_meal_analysis_prompt(description, language, context)
+        prompt = prompt_manager.build_meal_analysis_prompt(description, language, context, transcript)
+        prompt_manager.observe_meal_prompt(prompt)
+        return prompt
+    
+    def _record_usage(self, usage: Any) -> None:
+        """Count billed tokens; cached prompt tokens are part of ``prompt_tokens``."""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        observe_ai_usage("openai", self.model, usage.prompt_tokens - cached, usage.completion_tokens, cached)
+        logger.info(
+            "AI usage: %d input tokens, %d read from the prompt cache, %d output tokens",
+            usage.prompt_tokens - cached, cached, usage.completion_tokens
+        )
     
     def _get_user_context(self) -> Dict:
         """Get user context for personalized responses."""
@@ -190,7 +297,13 @@ class AIIntegrationService:
         else:
             return AnthropicClient()
     
-    async def analyze_meal(self, description: str, language: str = "auto", session_id: str = None) -> Dict[str, Any]:
+    async def analyze_meal(
+        self,
+        description: str,
+        language: str = "auto",
+        session_id: str = None,
+        transcript: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze meal description using configured AI provider.
         
@@ -198,6 +311,7 @@ class AIIntegrationService:
             description: Meal description from user
             language: Language preference
             session_id: Optional session ID for context
+            transcript: Language and confidence when the description was spoken
             
         Returns:
             Structured nutrition data with context awareness
@@ -214,7 +328,7 @@ class AIIntegrationService:
             context = {}
         
         # Analyze with context
-        result = await self.client.analyze_meal(description, language)
+        result = await self.client.analyze_meal(description, language, transcript)
         
         # Update session with results
         if session_id and result.get("nutrition"):
@@ -3,56 +3,133 @@ AI Prompt Templates for Cal AI
 Optimized prompts for different conversation scenarios
 """
 
-from typing import Dict, Any
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 import json
 
+from app.core.config import settings
+from app.core.metrics import AI_PROMPT_TOKENS
 
-class PromptManager:
-    """Manager for AI prompt templates."""
-    
-    def __init__(self):
-        self.system_prompt = """你是 Cal AI，一位专业、友好、关怀的AI营养师助手。
+logger = logging.getLogger(__name__)
 
-核心能力：
-1. 精确分析食物营养成分（卡路里、蛋白质、碳水化合物、脂肪、纤维、糖分、钠）
-2. 提供个性化营养建议
-3. 支持中英文双语对话
-4. 记录和追踪用户饮食习惯
-5. 回答营养健康相关问题
+# Transcripts below this confidence get a note that words may be misheard
+LOW_TRANSCRIPT_CONFIDENCE = 0.7
 
-性格特点：
-- 专业但不严肃，像朋友一样关心用户健康
-- 鼓励为主，避免批评
-- 提供实用可行的建议
-- 用简单易懂的语言解释复杂概念"""
+PROMPT_PROFILES = ("full", "compact", "minimal")
 
-    def get_meal_analysis_prompt(self, description: str, language: str, context: Dict = None) -> str:
-        """Generate prompt for meal analysis."""
-        
-        # Language instructions
-        lang_map = {
-            "zh": "请用中文回复",
-            "en": "Please respond in English",
-            "auto": "请用与用户输入相同的语言回复"
-        }
-        lang_instruction = lang_map.get(language, lang_map["auto"])
-        
-        # Context information
-        context_info = ""
-        if context:
-            if context.get("user_goals"):
-                context_info += f"\n用户目标：{context['user_goals']}"
-            if context.get("dietary_restrictions"):
-                context_info += f"\n饮食限制：{context['dietary_restrictions']}"
-            if context.get("daily_intake"):
-                context_info += f"\n今日已摄入：{context['daily_intake']}卡路里"
-        
-        return f"""{self.system_prompt}
+# Optional meal analysis context, in the order it is dropped to fit the token budget
+TRIM_ORDER = ("user_goals", "daily_intake", "dietary_restrictions", "transcript")
+
+# Runs of CJK characters and punctuation, which tokenize to about one token each
+_CJK_PATTERN = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]+")
+
+# Reply language instruction per requested language
+REPLY_LANGUAGES = {
+    "zh": "请用中文回复",
+    "en": "Please respond in English",
+    "auto": "请用与用户输入相同的语言回复"
+}
+INPUT_LABEL = "用户输入："
+
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """``tiktoken`` encoding when the package is installed, else None."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except ImportError:
+        logger.debug("tiktoken not installed, estimating prompt tokens from characters")
+        return None
 
-用户输入：{description}
-{context_info}
 
-任务要求：
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a prompt.
+    
+    Uses the ``cl100k_base`` tokenizer when ``tiktoken`` is installed. It is
+    not the tokenizer of every provider, but close enough for budgeting.
+    Without it, CJK characters count as one token each and other text as
+    one token per four characters.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    if text.isascii():
+        return math.ceil(len(text) / 4)
+    cjk = sum(map(len, _CJK_PATTERN.findall(text)))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@lru_cache(maxsize=4096)
+def _render_context(
+    user_goals: Any, dietary_restrictions: Any, daily_intake: Any
+) -> Tuple[Tuple[Tuple[str, str], ...], str]:
+    """
+    Render the optional session context lines.
+    
+    Goals and restrictions rarely change and are often the defaults, so
+    the rendered lines are reused across requests.
+    
+    Returns:
+        ``(name, text)`` for each line, and the lines joined
+    """
+    sections = []
+    if user_goals:
+        sections.append(("user_goals", f"用户目标：{user_goals}\n"))
+    if dietary_restrictions:
+        sections.append(("dietary_restrictions", f"饮食限制：{dietary_restrictions}\n"))
+    if daily_intake:
+        sections.append(("daily_intake", f"今日已摄入：{daily_intake}卡路里\n"))
+    return tuple(sections), "".join(text for _, text in sections)
+
+
+def truncate_to_tokens(text: str, limit: int) -> str:
+    """Cut ``text`` down to at most ``limit`` estimated tokens."""
+    tokens = estimate_tokens(text)
+    while text and tokens > limit:
+        text = text[:min(len(text) - 1, len(text) * max(limit, 0) // tokens)]
+        tokens = estimate_tokens(text)
+    return text
+
+
+class MealPrompt(NamedTuple):
+    """
+    A rendered meal analysis prompt.
+    
+    ``system`` is the profile's static instructions, identical for every
+    request so providers can cache it; ``user`` holds everything that
+    varies per request.
+    """
+    system: str
+    user: str
+    system_tokens: int
+    profile: str
+    dropped: Tuple[str, ...]
+    
+    @property
+    def tokens(self) -> int:
+        """Estimated size of the whole prompt, computed on each access."""
+        return self.system_tokens + estimate_tokens(self.user)
+    
+    @property
+    def text(self) -> str:
+        """The whole prompt as a single message."""
+        return f"{self.system}\n\n{self.user}"
+    
+    @property
+    def max_tokens(self) -> int:
+        """Output token limit for the profile's response format."""
+        return settings.MAX_TOKENS_BY_PROFILE.get(self.profile, settings.MAX_TOKENS)
+
+
+# Meal analysis instructions and output format for each profile. They do
+# not depend on the request, so each is rendered once and reused.
+MEAL_ANALYSIS_INSTRUCTIONS = {
+    "full": """任务要求：
 1. 分析用户输入的类型：
    a) 具体食物描述 → 进行营养分析
    b) 健康咨询问题 → 提供专业建议
@@ -60,16 +137,16 @@ class PromptManager:
    d) 日常对话 → 友好回应并引导到健康话题
 
 2. 回复要求：
-   - {lang_instruction}
+   - 按下方"回复语言"回复
    - 保持友好、鼓励的语气
    - 提供具体、可执行的建议
    - 适当使用表情符号增加亲和力（1-2个即可）
 
 3. 输出格式（JSON）：
-{{
+{
     "input_type": "food|question|query|chat",
     "food_items": [
-        {{
+        {
             "name": "食物名称（英文）",
             "name_cn": "食物名称（中文）",
             "amount": "数量",
@@ -81,20 +158,237 @@ class PromptManager:
             "fiber": 纤维克数,
             "sugar": 糖分克数,
             "sodium": 钠毫克数
-        }}
+        }
     ],
     "analysis_notes": "营养分析要点（如有）",
     "ai_response": "给用户的自然语言回复",
     "suggestions": ["建议1", "建议2", "建议3"],
     "health_score": 1-10的健康评分（如适用）
-}}
+}
 
 注意事项：
 - 如果是食物，尽可能准确计算营养成分
 - 如果份量不明确，使用常见默认份量并说明
 - 如果不是食物相关输入，food_items可为空数组
 - 始终提供有价值的回复，不要说"我不知道"
-- 对不健康食物，委婉建议改善，不要批评"""
+- 对不健康食物，委婉建议改善，不要批评""",
+    "compact": """估算用户所吃食物的营养成分；份量不明确时用常见份量并说明。非食物输入时f为空数组，友好回应并引导到健康话题。语气友好、鼓励，不批评。
+只输出JSON，每种食物一个数组：
+{"f":[[英文名,中文名,数量,单位,千卡,蛋白质g,碳水g,脂肪g,纤维g,糖g,钠mg]],"n":"营养要点","r":"给用户的回复"}
+例：{"f":[["Rice","米饭","1","碗",232,4.3,51,0.4,0.6]],"r":"..."}
+数值用数字；末尾未知的纤维、糖、钠可省略；没有需要说明的要点或假设时省略n。""",
+    "minimal": """估算食物营养，份量不明时用常见份量。只输出JSON，每种食物一个数组：
+{"f":[[英文名,中文名,数量,单位,千卡,蛋白质g,碳水g,脂肪g,纤维g,糖g,钠mg]],"r":"一句话回复"}
+数值用数字；末尾未知的纤维、糖、钠可省略。"""
+}
+
+# Food item fields in the order of the positional arrays (``f``) that the
+# compact and minimal profiles ask for; trailing fields may be left out
+SHORT_FOOD_FIELDS = (
+    "name", "name_cn", "amount", "unit", "calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium"
+)
+
+
+def expand_meal_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Expand a short-key analysis into the ``food_items`` form.
+    
+    ``{"f": [[name, name_cn, amount, ...]], "n": notes, "r": reply}``
+    becomes ``{"food_items": [{"name": ..., ...}], "analysis_notes": ...,
+    "ai_response": ...}``; null and omitted values are left out so the
+    ``FoodItemSchema`` defaults apply. Analyses already in that form are
+    returned unchanged.
+    """
+    if "f" not in data:
+        return data
+    
+    food_items = []
+    for row in data.get("f") or []:
+        if isinstance(row, dict):
+            food_items.append(row)
+        elif isinstance(row, list):
+            food_items.append({
+                field: value for field, value in zip(SHORT_FOOD_FIELDS, row) if value is not None
+            })
+    
+    expanded = {"food_items": food_items, "ai_response": data.get("r") or ""}
+    if data.get("n"):
+        expanded["analysis_notes"] = data["n"]
+    return expanded
+
+
+class PromptManager:
+    """Manager for AI prompt templates."""
+    
+    def __init__(self):
+        self.system_prompt = """你是 Cal AI，一位专业、友好、关怀的AI营养师助手。
+
+核心能力：
+1. 精确分析食物营养成分（卡路里、蛋白质、碳水化合物、脂肪、纤维、糖分、钠）
+2. 提供个性化营养建议
+3. 支持中英文双语对话
+4. 记录和追踪用户饮食习惯
+5. 回答营养健康相关问题
+
+性格特点：
+- 专业但不严肃，像朋友一样关心用户健康
+- 鼓励为主，避免批评
+- 提供实用可行的建议
+- 用简单易懂的语言解释复杂概念"""
+        self.compact_system_prompt = "你是 Cal AI，专业友好的AI营养师。"
+        
+        # Static part of the meal analysis prompt per profile, and its size
+        self.meal_analysis_prefixes = {
+            "full": f"{self.system_prompt}\n\n{MEAL_ANALYSIS_INSTRUCTIONS['full']}",
+            "compact": f"{self.compact_system_prompt}\n{MEAL_ANALYSIS_INSTRUCTIONS['compact']}",
+            "minimal": MEAL_ANALYSIS_INSTRUCTIONS["minimal"]
+        }
+        self.meal_analysis_prefix_tokens = {
+            profile: estimate_tokens(prefix) for profile, prefix in self.meal_analysis_prefixes.items()
+        }
+        
+        # The reply language line per language, rendered once, with the
+        # estimate of it plus the input label
+        self._meal_analysis_heads = {}
+        for language, instruction in REPLY_LANGUAGES.items():
+            head = f"回复语言：{instruction}\n"
+            self._meal_analysis_heads[language] = (head, estimate_tokens(head) + estimate_tokens(INPUT_LABEL))
+        self._prompt_token_metrics = {profile: AI_PROMPT_TOKENS.labels(profile) for profile in PROMPT_PROFILES}
+
+    def get_meal_analysis_prompt(
+        self,
+        description: str,
+        language: str,
+        context: Dict = None,
+        transcript: Optional[Dict[str, Any]] = None,
+        profile: Optional[str] = None
+    ) -> str:
+        """Generate prompt for meal analysis."""
+        profile, user, _ = self._render_meal_analysis(description, language, context, transcript, profile, None)
+        return f"{self.meal_analysis_prefixes[profile]}\n\n{user}"
+
+    def build_meal_analysis_prompt(
+        self,
+        description: str,
+        language: str,
+        context: Dict = None,
+        transcript: Optional[Dict[str, Any]] = None,
+        profile: Optional[str] = None,
+        token_budget: Optional[int] = None
+    ) -> MealPrompt:
+        """
+        Render a meal analysis prompt within a token budget.
+        
+        The profile's precomputed instructions form the system part, and
+        the reply language, optional context and the user's input the user
+        part. When the
+        estimate exceeds the budget, optional context is dropped in
+        ``TRIM_ORDER``; if that is not enough, the input is shortened.
+        A token is at least one UTF-8 byte and a character at most four, so
+        a prompt that fits at four tokens per character is not estimated at
+        all; the parts are only estimated one by one when the whole prompt
+        does not fit.
+        
+        ``transcript`` describes spoken input (``language`` and
+        ``confidence`` from speech-to-text). Its detected language is used
+        when no language was requested, and low confidence asks the model
+        to allow for misheard food names.
+        
+        Args:
+            description: User input
+            language: Reply language (auto, en, zh)
+            context: Session context from ``SessionManager.get_context_for_ai``
+            transcript: Language and confidence when the input was spoken
+            profile: ``full``, ``compact`` or ``minimal``; ``PROMPT_PROFILE`` by default
+            token_budget: Largest prompt in estimated tokens; ``PROMPT_TOKEN_BUDGET`` by default
+            
+        Returns:
+            MealPrompt with the system and user parts and the sections
+            dropped to fit
+            
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        profile, user, dropped = self._render_meal_analysis(
+            description, language, context, transcript, profile, token_budget
+        )
+        return MealPrompt(
+            self.meal_analysis_prefixes[profile], user, self.meal_analysis_prefix_tokens[profile], profile, dropped
+        )
+
+    def _render_meal_analysis(
+        self,
+        description: str,
+        language: str,
+        context: Optional[Dict],
+        transcript: Optional[Dict[str, Any]],
+        profile: Optional[str],
+        token_budget: Optional[int]
+    ) -> Tuple[str, str, Tuple[str, ...]]:
+        """Resolve the profile and render the user part; returns (profile, user, dropped sections)."""
+        profile = profile or settings.PROMPT_PROFILE
+        if profile not in self.meal_analysis_prefixes:
+            raise ValueError(f"Unknown prompt profile: {profile}")
+        budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+        
+        # Language instructions
+        if transcript and language in (None, "auto") and transcript.get("language") in REPLY_LANGUAGES:
+            language = transcript["language"]
+        head, head_tokens = self._meal_analysis_heads.get(language, self._meal_analysis_heads["auto"])
+        prefix_tokens = self.meal_analysis_prefix_tokens[profile]
+        
+        # Context information
+        sections: Tuple[Tuple[str, str], ...] = ()
+        context_text = ""
+        if context:
+            values = (context.get("user_goals"), context.get("dietary_restrictions"), context.get("daily_intake"))
+            try:
+                sections, context_text = _render_context(*values)
+            except TypeError:
+                # Unhashable values are rendered without the cache
+                sections, context_text = _render_context.__wrapped__(*values)
+        
+        if transcript:
+            note = (
+                f"输入来源：语音转写（识别语言：{transcript.get('language') or '未知'}，"
+                f"置信度：{transcript.get('confidence', 0):.2f}）\n"
+            )
+            if transcript.get("confidence", 0) < LOW_TRANSCRIPT_CONFIDENCE:
+                note += "转写可能有误：请按读音相近的常见食物理解，并在analysis_notes中说明所作的假设\n"
+            sections += (("transcript", note),)
+            context_text += note
+        
+        dropped: List[str] = []
+        user = head + context_text + INPUT_LABEL + description
+        fits = prefix_tokens + 4 * len(user) <= budget or prefix_tokens + estimate_tokens(user) <= budget
+        if not fits:
+            section_tokens = {name: estimate_tokens(text) for name, text in sections}
+            description_tokens = estimate_tokens(description)
+            tokens = prefix_tokens + head_tokens + sum(section_tokens.values()) + description_tokens
+            
+            for name in TRIM_ORDER:
+                if tokens <= budget:
+                    break
+                if name in section_tokens:
+                    tokens -= section_tokens.pop(name)
+                    dropped.append(name)
+            
+            if tokens > budget:
+                description = truncate_to_tokens(description, budget - tokens + description_tokens)
+                dropped.append("description")
+            user = (
+                head
+                + "".join(text for name, text in sections if name in section_tokens)
+                + INPUT_LABEL
+                + description
+            )
+            logger.warning("Meal analysis prompt over %d token budget, dropped %s", budget, ", ".join(dropped))
+        
+        return profile, user, tuple(dropped)
+
+    def observe_meal_prompt(self, prompt: MealPrompt) -> None:
+        """Record the estimated size of a prompt about to be sent."""
+        self._prompt_token_metrics[prompt.profile].observe(prompt.tokens)
 
     def get_conversation_prompt(self, message: str, chat_history: list = None) -> str:
         """Generate prompt for general conversation."""
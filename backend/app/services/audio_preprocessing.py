@@ -0,0 +1,289 @@
+"""Audio preprocessing: decode, downmix, resample, trim silence and normalize.
+
+Everything works on fixed-size blocks, so memory use does not depend on the
+length of the recording. The first pass decodes, downmixes, resamples and
+trims silence into a float32 scratch file while measuring the speech level;
+the second applies the loudness gain and writes 16-bit mono WAV.
+"""
+
+import json
+import shutil
+import subprocess
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+BLOCK_SECONDS = 1.0
+FRAME_MS = 20
+MAX_GAIN_DB = 30.0
+PEAK_LIMIT = 0.99
+
+
+class AudioDecodeError(ValueError):
+    """Raised when an audio file cannot be decoded."""
+
+
+def iter_wav_blocks(path: str, block_seconds: float = BLOCK_SECONDS) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Decode PCM WAV with the standard library.
+
+    Returns:
+        Sample rate and an iterator of float32 blocks shaped (frames, channels)
+    """
+    try:
+        reader = wave.open(path, "rb")
+    except (wave.Error, EOFError) as e:
+        raise AudioDecodeError(f"Unsupported WAV file: {e}")
+
+    rate, channels, width = reader.getframerate(), reader.getnchannels(), reader.getsampwidth()
+    if width not in (1, 2, 3, 4):
+        reader.close()
+        raise AudioDecodeError(f"Unsupported WAV sample width: {width} bytes")
+
+    def blocks() -> Iterator[np.ndarray]:
+        with reader:
+            while True:
+                data = reader.readframes(int(rate * block_seconds))
+                if not data:
+                    return
+                yield _pcm_to_float(data, width).reshape(-1, channels)
+
+    return rate, blocks()
+
+
+def _pcm_to_float(data: bytes, width: int) -> np.ndarray:
+    """Convert little-endian PCM samples to float32 in [-1, 1)."""
+    if width == 1:
+        return (np.frombuffer(data, np.uint8).astype(np.float32) - 128.0) / 128.0
+    if width == 2:
+        return np.frombuffer(data, "<i2").astype(np.float32) / 32768.0
+    if width == 3:
+        # Pad each 24-bit sample into the top of an int32
+        raw = np.frombuffer(data, np.uint8).reshape(-1, 3)
+        padded = np.zeros((raw.shape[0], 4), np.uint8)
+        padded[:, 1:] = raw
+        return padded.view("<i4").ravel().astype(np.float32) / 2147483648.0
+    return np.frombuffer(data, "<i4").astype(np.float32) / 2147483648.0
+
+
+def iter_ffmpeg_blocks(path: str, block_seconds: float = BLOCK_SECONDS) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Decode compressed formats (mp3, m4a, webm) by piping ``ffmpeg`` output.
+
+    Raises:
+        AudioDecodeError: If ffmpeg is not installed or cannot read the file
+    """
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        raise AudioDecodeError("ffmpeg is required to decode compressed audio")
+
+    probe = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=sample_rate,channels", "-of", "json", path],
+        capture_output=True, text=True
+    )
+    try:
+        stream = json.loads(probe.stdout)["streams"][0]
+        rate, channels = int(stream["sample_rate"]), int(stream["channels"])
+    except (ValueError, KeyError, IndexError):
+        raise AudioDecodeError(f"No audio stream found: {probe.stderr.strip()[:200]}")
+
+    def blocks() -> Iterator[np.ndarray]:
+        process = subprocess.Popen(
+            ["ffmpeg", "-v", "error", "-i", path, "-f", "f32le", "-acodec", "pcm_f32le", "-"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        block_bytes = int(rate * block_seconds) * channels * 4
+        try:
+            while True:
+                data = process.stdout.read(block_bytes)
+                if not data:
+                    return
+                usable = len(data) - len(data) % (channels * 4)
+                yield np.frombuffer(data[:usable], "<f4").reshape(-1, channels)
+        finally:
+            process.kill()
+            process.wait()
+
+    return rate, blocks()
+
+
+def decode_blocks(path: str, audio_format: str) -> Tuple[int, Iterator[np.ndarray]]:
+    """Sample rate and float32 (frames, channels) blocks of an audio file."""
+    if audio_format == "wav":
+        return iter_wav_blocks(path)
+    return iter_ffmpeg_blocks(path)
+
+
+class StreamingResampler:
+    """
+    Block-wise sample rate conversion.
+
+    Downsampling first applies a windowed-sinc low-pass filter so content
+    above the new Nyquist frequency does not alias, then interpolates
+    linearly. Filter history and the fractional read position carry over
+    between blocks, so the output matches resampling the whole signal.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, taps: int = 63):
+        self.step = source_rate / target_rate
+        self.position = 0.0
+        self.previous = np.zeros(1, np.float32)
+        self.kernel = None
+        if source_rate > target_rate:
+            cutoff = 0.45 * target_rate / source_rate
+            n = np.arange(taps) - (taps - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self.kernel = (kernel / kernel.sum()).astype(np.float32)
+            self.history = np.zeros(taps - 1, np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.step == 1.0:
+            return block
+        if self.kernel is not None:
+            padded = np.concatenate([self.history, block])
+            self.history = padded[-(len(self.kernel) - 1):]
+            block = np.convolve(padded, self.kernel, mode="valid").astype(np.float32)
+
+        n = len(block)
+        if n == 0:
+            return block
+        count = int((n - 1 - self.position) // self.step) + 1 if self.position <= n - 1 else 0
+        # Index 0 of ``source`` is the last sample of the previous block
+        source = np.concatenate([self.previous, block])
+        positions = self.position + self.step * np.arange(count)
+        output = np.interp(positions + 1, np.arange(n + 1), source).astype(np.float32)
+
+        self.position += self.step * count - n
+        self.previous = block[-1:]
+        return output
+
+
+class SilenceTrimmer:
+    """
+    Energy-based voice activity trimming in fixed frames.
+
+    Frames whose RMS level is below ``threshold_db`` (dBFS) are silence.
+    Leading and trailing silence is dropped except for ``padding_ms`` next
+    to speech, and pauses inside the recording are shortened to at most
+    twice the padding. At most ``padding_ms`` of the current pause is held
+    in memory.
+    """
+
+    def __init__(self, sample_rate: int, threshold_db: float = -45.0, padding_ms: int = 200):
+        self.frame = sample_rate * FRAME_MS // 1000
+        self.threshold = 10 ** (threshold_db / 20)
+        self.pad_frames = max(1, padding_ms // FRAME_MS)
+        self.pending = np.zeros(0, np.float32)
+        self.heard_speech = False
+        self.hangover = 0
+        self.pause: deque = deque(maxlen=self.pad_frames)
+        self.speech_sum_squares = 0.0
+        self.speech_samples = 0
+        self.peak = 0.0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        samples = np.concatenate([self.pending, block])
+        usable = len(samples) - len(samples) % self.frame
+        self.pending = samples[usable:]
+        if not usable:
+            return np.zeros(0, np.float32)
+
+        frames = samples[:usable].reshape(-1, self.frame)
+        energy = np.mean(frames * frames, axis=1)
+        voiced = energy >= self.threshold ** 2
+
+        output = []
+        for frame, is_voiced, frame_energy in zip(frames, voiced, energy):
+            if is_voiced:
+                output.extend(self.pause)
+                self.pause.clear()
+                output.append(frame)
+                self.heard_speech = True
+                self.hangover = self.pad_frames
+                self.speech_sum_squares += float(frame_energy) * self.frame
+                self.speech_samples += self.frame
+            elif self.hangover and self.heard_speech:
+                output.append(frame)
+                self.hangover -= 1
+            else:
+                self.pause.append(frame)
+
+        if not output:
+            return np.zeros(0, np.float32)
+        kept = np.concatenate(output)
+        self.peak = max(self.peak, float(np.max(np.abs(kept))))
+        return kept
+
+    def gain(self, target_db: float) -> float:
+        """Gain bringing speech to ``target_db`` RMS without clipping."""
+        if not self.speech_samples:
+            return 1.0
+        rms = np.sqrt(self.speech_sum_squares / self.speech_samples)
+        gain = min(10 ** (target_db / 20) / rms, 10 ** (MAX_GAIN_DB / 20))
+        if self.peak * gain > PEAK_LIMIT:
+            gain = PEAK_LIMIT / self.peak
+        return float(gain)
+
+
+def preprocess_audio(
+    source: str,
+    audio_format: str,
+    destination: str,
+    sample_rate: int = 16000,
+    threshold_db: float = -45.0,
+    padding_ms: int = 200,
+    target_db: float = -20.0
+) -> Tuple[float, float]:
+    """
+    Convert an audio file to trimmed, normalized 16-bit mono WAV.
+
+    Args:
+        source: Input audio file
+        audio_format: Sniffed format of the input
+        destination: Output WAV path
+        sample_rate: Output sample rate
+        threshold_db: Frame level (dBFS) below which audio counts as silence
+        padding_ms: Silence kept next to speech
+        target_db: RMS level of speech after normalization
+
+    Returns:
+        Input and output duration in seconds
+
+    Raises:
+        AudioDecodeError: If the input cannot be decoded
+    """
+    source_rate, blocks = decode_blocks(source, audio_format)
+    resampler = StreamingResampler(source_rate, sample_rate)
+    trimmer = SilenceTrimmer(sample_rate, threshold_db, padding_ms)
+    scratch_path = Path(destination).with_suffix(".f32")
+    input_frames = 0
+    output_samples = 0
+
+    try:
+        with open(scratch_path, "wb") as scratch:
+            for block in blocks:
+                input_frames += len(block)
+                mono = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+                kept = trimmer.process(resampler.process(mono))
+                kept.tofile(scratch)
+                output_samples += len(kept)
+
+        gain = trimmer.gain(target_db)
+        chunk = int(sample_rate * BLOCK_SECONDS)
+        with open(scratch_path, "rb") as scratch, wave.open(destination, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(sample_rate)
+            while True:
+                samples = np.fromfile(scratch, np.float32, count=chunk)
+                if not len(samples):
+                    break
+                pcm = np.clip(samples * gain, -1.0, 32767 / 32768) * 32768
+                writer.writeframes(pcm.astype("<i2").tobytes())
+    finally:
+        scratch_path.unlink(missing_ok=True)
+
+    return input_frames / source_rate, output_samples / sample_rate
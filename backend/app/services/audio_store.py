@@ -0,0 +1,293 @@
+"""Content-addressed staging storage for uploaded audio with a disk quota."""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+import aiofiles
+
+from app.core.config import settings
+from app.core.metrics import AUDIO_STAGING_BYTES, AUDIO_STAGING_EXPIRED, AUDIO_STAGING_FILES, AUDIO_STAGING_REJECTED
+
+logger = logging.getLogger(__name__)
+
+# How often a write waiting for quota checks whether space was freed
+QUOTA_POLL_SECONDS = 0.05
+
+
+class StagingFullError(RuntimeError):
+    """Raised when staging storage stays over its quota for too long."""
+
+
+class PartialFile:
+    """
+    An upload being written to staging storage.
+
+    Every chunk is counted against the store's quota before it is written.
+    Used as an async context manager; leaving it with an exception removes
+    the file and returns its bytes to the quota.
+    """
+
+    def __init__(self, store: "AudioStore", path: Path):
+        self.store = store
+        self.path = path
+        self.size = 0
+        self._file = None
+
+    async def __aenter__(self) -> "PartialFile":
+        self._file = await aiofiles.open(self.path, "wb")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        await self._file.close()
+        if exc_type is not None:
+            self.discard()
+        return False
+
+    async def write(self, data: bytes) -> None:
+        """
+        Append data once the quota has room for it.
+
+        Raises:
+            StagingFullError: If no space frees up within the store's wait time
+        """
+        await self.store.reserve(len(data))
+        self.size += len(data)
+        await self._file.write(data)
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.store.forget(self.size, files=1)
+
+
+class AudioStore:
+    """
+    Staged audio files named by the SHA-256 of their content.
+
+    Each upload is written once as ``<digest>.<format>``; every request
+    using it holds its own hard link ``<digest>.<id>.<format>`` to that
+    content. The link count is the reference count, so it is shared by all
+    worker processes using the directory: releasing a handle removes the
+    link, and the last one out removes the content file too. A retried
+    upload of the same clip therefore shares the bytes already on disk.
+
+    Writes are held to ``quota_bytes`` for the whole directory. A write
+    that does not fit waits up to ``quota_wait`` seconds for space to be
+    released, then fails with ``StagingFullError``. Files left behind by
+    crashed or abandoned requests are removed by ``run_janitor`` once they
+    are older than ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        quota_bytes: int = 512 * 1024 * 1024,
+        quota_wait: float = 5.0,
+        ttl: float = 3600.0
+    ):
+        """
+        Initialize audio store.
+
+        Args:
+            directory: Staging directory, possibly shared with other workers
+            quota_bytes: Disk space staged files may take up
+            quota_wait: Seconds a write waits for space before failing
+            ttl: Age after which the janitor removes a file
+        """
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.quota_wait = quota_wait
+        self.ttl = ttl
+        self.used_bytes = 0
+        self.files = 0
+        self._scanned = False
+
+    def open_partial(self) -> PartialFile:
+        """Start writing an upload; use with ``async with``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self._scanned:
+            self.scan()
+        self.files += 1
+        self._report()
+        return PartialFile(self, self.directory / f"{uuid.uuid4()}.part")
+
+    def content_path(self, digest: str, audio_format: str) -> Path:
+        return self.directory / f"{digest}.{audio_format}"
+
+    def commit(self, partial: PartialFile, digest: str, audio_format: str) -> Tuple[Path, bool]:
+        """
+        Store a fully written upload under its digest.
+
+        Args:
+            partial: Upload written through ``open_partial``, consumed by this call
+            digest: SHA-256 hex digest of its content
+            audio_format: Format used as the file extension
+
+        Returns:
+            Handle path for the caller to read and later ``release``, and
+            whether the content was already staged
+        """
+        handle = self.acquire(digest, audio_format)
+        if handle is not None:
+            partial.discard()
+            return handle, True
+
+        os.replace(partial.path, self.content_path(digest, audio_format))
+        handle = self.acquire(digest, audio_format)
+        if handle is None:
+            # Expired by another process in between; keep our own copy
+            handle = self.content_path(digest, audio_format)
+        return handle, False
+
+    def acquire(self, digest: str, audio_format: str) -> Optional[Path]:
+        """Take another reference to staged content, or None if it is not staged."""
+        content = self.content_path(digest, audio_format)
+        handle = self.directory / f"{digest}.{uuid.uuid4().hex[:12]}.{audio_format}"
+        try:
+            os.link(content, handle)
+            # Links share the inode, so this keeps every handle clear of the janitor
+            os.utime(content)
+        except FileNotFoundError:
+            return None
+        return handle
+
+    def release(self, handle: Path) -> None:
+        """Drop a reference; the content goes with the last one."""
+        digest, _, audio_format = handle.name.partition(".")
+        audio_format = audio_format.rpartition(".")[2]
+        content = self.content_path(digest, audio_format)
+        try:
+            handle.unlink(missing_ok=True)
+            stat = content.stat()
+            if handle == content or stat.st_nlink == 1:
+                content.unlink(missing_ok=True)
+                self.forget(stat.st_size, files=1)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error releasing staged audio %s: %s", handle, e)
+
+    def references(self, digest: str, audio_format: str) -> int:
+        """Handles currently held on staged content."""
+        try:
+            return self.content_path(digest, audio_format).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    async def reserve(self, size: int) -> None:
+        """
+        Count ``size`` bytes against the quota, waiting for room if needed.
+
+        Raises:
+            StagingFullError: If the quota is still exceeded after ``quota_wait`` seconds
+        """
+        deadline = time.monotonic() + self.quota_wait
+        while self.used_bytes + size > self.quota_bytes:
+            # Other workers and derived files (preprocessed audio) are only
+            # seen by scanning the directory
+            self.scan()
+            if self.used_bytes + size <= self.quota_bytes:
+                break
+            if time.monotonic() >= deadline:
+                AUDIO_STAGING_REJECTED.inc()
+                raise StagingFullError(
+                    "Audio staging storage is full, please retry shortly"
+                )
+            await asyncio.sleep(QUOTA_POLL_SECONDS)
+        self.used_bytes += size
+        self._report()
+
+    def forget(self, size: int, files: int = 0) -> None:
+        """Return bytes and files removed from the directory."""
+        self.used_bytes = max(self.used_bytes - size, 0)
+        self.files = max(self.files - files, 0)
+        self._report()
+
+    def scan(self) -> None:
+        """Recount bytes and files held in the directory, each inode once."""
+        inodes = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+        except FileNotFoundError:
+            pass
+        self.used_bytes = sum(inodes.values())
+        self.files = len(inodes)
+        self._scanned = True
+        self._report()
+
+    def sweep(self) -> Tuple[int, int]:
+        """
+        Remove files older than ``ttl`` seconds.
+
+        Returns:
+            Number of files and bytes removed
+        """
+        cutoff = time.time() - self.ttl
+        removed = removed_bytes = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_mtime >= cutoff:
+                            continue
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        continue
+                    removed += 1
+                    if stat.st_nlink <= 1:
+                        removed_bytes += stat.st_size
+        except FileNotFoundError:
+            pass
+        self.scan()
+        if removed:
+            AUDIO_STAGING_EXPIRED.inc(removed)
+        return removed, removed_bytes
+
+    async def run_janitor(self, interval: float, *cleanups: Callable[[], Any]) -> None:
+        """
+        Sweep expired files every ``interval`` seconds, starting now.
+
+        Args:
+            interval: Seconds between sweeps
+            cleanups: Other blocking housekeeping run in a thread after each sweep
+        """
+        while True:
+            removed, removed_bytes = await asyncio.to_thread(self.sweep)
+            if removed:
+                logger.warning(
+                    "Removed %d abandoned audio files (%d bytes) from %s",
+                    removed, removed_bytes, self.directory
+                )
+            for cleanup in cleanups:
+                try:
+                    await asyncio.to_thread(cleanup)
+                except Exception:
+                    logger.exception("Janitor cleanup %s failed", getattr(cleanup, "__name__", cleanup))
+            await asyncio.sleep(interval)
+
+    def _report(self) -> None:
+        AUDIO_STAGING_BYTES.set(self.used_bytes)
+        AUDIO_STAGING_FILES.set(self.files)
+
+
+@lru_cache(maxsize=None)
+def get_audio_store(directory: str) -> AudioStore:
+    """Process-wide store for a staging directory, configured from settings."""
+    return AudioStore(
+        Path(directory),
+        quota_bytes=settings.AUDIO_STAGING_QUOTA_MB * 1024 * 1024,
+        quota_wait=settings.AUDIO_STAGING_QUOTA_WAIT_SECONDS,
+        ttl=settings.AUDIO_STAGING_TTL_SECONDS
+    )
@@ -1,16 +1,23 @@
 """Chat service for managing conversation history."""
 
 import logging
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import uuid
+from datetime import datetime, time
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import desc, func
 
-from app.models.message import Message
+from app.models.message import Message, MessageRole
+from app.models.nutrition import NutritionInfo
 from app.models.session import UserSession
-from app.schemas.chat import ChatMessage, ChatHistoryResponse
+from app.schemas.chat import ChatMessage, ChatHistoryResponse, DailyIntake, MessageRole as ChatMessageRole
+from app.services.food_frequency import food_frequency_tracker
 
 logger = logging.getLogger(__name__)
 
+# Map stored roles onto the schema enum without a per-row lookup by value
+ROLE_TO_SCHEMA = {role: ChatMessageRole(role.value) for role in MessageRole}
+
 
 class ChatService:
     """Service for managing chat history and conversations."""
@@ -81,13 +88,15 @@ class ChatService:
         # Get total count
         total = query.count()
         
-        # Get messages with pagination
-        messages = query.order_by(desc(Message.timestamp)).limit(limit).offset(offset).all()
+        # Get messages with pagination, loading nutrition in batched queries
+        messages = query.options(
+            selectinload(Message.nutrition_data).selectinload(NutritionInfo.food_items)
+        ).order_by(desc(Message.timestamp)).limit(limit).offset(offset).all()
         
         # Reverse to show oldest first (chronological order)
         messages.reverse()
         
-        # Convert to schemas
+        # Convert to schemas; rows come from the database, so skip re-validation
         chat_messages = []
         for msg in messages:
             nutrition_data = None
@@ -107,23 +116,60 @@ class ChatService:
                     ]
                 }
             
-            chat_messages.append(ChatMessage(
+            chat_messages.append(ChatMessage.model_construct(
                 id=msg.id,
                 content=msg.content,
-                role=msg.role,
+                role=ROLE_TO_SCHEMA[msg.role],
                 timestamp=msg.timestamp,
                 nutrition_data=nutrition_data
             ))
         
         has_more = (offset + limit) < total
         
-        return ChatHistoryResponse(
+        return ChatHistoryResponse.model_construct(
             messages=chat_messages,
             total=total,
             session_id=session_id,
             has_more=has_more
         )
     
+    def get_or_create_session(self, session_id: str) -> str:
+        """
+        Make sure a session with the given ID exists.
+        
+        Args:
+            session_id: Session ID chosen by the client
+            
+        Returns:
+            The session ID
+        """
+        exists = self.db.query(UserSession.id).filter(
+            UserSession.id == session_id
+        ).first()
+        if not exists:
+            self.db.add(UserSession(id=session_id, session_token=str(uuid.uuid4())))
+            self.db.commit()
+        return session_id
+    
+    def get_session_version(self, session_id: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """
+        Get a session's message version without loading any messages.
+        
+        Args:
+            session_id: Session ID, or None for the most recently active session
+            
+        Returns:
+            Tuple of resolved session ID and version, or None if not found
+        """
+        query = self.db.query(UserSession.id, UserSession.version)
+        
+        if session_id:
+            row = query.filter(UserSession.id == session_id).first()
+        else:
+            row = query.order_by(desc(UserSession.last_activity)).first()
+        
+        return (row.id, row.version) if row else None
+    
     def clear_session_history(self, session_id: str) -> bool:
         """
         Clear all messages for a session.
@@ -140,11 +186,16 @@ class ChatService:
                 Message.session_id == session_id
             ).delete()
             
+            self.db.query(UserSession).filter(
+                UserSession.id == session_id
+            ).update({UserSession.version: UserSession.version + 1})
+            
             self.db.commit()
+            food_frequency_tracker.invalidate(session_id)
             return True
             
         except Exception as e:
-            logger.error(f"Error clearing session history: {e}")
+            logger.error("Error clearing session history: %s", e)
             self.db.rollback()
             return False
     
@@ -172,19 +223,15 @@ class ChatService:
             Message.session_id == session_id
         ).count()
         
-        # Get messages with nutrition data
-        nutrition_messages = self.db.query(Message).filter(
-            Message.session_id == session_id,
-            Message.nutrition_data_id.isnot(None)
-        ).all()
-        
-        # Calculate total nutrition for the session
-        total_calories = 0
-        total_meals = len(nutrition_messages)
-        
-        for msg in nutrition_messages:
-            if msg.nutrition_data:
-                total_calories += msg.nutrition_data.total_calories
+        # Aggregate meals and calories in SQL rather than loading each meal
+        total_meals, total_calories = self.db.query(
+            func.count(Message.id),
+            func.coalesce(func.sum(NutritionInfo.total_calories), 0)
+        ).join(
+            NutritionInfo, Message.nutrition_data_id == NutritionInfo.id
+        ).filter(
+            Message.session_id == session_id
+        ).one()
         
         return {
             "exists": True,
@@ -194,4 +241,38 @@ class ChatService:
             "message_count": message_count,
             "total_meals_analyzed": total_meals,
             "total_calories_tracked": total_calories
-        }
\ No newline at end of file
+        }
+    
+    def get_daily_intake(self, session_id: str) -> DailyIntake:
+        """
+        Sum today's analyzed meals for a session.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            DailyIntake totals for the current UTC day
+        """
+        today = datetime.utcnow().date()
+        meals, calories, protein, carbs, fat = self.db.query(
+            func.count(Message.id),
+            func.coalesce(func.sum(NutritionInfo.total_calories), 0),
+            func.coalesce(func.sum(NutritionInfo.total_protein), 0),
+            func.coalesce(func.sum(NutritionInfo.total_carbs), 0),
+            func.coalesce(func.sum(NutritionInfo.total_fat), 0)
+        ).join(
+            NutritionInfo, Message.nutrition_data_id == NutritionInfo.id
+        ).filter(
+            Message.session_id == session_id,
+            Message.timestamp >= datetime.combine(today, time.min)
+        ).one()
+        
+        return DailyIntake.model_construct(
+            session_id=session_id,
+            date=today.isoformat(),
+            meals=meals,
+            calories=calories,
+            protein=protein,
+            carbs=carbs,
+            fat=fat
+        )
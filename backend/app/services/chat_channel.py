@@ -0,0 +1,212 @@
+"""WebSocket chat channel running meal analyses concurrently."""
+
+import asyncio
+import logging
+import math
+from typing import Any, Callable, Dict, Optional, Set
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import bind_session_id
+from app.core.rate_limit import SocketRateLimit
+from app.schemas.chat import ChatSocketMessage
+from app.services.chat import ChatService
+from app.services.meal_analysis import MealAnalysisService
+
+logger = logging.getLogger(__name__)
+
+
+class ChatChannel:
+    """
+    Serve one chat WebSocket for a session.
+
+    Each meal frame is analyzed in its own task, at most ``max_concurrent``
+    at a time, and every reply carries the client's message ID. Outgoing
+    frames go through a bounded queue: when the client stops reading, the
+    analyses and then the reader wait, so the socket pushes back instead of
+    buffering without limit. Meals beyond ``max_pending`` are rejected with
+    a ``busy`` error, and meals over the ``/api/analyze-meal`` rate limit
+    with a ``rate_limited`` error. The server pings every ``heartbeat_interval`` seconds
+    and closes the socket after ``idle_timeout`` seconds without a frame.
+
+    Frames sent to the client:
+        ``ready``     session ID the channel is bound to
+        ``progress``  ``stage`` is ``queued`` then ``analyzing``
+        ``result``    ``data`` is a MealAnalysisResponse
+        ``intake``    ``data`` is today's DailyIntake after a result
+        ``error``     ``code`` and ``message`` (and ``retry_after`` when rate limited)
+        ``ping`` / ``pong``
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        session_factory: Callable[[], Session],
+        session_id: str,
+        max_concurrent: int = 3,
+        max_pending: int = 10,
+        send_queue_size: int = 32,
+        heartbeat_interval: float = 20.0,
+        idle_timeout: float = 60.0,
+        rate_limit: Optional[SocketRateLimit] = None
+    ):
+        """
+        Initialize chat channel.
+
+        Args:
+            websocket: Accepted WebSocket connection
+            session_factory: Callable returning a new database session
+            session_id: Existing session the channel logs meals to
+            max_concurrent: Analyses run at the same time
+            max_pending: Analyses running or waiting before new meals are rejected
+            send_queue_size: Outgoing frames buffered before producers wait
+            heartbeat_interval: Seconds between server pings
+            idle_timeout: Seconds without a client frame before closing
+            rate_limit: Charges a route's rate limit buckets, None when limiting is off
+        """
+        self.websocket = websocket
+        self.session_factory = session_factory
+        self.session_id = session_id
+        self.max_pending = max_pending
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.rate_limit = rate_limit
+
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.outbox: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=send_queue_size)
+        self.tasks: Set[asyncio.Task] = set()
+        self.last_seen = asyncio.get_running_loop().time()
+
+    async def run(self) -> None:
+        """Serve the socket until the client leaves or goes idle."""
+        bind_session_id(self.session_id)
+        await self.send({"type": "ready", "session_id": self.session_id})
+
+        reader = asyncio.create_task(self._read_loop())
+        writer = asyncio.create_task(self._write_loop())
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+        done, pending = await asyncio.wait(
+            {reader, writer, heartbeat}, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending | self.tasks:
+            task.cancel()
+        await asyncio.gather(*pending, *self.tasks, return_exceptions=True)
+
+        if heartbeat in done:
+            logger.info("Closing idle chat socket for session %s", self.session_id)
+            try:
+                await self.websocket.close(code=status.WS_1001_GOING_AWAY)
+            except RuntimeError:
+                pass
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """Queue a frame, waiting while the outbox is full."""
+        await self.outbox.put(orjson.dumps(frame))
+
+    async def send_model(self, frame_type: str, message_id: Optional[str], model: BaseModel) -> None:
+        """Queue a frame whose ``data`` is a model serialized once."""
+        await self.outbox.put(
+            b'{"type":' + orjson.dumps(frame_type)
+            + b',"id":' + orjson.dumps(message_id)
+            + b',"data":' + model.__pydantic_serializer__.to_json(model) + b"}"
+        )
+
+    async def _read_loop(self) -> None:
+        """Receive client frames and start analyses."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                raw = await self.websocket.receive_text()
+            except WebSocketDisconnect:
+                return
+            self.last_seen = loop.time()
+
+            try:
+                frame = ChatSocketMessage.model_validate_json(raw)
+            except ValidationError as e:
+                await self._send_error(None, "invalid_frame", str(e.errors()[0]["msg"]))
+                continue
+
+            if frame.type == "ping":
+                await self.send({"type": "pong", "id": frame.id})
+            elif frame.type == "meal":
+                if not frame.message:
+                    await self._send_error(frame.id, "invalid_frame", "Meal frames require a message")
+                elif len(self.tasks) >= self.max_pending:
+                    await self._send_error(frame.id, "busy", "Too many meals in progress")
+                elif await self._within_rate_limit(frame):
+                    task = asyncio.create_task(self._analyze(frame))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+
+    async def _write_loop(self) -> None:
+        """Send queued frames in order; ends when the socket fails."""
+        while True:
+            frame = await self.outbox.get()
+            try:
+                await self.websocket.send_text(frame.decode("utf-8"))
+            except (WebSocketDisconnect, RuntimeError):
+                return
+
+    async def _heartbeat_loop(self) -> None:
+        """Ping the client; return once it has been idle too long."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if loop.time() - self.last_seen > self.idle_timeout:
+                return
+            try:
+                # A client too slow to drain the outbox gets no extra pings
+                self.outbox.put_nowait(b'{"type":"ping"}')
+            except asyncio.QueueFull:
+                pass
+
+    async def _within_rate_limit(self, frame: ChatSocketMessage) -> bool:
+        """Charge a meal to the analyze-meal buckets, answering it when denied."""
+        if self.rate_limit is None:
+            return True
+        allowed, retry_after = await self.rate_limit("/api/analyze-meal", self.session_id)
+        if not allowed:
+            await self.send({
+                "type": "error",
+                "id": frame.id,
+                "code": "rate_limited",
+                "message": "Too many meals, please slow down",
+                "retry_after": max(1, math.ceil(retry_after))
+            })
+        return allowed
+
+    async def _analyze(self, frame: ChatSocketMessage) -> None:
+        """Analyze one meal and send its result and the updated intake."""
+        await self.send({"type": "progress", "id": frame.id, "stage": "queued"})
+
+        async with self.slots:
+            await self.send({"type": "progress", "id": frame.id, "stage": "analyzing"})
+
+            db = self.session_factory()
+            try:
+                response = await MealAnalysisService(db).analyze_meal(
+                    description=frame.message,
+                    session_id=self.session_id,
+                    language=frame.language
+                )
+                intake = ChatService(db).get_daily_intake(self.session_id)
+            except Exception as e:
+                logger.error("Error analyzing meal over WebSocket: %s", e)
+                db.rollback()
+                await self._send_error(frame.id, "analysis_failed", f"Failed to analyze meal: {str(e)}")
+                return
+            finally:
+                db.close()
+
+        await self.send_model("result", frame.id, response)
+        await self.send_model("intake", frame.id, intake)
+
+    async def _send_error(self, message_id: Optional[str], code: str, message: str) -> None:
+        await self.send({"type": "error", "id": message_id, "code": code, "message": message})
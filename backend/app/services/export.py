@@ -0,0 +1,222 @@
+"""Export service for streaming a session's full history."""
+
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import Iterator, Iterable, Optional, Dict, Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.message import Message
+from app.models.nutrition import NutritionInfo, FoodItem
+from app.models.session import UserSession
+
+logger = logging.getLogger(__name__)
+
+# Columns written for each row of a CSV export
+CSV_COLUMNS = [
+    "message_id", "timestamp", "role", "content",
+    "total_calories", "total_protein", "total_carbs", "total_fat",
+    "food_name", "food_name_cn", "amount", "unit",
+    "calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium"
+]
+
+FOOD_COLUMNS = ("amount", "unit", "calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium")
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+
+class ExportService:
+    """Service for exporting chat history without loading it into memory."""
+
+    def __init__(
+        self,
+        db: Session,
+        yield_per: int = 500,
+        chunk_size: int = 64 * 1024
+    ):
+        """
+        Initialize export service.
+
+        Args:
+            db: Database session
+            yield_per: Rows fetched from the cursor per batch
+            chunk_size: Approximate size of each emitted chunk in bytes
+        """
+        self.db = db
+        self.yield_per = yield_per
+        self.chunk_size = chunk_size
+
+    def session_exists(self, session_id: str) -> bool:
+        """Check whether a session exists."""
+        return self.db.query(UserSession.id).filter(
+            UserSession.id == session_id
+        ).first() is not None
+
+    def stream(
+        self,
+        session_id: str,
+        export_format: str = "ndjson",
+        compress: bool = False,
+        compress_level: int = 6
+    ) -> Iterator[bytes]:
+        """
+        Stream a session's history in the requested format.
+
+        Args:
+            session_id: Session ID to export
+            export_format: Output format, ``ndjson`` or ``csv``
+            compress: Whether to gzip the output on the fly
+            compress_level: gzip compression level
+
+        Returns:
+            Iterator of encoded chunks
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        lines = self.iter_ndjson(session_id) if export_format == "ndjson" else self.iter_csv(session_id)
+        chunks = self._buffer(lines)
+        return gzip_stream(chunks, compress_level) if compress else chunks
+
+    def iter_rows(self, session_id: str) -> Iterator[Any]:
+        """
+        Iterate joined message, nutrition and food item rows in order.
+
+        Uses its own connection with a server-side cursor so the request's
+        session can be released before streaming finishes.
+        """
+        statement = select(
+            Message.id.label("message_id"),
+            Message.timestamp,
+            Message.role,
+            Message.content,
+            NutritionInfo.total_calories,
+            NutritionInfo.total_protein,
+            NutritionInfo.total_carbs,
+            NutritionInfo.total_fat,
+            FoodItem.name.label("food_name"),
+            FoodItem.name_cn.label("food_name_cn"),
+            *(getattr(FoodItem, column) for column in FOOD_COLUMNS)
+        ).outerjoin(
+            NutritionInfo, Message.nutrition_data_id == NutritionInfo.id
+        ).outerjoin(
+            FoodItem, FoodItem.nutrition_info_id == NutritionInfo.id
+        ).where(
+            Message.session_id == session_id
+        ).order_by(
+            Message.timestamp, Message.id
+        )
+
+        with self.db.get_bind().connect() as connection:
+            result = connection.execution_options(
+                stream_results=True,
+                yield_per=self.yield_per
+            ).execute(statement)
+            yield from result
+
+    def iter_ndjson(self, session_id: str) -> Iterator[str]:
+        """Iterate one JSON line per message with its food items nested."""
+        current: Optional[Dict[str, Any]] = None
+
+        for row in self.iter_rows(session_id):
+            if current is None or current["id"] != row.message_id:
+                if current is not None:
+                    yield json.dumps(current, ensure_ascii=False) + "\n"
+                current = {
+                    "id": row.message_id,
+                    "timestamp": row.timestamp.isoformat(),
+                    "role": row.role.value,
+                    "content": row.content,
+                    "nutrition": None
+                }
+                if row.total_calories is not None:
+                    current["nutrition"] = {
+                        "total_calories": row.total_calories,
+                        "total_protein": row.total_protein,
+                        "total_carbs": row.total_carbs,
+                        "total_fat": row.total_fat,
+                        "food_items": []
+                    }
+
+            if row.food_name is not None:
+                item = {"name": row.food_name, "name_cn": row.food_name_cn}
+                item.update((column, getattr(row, column)) for column in FOOD_COLUMNS)
+                current["nutrition"]["food_items"].append(item)
+
+        if current is not None:
+            yield json.dumps(current, ensure_ascii=False) + "\n"
+
+    def iter_csv(self, session_id: str) -> Iterator[str]:
+        """Iterate CSV lines with one row per food item."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> str:
+            value = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return value
+
+        writer.writerow(CSV_COLUMNS)
+        yield flush()
+
+        for row in self.iter_rows(session_id):
+            writer.writerow([
+                row.message_id,
+                row.timestamp.isoformat(),
+                row.role.value,
+                row.content,
+                row.total_calories,
+                row.total_protein,
+                row.total_carbs,
+                row.total_fat,
+                row.food_name,
+                row.food_name_cn,
+                *(getattr(row, column) for column in FOOD_COLUMNS)
+            ])
+            yield flush()
+
+    def _buffer(self, lines: Iterable[str]) -> Iterator[bytes]:
+        """Group small lines into chunks of roughly ``chunk_size`` bytes."""
+        pending = []
+        size = 0
+
+        for line in lines:
+            data = line.encode("utf-8")
+            pending.append(data)
+            size += len(data)
+            if size >= self.chunk_size:
+                yield b"".join(pending)
+                pending = []
+                size = 0
+
+        if pending:
+            yield b"".join(pending)
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Gzip-compress a stream of chunks incrementally.
+
+    Args:
+        chunks: Uncompressed chunks
+        level: Compression level (1-9)
+
+    Returns:
+        Iterator of gzip-encoded chunks
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+
+    yield compressor.flush()
@@ -0,0 +1,220 @@
+"""
+Frequent and Recent Foods Tracker for Cal AI
+Maintains per-session top-K suggestions for one-tap re-logging
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.message import Message
+from app.models.nutrition import NutritionInfo, FoodItem
+
+
+# Fields copied from a FoodItem row so a suggestion can be re-logged as-is
+NUTRITION_FIELDS = (
+    "name", "name_cn", "amount", "unit",
+    "calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium"
+)
+
+# Rescale decayed scores before they grow large enough to lose precision
+_RESCALE_THRESHOLD = 1e12
+
+
+def food_key(name: Optional[str], name_cn: Optional[str] = None) -> str:
+    """Normalize a food name into the key used for counting."""
+    return (name_cn or name or "").strip().casefold()
+
+
+class _SessionFoods:
+    """Exact decayed counters for a single session."""
+
+    __slots__ = ("landmark", "entries", "recent", "top")
+
+    def __init__(self, landmark: datetime):
+        self.landmark = landmark
+        self.entries: Dict[str, Dict] = {}
+        self.recent: "OrderedDict[str, None]" = OrderedDict()
+        self.top: Optional[List[Dict]] = None
+
+
+class FoodFrequencyTracker:
+    """
+    Tracks how often and how recently each session logs a food.
+
+    Scores use forward exponential decay: every log adds
+    ``2 ** (age / half_life)`` relative to a per-session landmark, so older
+    entries never need to be touched to stay correctly ranked.
+
+    At most ``max_sessions`` sessions are kept in memory; the least recently
+    used are dropped and rebuilt from the database when they come back.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 10,
+        half_life_days: float = 14.0,
+        max_foods_per_session: int = 200,
+        hydrate_limit: int = 1000,
+        max_sessions: int = 10000
+    ):
+        self.top_k = top_k
+        self.half_life_seconds = half_life_days * 86400
+        self.max_foods_per_session = max_foods_per_session
+        self.hydrate_limit = hydrate_limit
+        self.max_sessions = max_sessions
+        self.sessions: "OrderedDict[str, _SessionFoods]" = OrderedDict()
+
+    def is_loaded(self, session_id: str) -> bool:
+        """Whether counters for a session are already in memory."""
+        return session_id in self.sessions
+
+    def ensure_loaded(self, db: Session, session_id: str) -> None:
+        """Build counters for a session from its stored food items if needed."""
+        loaded = session_id in self.sessions
+        record_cache("food_frequency", loaded)
+        if loaded:
+            self.sessions.move_to_end(session_id)
+            return
+
+        rows = (
+            db.query(FoodItem, Message.timestamp)
+            .join(NutritionInfo, FoodItem.nutrition_info_id == NutritionInfo.id)
+            .join(Message, Message.nutrition_data_id == NutritionInfo.id)
+            .filter(Message.session_id == session_id)
+            .order_by(Message.timestamp.desc())
+            .limit(self.hydrate_limit)
+            .all()
+        )
+
+        foods = _SessionFoods(rows[-1][1] if rows else datetime.utcnow())
+        self.sessions[session_id] = foods
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        for item, logged_at in reversed(rows):
+            self._record(foods, item, logged_at)
+
+    def record_items(
+        self,
+        session_id: str,
+        items: Iterable[FoodItem],
+        logged_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Record newly inserted food items for a session.
+
+        Sessions that are not loaded yet are skipped; they pick up these rows
+        from the database on first use.
+        """
+        foods = self.sessions.get(session_id)
+        if foods is None:
+            return
+
+        logged_at = logged_at or datetime.utcnow()
+        for item in items:
+            self._record(foods, item, logged_at)
+
+    def get_frequent(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Get the highest scoring foods for a session."""
+        foods = self.sessions.get(session_id)
+        if foods is None:
+            return []
+
+        if foods.top is None:
+            foods.top = heapq.nlargest(
+                self.top_k,
+                foods.entries.values(),
+                key=lambda entry: entry["score"]
+            )
+        return [self._to_suggestion(foods, entry) for entry in foods.top[:limit or self.top_k]]
+
+    def get_recent(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Get the most recently logged distinct foods, newest first."""
+        foods = self.sessions.get(session_id)
+        if foods is None:
+            return []
+
+        keys = list(reversed(foods.recent))[:limit or self.top_k]
+        return [self._to_suggestion(foods, foods.entries[key]) for key in keys]
+
+    def get_recent_names(self, session_id: str, limit: Optional[int] = None) -> List[str]:
+        """Get display names of recently logged foods."""
+        return [
+            item["name_cn"] or item["name"]
+            for item in self.get_recent(session_id, limit)
+        ]
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop counters for a session so they are rebuilt from the database."""
+        self.sessions.pop(session_id, None)
+
+    def _record(self, foods: _SessionFoods, item: FoodItem, logged_at: datetime) -> None:
+        """Apply a single food log to a session's counters."""
+        key = food_key(item.name, item.name_cn)
+        if not key:
+            return
+
+        weight = self._weight(foods, logged_at)
+        entry = foods.entries.get(key)
+        if entry is None:
+            entry = foods.entries[key] = {"key": key, "score": 0.0, "count": 0}
+        entry["score"] += weight
+        entry["count"] += 1
+        entry["last_logged"] = logged_at
+        entry["food_item_id"] = item.id
+        entry["nutrition"] = {field: getattr(item, field) for field in NUTRITION_FIELDS}
+
+        foods.recent.pop(key, None)
+        foods.recent[key] = None
+        foods.top = None
+
+        if len(foods.entries) > self.max_foods_per_session:
+            self._evict(foods)
+
+    def _weight(self, foods: _SessionFoods, logged_at: datetime) -> float:
+        """Forward-decay weight of a log at the given time."""
+        age = (logged_at - foods.landmark).total_seconds()
+        weight = math.pow(2.0, age / self.half_life_seconds)
+
+        if weight > _RESCALE_THRESHOLD:
+            # Move the landmark forward and shrink existing scores to match
+            for entry in foods.entries.values():
+                entry["score"] /= weight
+            foods.landmark = logged_at
+            weight = 1.0
+
+        return weight
+
+    def _evict(self, foods: _SessionFoods) -> None:
+        """Drop the lowest scoring food once a session exceeds its cap."""
+        key = min(foods.entries, key=lambda k: foods.entries[k]["score"])
+        del foods.entries[key]
+        foods.recent.pop(key, None)
+
+    def _to_suggestion(self, foods: _SessionFoods, entry: Dict) -> Dict:
+        """Convert an internal entry into a suggestion payload."""
+        # Express the score as of now rather than relative to the landmark
+        age = (datetime.utcnow() - foods.landmark).total_seconds()
+        score = entry["score"] / math.pow(2.0, age / self.half_life_seconds)
+        return {
+            **entry["nutrition"],
+            "key": entry["key"],
+            "food_item_id": entry["food_item_id"],
+            "count": entry["count"],
+            "score": round(score, 4),
+            "last_logged": entry["last_logged"]
+        }
+
+
+# Singleton instance
+food_frequency_tracker = FoodFrequencyTracker(
+    top_k=settings.FREQUENT_FOODS_TOP_K,
+    half_life_days=settings.FREQUENT_FOODS_HALF_LIFE_DAYS,
+    max_sessions=settings.FREQUENT_FOODS_MAX_SESSIONS
+)
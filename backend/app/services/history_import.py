@@ -0,0 +1,509 @@
+"""History import service for migrating logs from other trackers."""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.message import Message, MessageRole
+from app.models.nutrition import NutritionInfo, FoodItem
+from app.models.session import UserSession
+from app.services.ai_integration import AIIntegrationService
+from app.services.food_frequency import food_frequency_tracker, NUTRITION_FIELDS
+from app.schemas.history_import import ImportProgress
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ["csv", "json"]
+MISSING_NUTRITION_MODES = ["skip", "local", "ai"]
+
+# Alternative column names accepted from other trackers and our own export
+FIELD_ALIASES = {
+    "food": "name",
+    "food_name": "name",
+    "food_name_cn": "name_cn",
+    "quantity": "amount",
+    "kcal": "calories",
+    "energy": "calories",
+    "date": "timestamp",
+    "time": "timestamp",
+    "logged_at": "timestamp",
+    "description": "meal",
+    "content": "meal",
+}
+
+NUMERIC_FIELDS = ("calories", "protein", "carbs", "fat", "fiber", "sugar", "sodium")
+REQUIRED_NUMERIC_FIELDS = ("calories", "protein", "carbs", "fat")
+
+READ_CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 20
+
+
+def iter_csv_records(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Stream-parse CSV rows into dictionaries."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Leave the underlying upload open for its owner
+        text.detach()
+
+
+def iter_json_records(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Stream-parse JSON objects from a top-level array or NDJSON.
+
+    Objects are decoded one at a time from a rolling buffer, so the whole
+    document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    position = 0
+    eof = False
+
+    while True:
+        # Skip separators between values
+        while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+            position += 1
+
+        if position < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Invalid JSON near: {buffer[position:position + 50]!r}")
+            else:
+                if not isinstance(record, dict):
+                    raise ValueError("Each JSON record must be an object")
+                yield record
+                position = end
+                continue
+        elif eof:
+            return
+
+        chunk = file.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + text_decoder.decode(chunk, final=eof)
+        position = 0
+
+
+def _normalize_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Lower-case keys and apply column aliases."""
+    row = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = key.strip().lower()
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                value = None
+        row[FIELD_ALIASES.get(key, key)] = value
+    return row
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    """Parse a numeric nutrition value."""
+    if value is None:
+        return None
+    return float(value)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO date or datetime into naive UTC."""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_food_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a food item dictionary from a normalized row."""
+    name = row.get("name") or row.get("name_cn")
+    if not name:
+        raise ValueError("Missing food name")
+
+    item = {
+        "name": str(name),
+        "name_cn": row.get("name_cn"),
+        "amount": str(row.get("amount") or "1"),
+        "unit": row.get("unit") or "serving",
+    }
+    for field in NUMERIC_FIELDS:
+        value = _parse_float(row.get(field))
+        if value is not None and value < 0:
+            raise ValueError(f"Negative value for {field}")
+        item[field] = value
+    return item
+
+
+def _has_nutrition(item: Dict[str, Any]) -> bool:
+    """Whether a food item already carries its core nutrition values."""
+    return item.get("calories") is not None
+
+
+class HistoryImportService:
+    """Service for importing historical meal logs in bulk."""
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None
+    ):
+        """
+        Initialize history import service.
+
+        Args:
+            db: Database session
+            batch_size: Meals inserted per executemany batch
+            commit_every: Number of batches between commits
+        """
+        self.db = db
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.commit_every = commit_every or settings.IMPORT_COMMIT_EVERY
+        self._local_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._ai_service: Optional[AIIntegrationService] = None
+
+    def get_or_create_session(self, session_id: Optional[str]) -> str:
+        """Get an existing session ID or create a new session."""
+        if session_id:
+            exists = self.db.query(UserSession.id).filter(
+                UserSession.id == session_id
+            ).first()
+            if exists:
+                return session_id
+
+        session = UserSession(
+            id=session_id or str(uuid.uuid4()),
+            session_token=str(uuid.uuid4())
+        )
+        self.db.add(session)
+        self.db.commit()
+        return session.id
+
+    async def import_file(
+        self,
+        file: BinaryIO,
+        file_format: str,
+        session_id: str,
+        missing_nutrition: str = "skip",
+        language: str = "auto"
+    ) -> AsyncIterator[ImportProgress]:
+        """
+        Import meals from an uploaded file, yielding progress after each commit.
+
+        Parsing, local nutrition lookups and inserts block, so they run in
+        worker threads a batch at a time; only AI analysis runs on the event
+        loop.
+
+        Args:
+            file: Uploaded file opened in binary mode
+            file_format: ``csv`` or ``json`` (array or NDJSON)
+            session_id: Session to import into
+            missing_nutrition: How to handle foods without nutrition:
+                ``skip``, ``local`` (reuse stored foods with the same name)
+                or ``ai`` (analyze the meal description)
+            language: Language preference for AI analysis
+
+        Returns:
+            Async iterator of progress updates; the last one has ``done`` set
+        """
+        if file_format not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {file_format}")
+        if missing_nutrition not in MISSING_NUTRITION_MODES:
+            raise ValueError(f"Unsupported missing nutrition mode: {missing_nutrition}")
+
+        records = iter_csv_records(file) if file_format == "csv" else iter_json_records(file)
+        stats = {"rows_read": 0, "meals_imported": 0, "food_items_imported": 0, "rows_skipped": 0}
+        errors: List[str] = []
+        started = time.perf_counter()
+
+        def progress(done: bool = False) -> ImportProgress:
+            elapsed = time.perf_counter() - started
+            return ImportProgress(
+                session_id=session_id,
+                **stats,
+                seconds=round(elapsed, 3),
+                rows_per_second=round(stats["rows_read"] / elapsed, 1) if elapsed > 0 else 0.0,
+                errors=errors,
+                done=done
+            )
+
+        def skip(row_number: int, reason: str, rows: int = 1) -> None:
+            stats["rows_skipped"] += rows
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"row {row_number}: {reason}")
+
+        batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+        batches_since_commit = 0
+        meals = self._iter_meals(records, stats)
+
+        while chunk := await asyncio.to_thread(list, islice(meals, self.batch_size)):
+            for meal, items, item_rows, meal_errors in chunk:
+                for row_number, error in meal_errors:
+                    skip(row_number, error)
+                if not meal:
+                    continue
+
+                if not all(_has_nutrition(item) for item in items):
+                    try:
+                        resolved = await self._resolve_missing(meal, items, missing_nutrition, language)
+                    except (TypeError, ValueError) as e:
+                        skip(item_rows[0], f"could not resolve nutrition: {e}", len(items))
+                        continue
+                    if missing_nutrition != "ai":
+                        for item, row_number in zip(resolved, item_rows):
+                            if item is None:
+                                skip(row_number, "missing nutrition")
+                    items = [item for item in resolved if item is not None]
+                if not items:
+                    continue
+
+                batch.append((meal, items))
+                if len(batch) >= self.batch_size:
+                    batches_since_commit += 1
+                    commit = batches_since_commit >= self.commit_every
+                    await asyncio.to_thread(self._insert_batch, session_id, batch, stats, commit)
+                    batch = []
+                    if commit:
+                        batches_since_commit = 0
+                        update = progress()
+                        logger.info(
+                            "Import into %s: %d rows read, %.0f rows/s",
+                            session_id, update.rows_read, update.rows_per_second
+                        )
+                        yield update
+
+        await asyncio.to_thread(self._insert_batch, session_id, batch, stats, True)
+        food_frequency_tracker.invalidate(session_id)
+
+        yield progress(done=True)
+
+    def _iter_meals(
+        self,
+        records: Iterator[Dict[str, Any]],
+        stats: Dict[str, int]
+    ) -> Iterator[Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], List[int], List[Tuple[int, str]]]]:
+        """
+        Group records into meals.
+
+        Records with a ``food_items`` list (or ``nutrition.food_items``) are
+        one meal each. Flat food rows are grouped while consecutive rows share
+        the same timestamp and meal label. Each meal comes with the row number
+        of each of its items and ``(row number, reason)`` for the rows skipped
+        before it. Rows are numbered from 1 in file order.
+        """
+        current_key = None
+        meal: Optional[Dict[str, Any]] = None
+        items: List[Dict[str, Any]] = []
+        item_rows: List[int] = []
+        errors: List[Tuple[int, str]] = []
+
+        for record in records:
+            stats["rows_read"] += 1
+            row_number = stats["rows_read"]
+            row = _normalize_row(record)
+
+            try:
+                timestamp = _parse_timestamp(row.get("timestamp"))
+            except (TypeError, ValueError):
+                errors.append((row_number, f"invalid timestamp {row.get('timestamp')!r}"))
+                continue
+
+            nested = row.get("food_items")
+            if nested is None and isinstance(row.get("nutrition"), dict):
+                nested = row["nutrition"].get("food_items")
+
+            if nested is not None:
+                if meal:
+                    yield meal, items, item_rows, errors
+                    errors = []
+                meal_items = []
+                for nested_row in nested:
+                    try:
+                        meal_items.append(_parse_food_item(_normalize_row(nested_row)))
+                    except (TypeError, ValueError) as e:
+                        errors.append((row_number, str(e)))
+                current_key, meal, items, item_rows = None, None, [], []
+                if meal_items:
+                    meal_rows = [row_number] * len(meal_items)
+                    yield {"timestamp": timestamp, "description": row.get("meal")}, meal_items, meal_rows, errors
+                    errors = []
+                continue
+
+            if row.get("name") is None and row.get("name_cn") is None and row.get("meal"):
+                # A meal description with no foods listed, e.g. plain text logs
+                if meal:
+                    yield meal, items, item_rows, errors
+                    errors = []
+                current_key, meal, items, item_rows = None, None, [], []
+                yield {"timestamp": timestamp, "description": row["meal"]}, [
+                    {"name": row["meal"], "calories": None}
+                ], [row_number], errors
+                errors = []
+                continue
+
+            try:
+                item = _parse_food_item(row)
+            except (TypeError, ValueError) as e:
+                errors.append((row_number, str(e)))
+                continue
+
+            key = (timestamp, row.get("meal"))
+            if meal is None or key != current_key or timestamp is None and row.get("meal") is None:
+                if meal:
+                    yield meal, items, item_rows, errors
+                    errors = []
+                current_key = key
+                meal = {"timestamp": timestamp, "description": row.get("meal")}
+                items, item_rows = [], []
+            items.append(item)
+            item_rows.append(row_number)
+
+        if meal or errors:
+            yield meal, items, item_rows, errors
+
+    async def _resolve_missing(
+        self,
+        meal: Dict[str, Any],
+        items: List[Dict[str, Any]],
+        mode: str,
+        language: str
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fill in nutrition for foods that arrived without it.
+
+        Returns:
+            The AI's food items in ``ai`` mode, otherwise one entry per
+            item, None where nutrition could not be found
+        """
+        if mode == "ai":
+            if self._ai_service is None:
+                self._ai_service = AIIntegrationService()
+            description = meal.get("description") or "、".join(
+                item.get("name_cn") or item["name"] for item in items
+            )
+            result = await self._ai_service.analyze_meal(description, language)
+            return [
+                _parse_food_item(_normalize_row(item_data))
+                for item_data in result.get("food_items", [])
+            ]
+        if mode == "local":
+            return await asyncio.to_thread(self._resolve_stored, items, mode)
+        return self._resolve_stored(items, mode)
+
+    def _resolve_stored(self, items: List[Dict[str, Any]], mode: str) -> List[Optional[Dict[str, Any]]]:
+        """Keep foods with nutrition, filling the rest from stored foods in ``local`` mode."""
+        resolved: List[Optional[Dict[str, Any]]] = []
+        for item in items:
+            if _has_nutrition(item):
+                resolved.append(item)
+                continue
+            stored = self._lookup_local(item) if mode == "local" else None
+            resolved.append({
+                **stored,
+                "name": item["name"],
+                "name_cn": item.get("name_cn") or stored["name_cn"],
+            } if stored else None)
+        return resolved
+
+    def _lookup_local(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Find nutrition for a food in previously stored food items."""
+        name = item["name"]
+        if name not in self._local_cache:
+            stored = self.db.query(FoodItem).filter(
+                (FoodItem.name == name) | (FoodItem.name_cn == name)
+            ).order_by(FoodItem.id).first()
+            self._local_cache[name] = (
+                {field: getattr(stored, field) for field in NUTRITION_FIELDS}
+                if stored else None
+            )
+        return self._local_cache[name]
+
+    def _insert_batch(
+        self,
+        session_id: str,
+        batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+        stats: Dict[str, int],
+        commit: bool = False
+    ) -> None:
+        """Insert a batch of meals with executemany, committing if asked."""
+        if not batch:
+            if commit:
+                self.db.commit()
+            return
+
+        now = datetime.utcnow()
+        nutrition_rows, item_rows, message_rows = [], [], []
+
+        for meal, items in batch:
+            nutrition_id = str(uuid.uuid4())
+            timestamp = meal["timestamp"] or now
+            totals = {
+                field: sum(item.get(field) or 0 for item in items)
+                for field in REQUIRED_NUMERIC_FIELDS
+            }
+            optional_totals = {
+                field: sum(item[field] for item in items if item.get(field) is not None)
+                if any(item.get(field) is not None for item in items) else None
+                for field in ("fiber", "sugar", "sodium")
+            }
+            nutrition_rows.append({
+                "id": nutrition_id,
+                **{f"total_{field}": value for field, value in totals.items()},
+                **{f"total_{field}": value for field, value in optional_totals.items()},
+                "analysis_notes": "Imported",
+                "created_at": timestamp
+            })
+            for item in items:
+                item_rows.append({
+                    "id": str(uuid.uuid4()),
+                    "nutrition_info_id": nutrition_id,
+                    **{field: item.get(field) for field in NUTRITION_FIELDS},
+                    **{field: item.get(field) or 0 for field in REQUIRED_NUMERIC_FIELDS}
+                })
+
+            names = "、".join(item.get("name_cn") or item["name"] for item in items)
+            message_rows.append({
+                "id": str(uuid.uuid4()),
+                "session_id": session_id,
+                "content": meal.get("description") or names,
+                "role": MessageRole.USER,
+                "timestamp": timestamp,
+                "nutrition_data_id": None
+            })
+            message_rows.append({
+                "id": str(uuid.uuid4()),
+                "session_id": session_id,
+                "content": f"已导入：{names}，共 {totals['calories']:.0f} 千卡。",
+                "role": MessageRole.ASSISTANT,
+                "timestamp": timestamp,
+                "nutrition_data_id": nutrition_id
+            })
+
+        self.db.execute(insert(NutritionInfo), nutrition_rows)
+        self.db.execute(insert(FoodItem), item_rows)
+        self.db.execute(insert(Message), message_rows)
+        self.db.query(UserSession).filter(
+            UserSession.id == session_id
+        ).update({UserSession.version: UserSession.version + 1})
+
+        stats["meals_imported"] += len(batch)
+        stats["food_items_imported"] += len(item_rows)
+        if commit:
+            self.db.commit()
@@ -5,11 +5,14 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from sqlalchemy.orm import Session
 
+from app.core.logging_config import bind_session_id
 from app.services.ai_integration import AIIntegrationService
+from app.services.food_frequency import food_frequency_tracker, NUTRITION_FIELDS
 from app.models.nutrition import NutritionInfo, FoodItem
 from app.models.message import Message, MessageRole
 from app.models.session import UserSession
 from app.schemas.meal import MealAnalysisResponse, NutritionInfoSchema, FoodItemSchema
+from app.schemas.voice import VoiceToTextResponse
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +34,8 @@ class MealAnalysisService:
         self,
         description: str,
         session_id: Optional[str] = None,
-        language: str = "auto"
+        language: str = "auto",
+        transcript: Optional[VoiceToTextResponse] = None
     ) -> MealAnalysisResponse:
         """
         Analyze a meal description and return nutrition information.
@@ -40,23 +44,39 @@ class MealAnalysisService:
             description: Meal description from user
             session_id: Optional session ID for tracking
             language: Language preference
+            transcript: Transcription the description came from, if it was
+                spoken; its language and confidence are given to the AI
             
         Returns:
             MealAnalysisResponse with nutrition data and AI response
         """
         # Get or create session
         session = self._get_or_create_session(session_id)
+        bind_session_id(session.id)
+        
+        # Load recent foods so they are available as AI context
+        food_frequency_tracker.ensure_loaded(self.db, session.id)
+        
+        # Commit a new session before the AI call so no write lock is held
+        # while waiting on the provider; concurrent analyses would otherwise
+        # block on SQLite. The messages are only written once it succeeds.
+        self.db.commit()
+        received_at = datetime.utcnow()
         
-        # Store user message
-        user_message = self._create_message(
+        # Analyze meal using AI with session context
+        speech = None
+        if transcript is not None:
+            speech = {"language": transcript.language, "confidence": transcript.confidence}
+        ai_result = await self.ai_service.analyze_meal(description, language, session.id, transcript=speech)
+        
+        # Store user message as of when it was received
+        self._create_message(
             session_id=session.id,
             content=description,
-            role=MessageRole.USER
+            role=MessageRole.USER,
+            timestamp=received_at
         )
         
-        # Analyze meal using AI with session context
-        ai_result = await self.ai_service.analyze_meal(description, language, session.id)
-        
         # Create nutrition info
         nutrition_info = self._create_nutrition_info(ai_result)
         
@@ -70,10 +90,15 @@ class MealAnalysisService:
         
         # Update session activity
         session.update_activity()
+        session.bump_version()
         self.db.commit()
         
+        food_frequency_tracker.record_items(
+            session.id, nutrition_info.food_items, assistant_message.timestamp
+        )
+        
         # Prepare response
-        return MealAnalysisResponse(
+        return MealAnalysisResponse.model_construct(
             message_id=assistant_message.id,
             nutrition=self._nutrition_to_schema(nutrition_info),
             ai_response=ai_result.get("ai_response", "Meal analysis completed."),
@@ -81,6 +106,97 @@ class MealAnalysisService:
             timestamp=assistant_message.timestamp
         )
     
+    def relog_foods(
+        self,
+        session_id: str,
+        food_item_ids: List[str],
+        language: str = "auto"
+    ) -> MealAnalysisResponse:
+        """
+        Log previously recorded foods again using their stored nutrition values.
+        
+        No AI call is made; the food items are copied from earlier meals in
+        the same session.
+        
+        Args:
+            session_id: Session the foods were logged in
+            food_item_ids: IDs of previously stored food items
+            language: Language preference
+            
+        Returns:
+            MealAnalysisResponse for the new meal
+            
+        Raises:
+            ValueError: If the session or any food item is not found
+        """
+        session = self.db.query(UserSession).filter(
+            UserSession.id == session_id
+        ).first()
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        
+        stored_items = self.db.query(FoodItem).join(
+            NutritionInfo, FoodItem.nutrition_info_id == NutritionInfo.id
+        ).join(
+            Message, Message.nutrition_data_id == NutritionInfo.id
+        ).filter(
+            Message.session_id == session_id,
+            FoodItem.id.in_(food_item_ids)
+        ).all()
+        
+        items_by_id = {item.id: item for item in stored_items}
+        missing = [item_id for item_id in food_item_ids if item_id not in items_by_id]
+        if missing:
+            raise ValueError(f"Food items not found in session: {', '.join(missing)}")
+        
+        food_items_data = [
+            {field: getattr(items_by_id[item_id], field) for field in NUTRITION_FIELDS}
+            for item_id in food_item_ids
+        ]
+        names = [item["name_cn"] or item["name"] for item in food_items_data]
+        total_calories = sum(item["calories"] or 0 for item in food_items_data)
+        
+        if language == "en":
+            content = ", ".join(names)
+            ai_response = f"Logged again: {content} ({total_calories:.0f} kcal)."
+        else:
+            content = "、".join(names)
+            ai_response = f"已为你再次记录：{content}，共 {total_calories:.0f} 千卡。"
+        
+        self._create_message(
+            session_id=session.id,
+            content=content,
+            role=MessageRole.USER
+        )
+        
+        nutrition_info = self._create_nutrition_info({
+            "food_items": food_items_data,
+            "analysis_notes": ""
+        })
+        
+        assistant_message = self._create_message(
+            session_id=session.id,
+            content=ai_response,
+            role=MessageRole.ASSISTANT,
+            nutrition_data_id=nutrition_info.id
+        )
+        
+        session.update_activity()
+        session.bump_version()
+        self.db.commit()
+        
+        food_frequency_tracker.record_items(
+            session.id, nutrition_info.food_items, assistant_message.timestamp
+        )
+        
+        return MealAnalysisResponse.model_construct(
+            message_id=assistant_message.id,
+            nutrition=self._nutrition_to_schema(nutrition_info),
+            ai_response=ai_response,
+            session_id=session.id,
+            timestamp=assistant_message.timestamp
+        )
+    
     def _get_or_create_session(self, session_id: Optional[str]) -> UserSession:
         """Get existing session or create new one."""
         if session_id:
@@ -105,14 +221,16 @@ class MealAnalysisService:
         session_id: str,
         content: str,
         role: MessageRole,
-        nutrition_data_id: Optional[str] = None
+        nutrition_data_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None
     ) -> Message:
         """Create and save a message."""
         message = Message(
             session_id=session_id,
             content=content,
             role=role,
-            nutrition_data_id=nutrition_data_id
+            nutrition_data_id=nutrition_data_id,
+            timestamp=timestamp or datetime.utcnow()
         )
         self.db.add(message)
         self.db.flush()
@@ -126,23 +244,23 @@ class MealAnalysisService:
         self.db.add(nutrition)
         self.db.flush()
         
-        # Add food items
+        # Add food items, validating AI output once on the way in
         food_items_data = ai_result.get("food_items", [])
         for item_data in food_items_data:
-            food_item = FoodItem(
-                nutrition_info_id=nutrition.id,
-                name=item_data.get("name", "Unknown"),
-                name_cn=item_data.get("name_cn"),
-                amount=str(item_data.get("amount", "1")),
-                unit=item_data.get("unit", "serving"),
-                calories=float(item_data.get("calories", 0)),
-                protein=float(item_data.get("protein", 0)),
-                carbs=float(item_data.get("carbs", 0)),
-                fat=float(item_data.get("fat", 0)),
-                fiber=item_data.get("fiber"),
-                sugar=item_data.get("sugar"),
-                sodium=item_data.get("sodium")
-            )
+            item = FoodItemSchema.model_validate({
+                "name": item_data.get("name", "Unknown"),
+                "name_cn": item_data.get("name_cn"),
+                "amount": str(item_data.get("amount", "1")),
+                "unit": item_data.get("unit", "serving"),
+                "calories": float(item_data.get("calories", 0)),
+                "protein": float(item_data.get("protein", 0)),
+                "carbs": float(item_data.get("carbs", 0)),
+                "fat": float(item_data.get("fat", 0)),
+                "fiber": item_data.get("fiber"),
+                "sugar": item_data.get("sugar"),
+                "sodium": item_data.get("sodium")
+            })
+            food_item = FoodItem(nutrition_info_id=nutrition.id, **item.model_dump())
             self.db.add(food_item)
             nutrition.food_items.append(food_item)
         
@@ -153,9 +271,14 @@ class MealAnalysisService:
         return nutrition
     
     def _nutrition_to_schema(self, nutrition: NutritionInfo) -> NutritionInfoSchema:
-        """Convert nutrition model to schema."""
+        """
+        Convert nutrition model to schema.
+        
+        Food items were validated when they were stored, so the schemas are
+        constructed without validating them a second time.
+        """
         food_items = [
-            FoodItemSchema(
+            FoodItemSchema.model_construct(
                 name=item.name,
                 name_cn=item.name_cn,
                 amount=item.amount,
@@ -171,7 +294,7 @@ class MealAnalysisService:
             for item in nutrition.food_items
         ]
         
-        return NutritionInfoSchema(
+        return NutritionInfoSchema.model_construct(
             total_calories=nutrition.total_calories,
             total_protein=nutrition.total_protein,
             total_carbs=nutrition.total_carbs,
@@ -181,4 +304,4 @@ class MealAnalysisService:
             total_sodium=nutrition.total_sodium,
             food_items=food_items,
             analysis_notes=nutrition.analysis_notes
-        )
\ No newline at end of file
+        )
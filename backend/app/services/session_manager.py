@@ -8,6 +8,8 @@ from datetime import datetime, date
 from collections import defaultdict
 import json
 
+from app.services.food_frequency import food_frequency_tracker
+
 
 class SessionManager:
     """Manages user sessions and conversation context."""
@@ -122,11 +124,7 @@ class SessionManager:
             "daily_intake": f"{intake['calories']:.0f}",
             "user_goals": profile.get("goals", "保持健康饮食"),
             "dietary_restrictions": profile.get("restrictions", "无"),
-            "recent_foods": [
-                item.get("name_cn") or item.get("name") 
-                for meal in intake.get("meals", [])[-3:]  # Last 3 meals
-                for item in meal.get("items", [])
-            ],
+            "recent_foods": food_frequency_tracker.get_recent_names(session_id),
             "conversation_history": [
                 {"type": msg.get("type"), "content": msg.get("content")}
                 for msg in recent_messages
@@ -0,0 +1,168 @@
+"""Pluggable speech-to-text engines run in a warm process pool."""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import TRANSCRIPTION_REJECTED, observe_transcription
+from app.core.timing import record_phase
+from app.schemas.voice import VoiceToTextResponse
+from app.services.transcription_engines import (
+    TranscriptionEngine, _init_worker, _run_job, _worker_pid, load_engine_class
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionBusyError(RuntimeError):
+    """Raised when the transcription queue is full."""
+
+
+class TranscriptionPool:
+    """
+    Process pool running one transcription engine.
+
+    Each worker loads the engine once when it starts, so requests never pay
+    for model loading. At most ``workers`` clips are transcribed at a time
+    and ``max_queue`` more may wait; further requests fail fast with
+    ``TranscriptionBusyError`` instead of queueing without bound. Engines
+    marked ``in_process`` (the mock engine) run directly in this process
+    and no workers are started.
+    """
+
+    def __init__(
+        self,
+        engine: str = "mock",
+        model_path: Optional[str] = None,
+        workers: int = 2,
+        max_queue: int = 8,
+        cpu_threads: int = 1
+    ):
+        self.engine = engine
+        self.model_path = model_path
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cpu_threads = cpu_threads
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_process: Optional[bool] = None
+        self._local_engine: Optional[TranscriptionEngine] = None
+
+    @property
+    def in_process(self) -> bool:
+        """Whether the engine runs in this process instead of pool workers."""
+        if self._in_process is None:
+            self._in_process = load_engine_class(self.engine).in_process
+        return self._in_process
+
+    def _get_local_engine(self) -> TranscriptionEngine:
+        if self._local_engine is None:
+            engine = load_engine_class(self.engine)(model_path=self.model_path, cpu_threads=self.cpu_threads)
+            engine.load()
+            self._local_engine = engine
+        return self._local_engine
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # The server process runs threads (log listener, AnyIO workers),
+            # so workers are spawned rather than forked
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.engine, self.model_path, self.cpu_threads)
+            )
+        return self._executor
+
+    async def warm(self) -> None:
+        """Start every worker and load its engine ahead of the first request."""
+        if self.in_process:
+            self._get_local_engine()
+            logger.info("Transcription engine %s runs in process; no workers started", self.engine)
+            return
+        executor = self._get_executor()
+        try:
+            # Submitting spawns the worker processes, which takes a few ms each;
+            # do it off the event loop
+            futures = await asyncio.to_thread(
+                lambda: [executor.submit(_worker_pid) for _ in range(self.workers)]
+            )
+            pids = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        except BrokenProcessPool as e:
+            # Typically the engine failed to load; requests will retry with a new pool
+            self._executor = None
+            logger.error("Failed to start transcription workers with %s engine: %s", self.engine, e)
+            return
+        logger.info("Transcription pool ready: %s engine in %d workers", self.engine, len(set(pids)))
+
+    async def transcribe(self, path: str, language: Optional[str] = None) -> VoiceToTextResponse:
+        """
+        Transcribe an audio file in a pool worker.
+
+        Raises:
+            TranscriptionBusyError: If ``workers + max_queue`` jobs are already pending
+        """
+        response, _ = await self.run(path, language)
+        return response
+
+    async def run(self, path: str, language: Optional[str] = None) -> Tuple[VoiceToTextResponse, float]:
+        """
+        Like ``transcribe``, also returning the seconds the worker spent on it.
+
+        Raises:
+            TranscriptionBusyError: If ``workers + max_queue`` jobs are already pending
+        """
+        if self.in_process:
+            started = time.perf_counter()
+            result = self._get_local_engine().transcribe(path, language)
+            queue_wait, seconds = 0.0, time.perf_counter() - started
+        else:
+            result = await self._run_in_worker(path, language)
+            queue_wait, seconds = result.pop("queue_wait"), result.pop("seconds")
+
+        record_phase("queue", queue_wait)
+        record_phase("transcribe", seconds)
+        observe_transcription(self.engine, queue_wait, seconds, result.get("duration_seconds") or 0)
+        logger.info(
+            "Transcribed %.1fs of audio in %.2fs (real-time factor %.2f, queued %.3fs)",
+            result.get("duration_seconds") or 0, seconds,
+            seconds / result["duration_seconds"] if result.get("duration_seconds") else 0,
+            queue_wait
+        )
+        return VoiceToTextResponse(**result), seconds
+
+    async def _run_in_worker(self, path: str, language: Optional[str]) -> Dict[str, Any]:
+        if self.pending >= self.workers + self.max_queue:
+            TRANSCRIPTION_REJECTED.labels(self.engine).inc()
+            raise TranscriptionBusyError("Transcription queue is full, please retry shortly")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _run_job, path, language, time.time())
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            self._executor = None
+            raise
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global transcription pool; workers start on first use or warm()
+transcription_pool = TranscriptionPool(
+    engine=settings.TRANSCRIPTION_ENGINE,
+    model_path=settings.TRANSCRIPTION_MODEL_PATH,
+    workers=settings.TRANSCRIPTION_WORKERS,
+    max_queue=settings.TRANSCRIPTION_MAX_QUEUE,
+    cpu_threads=settings.TRANSCRIPTION_CPU_THREADS
+)
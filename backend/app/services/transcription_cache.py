@@ -0,0 +1,137 @@
+"""Persistent cache of transcripts keyed by audio content."""
+
+import logging
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import TRANSCRIPTION_CACHE_PRUNED, TRANSCRIPTION_CACHE_SAVED_SECONDS
+from app.models.transcription import CachedTranscription
+from app.schemas.admin import TranscriptionCacheStats
+from app.schemas.voice import VoiceToTextResponse
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionKey(NamedTuple):
+    """What a transcript depends on: the audio and how it was transcribed."""
+    content_hash: str
+    engine: str
+    model: str
+    requested_language: str
+
+
+class TranscriptionCache:
+    """
+    Transcripts stored in the database, so a clip uploaded again (a client
+    retry, or the same recording sent twice) is answered without running
+    the engine. Entries remember how long the original transcription took;
+    each hit adds that to ``transcription_cache_saved_seconds_total``.
+    Entries unused for a while, and the least recently used beyond an
+    entry limit, are removed by ``prune``.
+    """
+    
+    def __init__(self, db: Session):
+        """
+        Initialize transcription cache.
+        
+        Args:
+            db: Database session
+        """
+        self.db = db
+    
+    def get(self, key: TranscriptionKey) -> Optional[VoiceToTextResponse]:
+        """Look up a transcript, recording the hit and the time it saves."""
+        entry = self.db.get(CachedTranscription, key)
+        if entry is None:
+            return None
+        
+        self.db.execute(
+            update(CachedTranscription)
+            .where(*(getattr(CachedTranscription, field) == value for field, value in key._asdict().items()))
+            .values(hits=CachedTranscription.hits + 1, last_used_at=datetime.utcnow())
+        )
+        self.db.commit()
+        TRANSCRIPTION_CACHE_SAVED_SECONDS.labels(key.engine).inc(entry.compute_seconds)
+        return VoiceToTextResponse(
+            text=entry.text,
+            confidence=entry.confidence,
+            language=entry.language,
+            duration_seconds=entry.duration_seconds
+        )
+    
+    def put(self, key: TranscriptionKey, response: VoiceToTextResponse, compute_seconds: float) -> None:
+        """Store a transcript; a concurrent insert of the same key wins."""
+        self.db.add(CachedTranscription(
+            **key._asdict(),
+            text=response.text,
+            language=response.language,
+            confidence=response.confidence,
+            duration_seconds=response.duration_seconds,
+            compute_seconds=compute_seconds
+        ))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+    
+    def prune(self, max_entries: int, max_age: timedelta) -> int:
+        """
+        Remove entries not used within ``max_age``, then the least recently
+        used ones until at most ``max_entries`` are left.
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = self.db.execute(
+            delete(CachedTranscription)
+            .where(CachedTranscription.last_used_at < datetime.utcnow() - max_age)
+        ).rowcount
+        
+        excess = self.db.scalar(select(func.count()).select_from(CachedTranscription)) - max_entries
+        if excess > 0:
+            key = tuple_(*CachedTranscription.__table__.primary_key.columns)
+            stale = (
+                select(*CachedTranscription.__table__.primary_key.columns)
+                .order_by(CachedTranscription.last_used_at)
+                .limit(excess)
+            )
+            removed += self.db.execute(
+                delete(CachedTranscription).where(key.in_(stale))
+            ).rowcount
+        
+        self.db.commit()
+        if removed:
+            TRANSCRIPTION_CACHE_PRUNED.inc(removed)
+        return removed
+    
+    def stats(self) -> TranscriptionCacheStats:
+        """Entries, hits and transcription time saved so far."""
+        entries, hits, saved = self.db.execute(select(
+            func.count(),
+            func.coalesce(func.sum(CachedTranscription.hits), 0),
+            func.coalesce(func.sum(CachedTranscription.hits * CachedTranscription.compute_seconds), 0.0)
+        ).select_from(CachedTranscription)).one()
+        return TranscriptionCacheStats(
+            entries=entries,
+            hits=hits,
+            hit_rate=round(hits / (hits + entries), 4) if entries else 0.0,
+            compute_seconds_saved=round(saved, 2)
+        )
+
+
+def prune_transcription_cache() -> int:
+    """Prune the cache to the configured age and entry limits; run by the janitor."""
+    with SessionLocal() as db:
+        removed = TranscriptionCache(db).prune(
+            settings.TRANSCRIPTION_CACHE_MAX_ENTRIES,
+            timedelta(days=settings.TRANSCRIPTION_CACHE_TTL_DAYS)
+        )
+    if removed:
+        logger.info("Pruned %d stored transcripts", removed)
+    return removed
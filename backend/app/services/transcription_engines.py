@@ -0,0 +1,141 @@
+"""
+Speech-to-text engines and the entry points of transcription pool workers.
+
+Pool workers are spawned, so they import this module fresh. It depends on
+nothing but the standard library; engines import their model libraries in
+``load``, and metrics and timing stay in the server process.
+"""
+
+import math
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from importlib import import_module
+from typing import Any, Dict, Optional, Type
+
+SAMPLE_TRANSCRIPTS = [
+    ("I had a chicken salad with ranch dressing and a diet coke", "en"),
+    ("我早餐吃了两个鸡蛋和一片全麦面包", "zh"),
+    ("For lunch I had a turkey sandwich with lettuce and tomato", "en"),
+    ("晚饭吃了一碗牛肉面加一个煎蛋", "zh"),
+    ("I just finished a large pepperoni pizza and a beer", "en"),
+    ("下午茶喝了一杯拿铁和一块芝士蛋糕", "zh"),
+    ("Had grilled salmon with steamed vegetables and brown rice", "en"),
+    ("早上喝了一杯豆浆配两个包子", "zh")
+]
+
+
+class TranscriptionEngine(ABC):
+    """
+    Speech-to-text engine.
+
+    Engines are created and loaded once in each pool worker process, then
+    transcribe one file at a time; they never run on the event loop.
+    Engines that set ``in_process`` are cheap enough to skip the pool and
+    run in the server process instead.
+    """
+
+    name = "engine"
+    in_process = False
+
+    def __init__(self, model_path: Optional[str] = None, cpu_threads: int = 1):
+        self.model_path = model_path
+        self.cpu_threads = cpu_threads
+
+    def load(self) -> None:
+        """Load the model; called once per worker before the first job."""
+
+    @abstractmethod
+    def transcribe(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe an audio file.
+
+        Returns:
+            Dict with ``text``, ``language``, ``confidence`` and ``duration_seconds``
+        """
+        pass
+
+
+class MockEngine(TranscriptionEngine):
+    """Canned transcripts, used when no local model is configured."""
+
+    name = "mock"
+    in_process = True
+
+    def transcribe(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        text, detected = random.choice(SAMPLE_TRANSCRIPTS)
+        return {
+            "text": text,
+            "language": detected,
+            "confidence": round(random.uniform(0.85, 0.99), 2),
+            "duration_seconds": round(random.uniform(2.0, 5.0), 1)
+        }
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """Local CPU Whisper model through ``faster-whisper`` (CTranslate2, int8)."""
+
+    name = "faster-whisper"
+
+    def load(self) -> None:
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_path or "base",
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=self.cpu_threads
+        )
+
+    def transcribe(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(path, language=language, beam_size=1)
+        segments = list(segments)
+        avg_logprob = (
+            sum(segment.avg_logprob for segment in segments) / len(segments)
+            if segments else -1.0
+        )
+        return {
+            "text": "".join(segment.text for segment in segments).strip(),
+            "language": info.language,
+            "confidence": round(min(1.0, math.exp(avg_logprob)), 2),
+            "duration_seconds": round(info.duration, 1)
+        }
+
+
+# Engine names accepted by TRANSCRIPTION_ENGINE besides ``module:Class`` paths
+ENGINES = {
+    "mock": "app.services.transcription_engines:MockEngine",
+    "faster-whisper": "app.services.transcription_engines:FasterWhisperEngine"
+}
+
+
+def load_engine_class(spec: str) -> Type[TranscriptionEngine]:
+    """Resolve an engine name or ``module:Class`` path to its class."""
+    module_name, _, class_name = ENGINES.get(spec, spec).partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown transcription engine: {spec}")
+    return getattr(import_module(module_name), class_name)
+
+
+# The engine loaded in this process when it is a pool worker
+_worker_engine: Optional[TranscriptionEngine] = None
+
+
+def _init_worker(spec: str, model_path: Optional[str], cpu_threads: int) -> None:
+    global _worker_engine
+    _worker_engine = load_engine_class(spec)(model_path=model_path, cpu_threads=cpu_threads)
+    _worker_engine.load()
+
+
+def _run_job(path: str, language: Optional[str], submitted_at: float) -> Dict[str, Any]:
+    # Wall clock, since the submitting process's monotonic clock is not ours
+    started = time.time()
+    result = _worker_engine.transcribe(path, language)
+    result["queue_wait"] = max(started - submitted_at, 0.0)
+    result["seconds"] = time.time() - started
+    return result
+
+
+def _worker_pid() -> int:
+    return os.getpid()
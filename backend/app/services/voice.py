@@ -1,65 +1,340 @@
 """Voice processing service for audio transcription."""
 
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Optional, BinaryIO
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional, Tuple
 from pathlib import Path
-import aiofiles
-import random
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import AUDIO_SECONDS, TRANSCRIPTION_CACHE_SAVED_SECONDS, record_cache
+from app.core.timing import timed
+from app.core.uploads import UploadTooLargeError
 from app.schemas.voice import VoiceToTextResponse
+from app.services.audio_store import get_audio_store
+from app.services.transcription import transcription_pool
+from app.services.transcription_engines import MockEngine
+from app.services.transcription_cache import TranscriptionCache, TranscriptionKey
+
+if TYPE_CHECKING:
+    from app.services.voice_stream import StreamingTranscriber
 
 logger = logging.getLogger(__name__)
 
+# Bytes needed to recognize every supported container
+SNIFF_BYTES = 12
+
+# Transcriptions running in this process, shared by identical uploads
+_in_flight: Dict[TranscriptionKey, "asyncio.Task[Tuple[VoiceToTextResponse, float]]"] = {}
+
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """
+    Identify an audio container from its first bytes.
+    
+    Args:
+        head: At least the first ``SNIFF_BYTES`` bytes of the file
+        
+    Returns:
+        ``mp3``, ``wav``, ``m4a`` or ``webm``, or None if unrecognized
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    return None
+
+
+class StagedAudio:
+    """An uploaded audio file written to staging storage."""
+    
+    __slots__ = ("path", "filename", "audio_format", "size_bytes", "content_hash")
+    
+    def __init__(
+        self,
+        path: Path,
+        filename: str,
+        audio_format: str,
+        size_bytes: int,
+        content_hash: Optional[str] = None
+    ):
+        self.path = path
+        self.filename = filename
+        self.audio_format = audio_format
+        self.size_bytes = size_bytes
+        self.content_hash = content_hash
+
 
 class VoiceService:
     """Service for processing voice input and transcription."""
     
-    def __init__(self):
-        """Initialize voice service."""
+    def __init__(self, db: Optional[Session] = None, session_factory: Optional[Callable[[], Session]] = None):
+        """
+        Initialize voice service.
+        
+        Args:
+            db: Database session for the transcription cache; transcripts
+                are not cached without one
+            session_factory: Factory for the sessions new transcripts are
+                stored with, which may outlive ``db``; ``SessionLocal`` by default
+        """
+        self.db = db
+        self.session_factory = session_factory or SessionLocal
         self.supported_formats = settings.SUPPORTED_AUDIO_FORMATS
         self.max_size_bytes = settings.MAX_AUDIO_SIZE_MB * 1024 * 1024
+        self.staging_dir = Path(settings.AUDIO_STAGING_DIR)
+        self.store = get_audio_store(settings.AUDIO_STAGING_DIR)
     
-    async def transcribe_audio(
-        self,
-        audio_file: BinaryIO,
-        filename: str
-    ) -> VoiceToTextResponse:
+    async def stage_upload(self, chunks: AsyncIterator[bytes], filename: str) -> StagedAudio:
         """
-        Transcribe audio file to text.
+        Write an uploaded audio stream to staging storage.
+        
+        Chunks are written and hashed as they arrive, so the upload is never
+        held in memory. The format is taken from the file's magic bytes
+        rather than its name, and the upload is abandoned as soon as it
+        grows past ``MAX_AUDIO_SIZE_MB``. The file is stored under its
+        SHA-256, sharing the bytes of an identical upload already staged;
+        hand it back with ``release`` when done. Writes count against the
+        staging quota and wait for space while it is exhausted.
         
         Args:
-            audio_file: Audio file binary data
+            chunks: Audio data as it is received
             filename: Original filename
             
         Returns:
-            VoiceToTextResponse with transcribed text
+            StagedAudio describing the stored file
             
         Raises:
-            ValueError: If file format is not supported or file is too large
+            ValueError: If the data is not a supported audio format
+            UploadTooLargeError: If the audio exceeds the size limit
+            StagingFullError: If staging storage stays full
         """
-        # Validate file format
-        file_extension = Path(filename).suffix.lower().lstrip('.')
-        if file_extension not in self.supported_formats:
+        digest = hashlib.sha256()
+        head = b""
+        audio_format = None
+        size = 0
+        
+        # The partial file is removed if anything below fails
+        async with self.store.open_partial() as partial:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_size_bytes:
+                    raise UploadTooLargeError(
+                        f"Audio file too large. Maximum size: {settings.MAX_AUDIO_SIZE_MB}MB"
+                    )
+                if audio_format is None:
+                    head += chunk
+                    if len(head) < SNIFF_BYTES:
+                        continue
+                    audio_format = self._check_format(head, filename)
+                    chunk, head = head, b""
+                digest.update(chunk)
+                await partial.write(chunk)
+            
+            if audio_format is None:
+                audio_format = self._check_format(head, filename)
+                digest.update(head)
+                await partial.write(head)
+        
+        content_hash = digest.hexdigest()
+        path, deduplicated = self.store.commit(partial, content_hash, audio_format)
+        record_cache("staged_audio", deduplicated)
+        logger.info(
+            "Staged %s audio upload %s (%d bytes, sha256 %s%s)",
+            audio_format, filename, size, content_hash[:12], ", already staged" if deduplicated else ""
+        )
+        
+        return StagedAudio(path, filename, audio_format, size, content_hash)
+    
+    def release(self, audio: StagedAudio) -> None:
+        """Give back staged audio; its file is removed once no request holds it."""
+        self.store.release(audio.path)
+    
+    def _check_format(self, head: bytes, filename: str) -> str:
+        """Return the sniffed format of an upload, rejecting unsupported ones."""
+        audio_format = sniff_audio_format(head)
+        if audio_format is None or audio_format not in self.supported_formats:
             raise ValueError(
-                f"Unsupported audio format: {file_extension}. "
+                f"Unsupported audio format: {filename} is not a recognized audio file. "
                 f"Supported formats: {', '.join(self.supported_formats)}"
             )
+        return audio_format
+    
+    async def transcribe_audio(self, audio: StagedAudio, language: Optional[str] = None) -> VoiceToTextResponse:
+        """
+        Transcribe a staged audio file to text.
         
-        # Check file size
-        audio_file.seek(0, 2)  # Seek to end
-        file_size = audio_file.tell()
-        audio_file.seek(0)  # Reset to beginning
+        The configured engine runs in the transcription process pool, so
+        the event loop stays free while the model works. Transcripts are
+        cached by content hash, engine, model and requested language: a
+        clip uploaded again is answered from the cache, and one uploaded
+        again while still being transcribed waits for that transcription
+        instead of starting another.
         
-        if file_size > self.max_size_bytes:
-            raise ValueError(
-                f"Audio file too large. Maximum size: {settings.MAX_AUDIO_SIZE_MB}MB"
-            )
+        Args:
+            audio: Audio written by ``stage_upload``
+            language: Language code, detected by the engine if omitted
+            
+        Returns:
+            VoiceToTextResponse with transcribed text
+            
+        Raises:
+            TranscriptionBusyError: If the transcription queue is full
+        """
+        if self.db is None or audio.content_hash is None or not settings.TRANSCRIPTION_CACHE_ENABLED:
+            response, _ = await self._transcribe(audio, language)
+            return response
+        
+        key = TranscriptionKey(
+            audio.content_hash,
+            transcription_pool.engine,
+            transcription_pool.model_path or "",
+            language or ""
+        )
+        with timed("cache"):
+            cached = TranscriptionCache(self.db).get(key)
+        if cached is not None:
+            record_cache("transcription", True)
+            logger.info("Transcript of %s served from cache", audio.filename)
+            return cached
+        
+        task = _in_flight.get(key)
+        record_cache("transcription", task is not None)
+        if task is None:
+            task = asyncio.create_task(self._transcribe_and_cache(key, audio, language))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+            # The caller that started it may go away; the others still wait
+            return (await asyncio.shield(task))[0]
+        
+        response, compute_seconds = await asyncio.shield(task)
+        TRANSCRIPTION_CACHE_SAVED_SECONDS.labels(key.engine).inc(compute_seconds)
+        logger.info("Transcript of %s shared with an identical upload in progress", audio.filename)
+        return response
+    
+    async def _transcribe_and_cache(
+        self,
+        key: TranscriptionKey,
+        audio: StagedAudio,
+        language: Optional[str]
+    ) -> Tuple[VoiceToTextResponse, float]:
+        # Hold our own reference, so the file outlives the request that started us
+        path = self.store.acquire(key.content_hash, audio.audio_format)
+        if path is not None:
+            audio = StagedAudio(path, audio.filename, audio.audio_format, audio.size_bytes, audio.content_hash)
+        try:
+            response, compute_seconds = await self._transcribe(audio, language)
+        finally:
+            if path is not None:
+                self.store.release(path)
+        await asyncio.to_thread(self._store_transcript, key, response, compute_seconds)
+        return response, compute_seconds
+    
+    def _store_transcript(self, key: TranscriptionKey, response: VoiceToTextResponse, compute_seconds: float) -> None:
+        """Cache a transcript with a session of its own; the request's may be gone."""
+        with self.session_factory() as db:
+            TranscriptionCache(db).put(key, response, compute_seconds)
+    
+    async def _transcribe(self, audio: StagedAudio, language: Optional[str]) -> Tuple[VoiceToTextResponse, float]:
+        """Preprocess and transcribe; also returns the compute seconds spent."""
+        started = time.perf_counter()
+        processed = await self.preprocess(audio)
+        preprocess_seconds = time.perf_counter() - started
+        try:
+            response, seconds = await transcription_pool.run(str((processed or audio).path), language)
+        finally:
+            if processed is not None:
+                await self.cleanup_audio_file(str(processed.path))
+        return response, preprocess_seconds + seconds
+    
+    async def preprocess(self, audio: StagedAudio) -> Optional[StagedAudio]:
+        """
+        Convert staged audio to what transcription engines work best on.
+        
+        Decodes, downmixes to mono, resamples to ``AUDIO_SAMPLE_RATE``,
+        trims leading and trailing silence, shortens long pauses and
+        normalizes the speech level, writing 16-bit WAV next to the
+        original. Runs in a worker thread; NumPy does the heavy lifting
+        outside the GIL.
+        
+        Args:
+            audio: Audio written by ``stage_upload``
+            
+        Returns:
+            StagedAudio for the processed file, or None when preprocessing is
+            disabled or the format cannot be decoded here (the original is
+            then transcribed as is)
+        """
+        if not settings.AUDIO_PREPROCESSING_ENABLED:
+            return None
+        
+        from app.services.audio_preprocessing import AudioDecodeError, preprocess_audio
+        
+        destination = audio.path.with_name(f"{audio.path.stem}.16k.wav")
+        try:
+            with timed("preprocess"):
+                input_seconds, output_seconds = await asyncio.to_thread(
+                    preprocess_audio,
+                    str(audio.path),
+                    audio.audio_format,
+                    str(destination),
+                    sample_rate=settings.AUDIO_SAMPLE_RATE,
+                    threshold_db=settings.AUDIO_VAD_THRESHOLD_DB,
+                    padding_ms=settings.AUDIO_VAD_PADDING_MS,
+                    target_db=settings.AUDIO_TARGET_LEVEL_DB
+                )
+        except AudioDecodeError as e:
+            destination.unlink(missing_ok=True)
+            logger.info("Transcribing %s without preprocessing: %s", audio.filename, e)
+            return None
+        
+        AUDIO_SECONDS.labels("received").inc(input_seconds)
+        AUDIO_SECONDS.labels("transcribed").inc(output_seconds)
+        logger.info(
+            "Preprocessed %s: %.1fs of audio trimmed to %.1fs",
+            audio.filename, input_seconds, output_seconds
+        )
+        return StagedAudio(destination, audio.filename, "wav", destination.stat().st_size)
+    
+    def open_stream(self, sample_rate: int, language: Optional[str] = None) -> "StreamingTranscriber":
+        """
+        Start incremental transcription of live 16-bit mono PCM.
+        
+        Segments are resampled to ``AUDIO_SAMPLE_RATE``, split on pauses
+        with the ``AUDIO_VAD_*`` settings, and transcribed in the
+        transcription pool while the user keeps talking.
+        
+        Args:
+            sample_rate: Sample rate of the incoming audio
+            language: Language code, detected by the engine if omitted
+            
+        Returns:
+            StreamingTranscriber to feed audio chunks to
+        """
+        from app.services.voice_stream import StreamingTranscriber
         
-        # For now, return mock transcription
-        # In production, integrate with Whisper API or other transcription service
-        return await self._mock_transcribe(filename)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return StreamingTranscriber(
+            transcription_pool.transcribe,
+            self.staging_dir,
+            sample_rate,
+            language=language,
+            target_rate=settings.AUDIO_SAMPLE_RATE,
+            threshold_db=settings.AUDIO_VAD_THRESHOLD_DB,
+            padding_ms=settings.AUDIO_VAD_PADDING_MS,
+            segment_pause_ms=settings.VOICE_WS_SEGMENT_PAUSE_MS,
+            end_silence_ms=settings.VOICE_WS_END_SILENCE_MS,
+            max_segment_seconds=settings.VOICE_WS_MAX_SEGMENT_SECONDS,
+            partial_max_seconds=settings.VOICE_WS_PARTIAL_MAX_SECONDS
+        )
     
     async def _mock_transcribe(self, filename: str) -> VoiceToTextResponse:
         """
@@ -71,34 +346,8 @@ class VoiceService:
         Returns:
             Mock transcription response
         """
-        # Simulate processing delay
-        import asyncio
-        await asyncio.sleep(0.5)
-        
-        # Generate mock transcription based on random samples
-        sample_meals = [
-            ("I had a chicken salad with ranch dressing and a diet coke", "en"),
-            ("我早餐吃了两个鸡蛋和一片全麦面包", "zh"),
-            ("For lunch I had a turkey sandwich with lettuce and tomato", "en"),
-            ("晚饭吃了一碗牛肉面加一个煎蛋", "zh"),
-            ("I just finished a large pepperoni pizza and a beer", "en"),
-            ("下午茶喝了一杯拿铁和一块芝士蛋糕", "zh"),
-            ("Had grilled salmon with steamed vegetables and brown rice", "en"),
-            ("早上喝了一杯豆浆配两个包子", "zh")
-        ]
-        
-        text, language = random.choice(sample_meals)
-        confidence = random.uniform(0.85, 0.99)
-        duration = random.uniform(2.0, 5.0)
-        
-        logger.info(f"Mock transcribed audio file: {filename}")
-        
-        return VoiceToTextResponse(
-            text=text,
-            confidence=round(confidence, 2),
-            language=language,
-            duration_seconds=round(duration, 1)
-        )
+        logger.info("Mock transcribed audio file: %s", filename)
+        return VoiceToTextResponse(**MockEngine().transcribe(filename))
     
     async def transcribe_with_whisper(
         self,
@@ -122,13 +371,10 @@ class VoiceService:
             
             client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
             
-            async with aiofiles.open(audio_file_path, 'rb') as audio:
-                audio_data = await audio.read()
-            
-            # Call Whisper API
+            # Call Whisper API; the SDK reads the file itself
             response = await client.audio.transcriptions.create(
                 model="whisper-1",
-                file=audio_data,
+                file=Path(audio_file_path),
                 response_format="verbose_json"
             )
             
@@ -140,45 +386,10 @@ class VoiceService:
             )
             
         except Exception as e:
-            logger.error(f"Error transcribing with Whisper: {e}")
+            logger.error("Error transcribing with Whisper: %s", e)
             # Fallback to mock
             return await self._mock_transcribe(audio_file_path)
     
-    async def save_audio_file(
-        self,
-        audio_file: BinaryIO,
-        filename: str
-    ) -> str:
-        """
-        Save uploaded audio file temporarily.
-        
-        Args:
-            audio_file: Audio file data
-            filename: Original filename
-            
-        Returns:
-            Path to saved file
-        """
-        import uuid
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = Path("uploads/audio")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate unique filename
-        file_extension = Path(filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = upload_dir / unique_filename
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = audio_file.read()
-            await f.write(content)
-        
-        logger.info(f"Saved audio file: {file_path}")
-        
-        return str(file_path)
-    
     async def cleanup_audio_file(self, file_path: str) -> None:
         """
         Remove temporary audio file.
@@ -189,6 +400,6 @@ class VoiceService:
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                logger.info(f"Cleaned up audio file: {file_path}")
+                logger.info("Cleaned up audio file: %s", file_path)
         except Exception as e:
-            logger.error(f"Error cleaning up audio file {file_path}: {e}")
\ No newline at end of file
+            logger.error("Error cleaning up audio file %s: %s", file_path, e)
\ No newline at end of file
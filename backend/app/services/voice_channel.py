@@ -0,0 +1,252 @@
+"""WebSocket channel streaming voice audio to incremental transcription."""
+
+import asyncio
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.core.rate_limit import SocketRateLimit
+from app.schemas.voice import VoiceSocketMessage
+from app.services.transcription import TranscriptionBusyError
+
+if TYPE_CHECKING:
+    # Imports NumPy, which is only loaded once a voice socket opens
+    from app.services.voice_stream import StreamingTranscriber, Utterance
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceChannel:
+    """
+    Serve one voice WebSocket.
+
+    Binary frames carry 16-bit little-endian mono PCM and are fed to a
+    ``StreamingTranscriber`` as they arrive. While the user speaks, a
+    ``partial`` hypothesis is sent every ``partial_interval`` seconds when
+    it changed. Once silence ends an utterance, or the client sends an
+    ``end`` frame, its ``final`` transcript follows; finals are sent in
+    utterance order. Pings and the idle timeout work as on the chat socket.
+
+    Each utterance is charged to the ``/api/voice-to-text`` rate limit once
+    speech starts, and again for every further ``seconds_per_request`` of
+    audio in it. An utterance over the limit is dropped with a
+    ``rate_limited`` error, and audio is ignored until ``retry_after``.
+
+    Frames sent to the client:
+        ``ready``    sample rate and language the channel was opened with
+        ``partial``  ``utterance`` index and hypothesis ``text``
+        ``final``    ``utterance`` index; ``data`` is a VoiceToTextResponse
+        ``error``    ``code`` and ``message`` (and ``retry_after`` when rate limited)
+        ``ping`` / ``pong``
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        stream: "StreamingTranscriber",
+        sample_rate: int,
+        max_frame_bytes: int = 64 * 1024,
+        partial_interval: float = 1.0,
+        send_queue_size: int = 32,
+        heartbeat_interval: float = 20.0,
+        idle_timeout: float = 60.0,
+        rate_limit: Optional[SocketRateLimit] = None,
+        seconds_per_request: float = 10.0
+    ):
+        """
+        Initialize voice channel.
+
+        Args:
+            websocket: Accepted WebSocket connection
+            stream: Transcriber the audio is fed to
+            sample_rate: Sample rate of the client's PCM
+            max_frame_bytes: Largest accepted audio frame
+            partial_interval: Seconds between partial hypotheses
+            send_queue_size: Outgoing frames buffered before producers wait
+            heartbeat_interval: Seconds between server pings
+            idle_timeout: Seconds without a client frame before closing
+            rate_limit: Charges a route's rate limit buckets, None when limiting is off
+            seconds_per_request: Utterance audio charged as one request
+        """
+        self.websocket = websocket
+        self.stream = stream
+        self.sample_rate = sample_rate
+        self.max_frame_bytes = max_frame_bytes
+        self.partial_interval = partial_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.rate_limit = rate_limit
+        self.seconds_per_request = seconds_per_request
+
+        self.outbox: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=send_queue_size)
+        self.tasks: Set[asyncio.Task] = set()
+        self.last_final: Optional[asyncio.Task] = None
+        self.last_seen = asyncio.get_running_loop().time()
+        # (utterance index, requests charged for it) and when audio is accepted again
+        self.charged = (-1, 0)
+        self.paused_until = 0.0
+
+    async def run(self) -> None:
+        """Serve the socket until the client leaves or goes idle."""
+        await self.send({
+            "type": "ready",
+            "sample_rate": self.sample_rate,
+            "language": self.stream.language
+        })
+
+        reader = asyncio.create_task(self._read_loop())
+        writer = asyncio.create_task(self._write_loop())
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        partials = asyncio.create_task(self._partial_loop())
+
+        done, pending = await asyncio.wait(
+            {reader, writer, heartbeat, partials}, return_when=asyncio.FIRST_COMPLETED
+        )
+        self.stream.cancel()
+        for task in pending | self.tasks:
+            task.cancel()
+        await asyncio.gather(*pending, *self.tasks, return_exceptions=True)
+
+        if heartbeat in done:
+            logger.info("Closing idle voice socket")
+            try:
+                await self.websocket.close(code=status.WS_1001_GOING_AWAY)
+            except RuntimeError:
+                pass
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """Queue a frame, waiting while the outbox is full."""
+        await self.outbox.put(orjson.dumps(frame))
+
+    async def _read_loop(self) -> None:
+        """Feed audio frames to the transcriber and handle control frames."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            self.last_seen = loop.time()
+
+            if message.get("bytes") is not None:
+                audio = message["bytes"]
+                if len(audio) > self.max_frame_bytes:
+                    await self._send_error(
+                        None, "frame_too_large", f"Audio frames are limited to {self.max_frame_bytes} bytes"
+                    )
+                    continue
+                if self.last_seen < self.paused_until:
+                    continue
+                for utterance in self.stream.feed(audio):
+                    if await self._charge(utterance.index, utterance.seconds):
+                        self._finalize(utterance)
+                    else:
+                        utterance.cancel()
+                seconds = self.stream.speech_seconds
+                if seconds and not await self._charge(self.stream.utterance.index, seconds):
+                    self.stream.discard_utterance()
+                continue
+
+            try:
+                frame = VoiceSocketMessage.model_validate_json(message.get("text") or "")
+            except ValidationError as e:
+                await self._send_error(None, "invalid_frame", str(e.errors()[0]["msg"]))
+                continue
+
+            if frame.type == "ping":
+                await self.send({"type": "pong", "id": frame.id})
+            elif frame.type == "end":
+                utterance = self.stream.end_utterance()
+                if utterance is not None:
+                    self._finalize(utterance)
+
+    async def _write_loop(self) -> None:
+        """Send queued frames in order; ends when the socket fails."""
+        while True:
+            frame = await self.outbox.get()
+            try:
+                await self.websocket.send_text(frame.decode("utf-8"))
+            except (WebSocketDisconnect, RuntimeError):
+                return
+
+    async def _heartbeat_loop(self) -> None:
+        """Ping the client; return once it has been idle too long."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if loop.time() - self.last_seen > self.idle_timeout:
+                return
+            try:
+                self.outbox.put_nowait(b'{"type":"ping"}')
+            except asyncio.QueueFull:
+                pass
+
+    async def _partial_loop(self) -> None:
+        """Send the current hypothesis while the user is speaking."""
+        while True:
+            await asyncio.sleep(self.partial_interval)
+            index = self.stream.utterance.index
+            try:
+                text = await self.stream.partial()
+            except TranscriptionBusyError:
+                # Partials are best effort; the final transcript is not skipped
+                continue
+            if text is not None:
+                await self.send({"type": "partial", "utterance": index, "text": text})
+
+    async def _charge(self, index: int, seconds: float) -> bool:
+        """Charge an utterance's audio to the voice rate limit, reporting a denial."""
+        requests = 1 + int(seconds // self.seconds_per_request)
+        if self.rate_limit is None or self.charged >= (index, requests):
+            return True
+
+        allowed, retry_after = await self.rate_limit("/api/voice-to-text", None)
+        if allowed:
+            self.charged = (index, requests)
+            return True
+
+        self.paused_until = asyncio.get_running_loop().time() + retry_after
+        await self.send({
+            "type": "error",
+            "utterance": index,
+            "code": "rate_limited",
+            "message": "Too much audio, please slow down",
+            "retry_after": max(1, math.ceil(retry_after))
+        })
+        return False
+
+    def _finalize(self, utterance: "Utterance") -> None:
+        """Send the utterance's final transcript once earlier finals are out."""
+        task = asyncio.create_task(self._send_final(utterance, self.last_final))
+        self.last_final = task
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _send_final(self, utterance: "Utterance", previous: Optional[asyncio.Task]) -> None:
+        error = None
+        try:
+            result = await utterance.result(self.stream.language)
+        except TranscriptionBusyError as e:
+            error = ("busy", str(e))
+        except Exception as e:
+            logger.error("Error transcribing streamed audio: %s", e)
+            error = ("transcription_failed", f"Failed to transcribe audio: {str(e)}")
+
+        if previous is not None:
+            await asyncio.wait({previous})
+        if error is not None:
+            await self._send_error(utterance.index, *error)
+            return
+
+        await self.outbox.put(
+            b'{"type":"final","utterance":' + orjson.dumps(utterance.index)
+            + b',"data":' + result.__pydantic_serializer__.to_json(result) + b"}"
+        )
+
+    async def _send_error(self, utterance: Optional[int], code: str, message: str) -> None:
+        await self.send({"type": "error", "utterance": utterance, "code": code, "message": message})
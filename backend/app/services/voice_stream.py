@@ -0,0 +1,275 @@
+"""Incremental transcription of live audio streams.
+
+Audio arrives as 16-bit mono PCM in small chunks while the user talks. It
+is resampled and split into segments at short pauses. Each segment is
+transcribed in the background as soon as it closes, so when a longer
+silence ends the utterance, only the last segment remains to be
+transcribed. Partial hypotheses combine the finished segments with a
+transcription of the latest few seconds of the segment still being spoken.
+"""
+
+import asyncio
+import uuid
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.schemas.voice import VoiceToTextResponse
+from app.services.audio_preprocessing import FRAME_MS, StreamingResampler
+
+# Transcribes a WAV file, given its path and an optional language code
+Transcribe = Callable[[str, Optional[str]], Awaitable[VoiceToTextResponse]]
+
+# Languages written without spaces between words
+UNSPACED_LANGUAGES = ("zh", "ja", "th")
+
+
+def join_texts(texts: List[str], language: Optional[str]) -> str:
+    """Join segment transcripts the way the language is written."""
+    separator = "" if language and language.startswith(UNSPACED_LANGUAGES) else " "
+    return separator.join(text.strip() for text in texts if text.strip())
+
+
+class Utterance:
+    """The segments of one utterance, transcribed in the background in order."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.segments: List[Tuple[asyncio.Task, float]] = []
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds for _, seconds in self.segments)
+
+    def committed(self) -> List[VoiceToTextResponse]:
+        """Transcripts of the leading segments that are already finished."""
+        results = []
+        for task, _ in self.segments:
+            if not task.done() or task.cancelled() or task.exception():
+                break
+            results.append(task.result())
+        return results
+
+    async def result(self, language: Optional[str] = None) -> VoiceToTextResponse:
+        """
+        Wait for every segment and combine their transcripts.
+
+        Raises:
+            TranscriptionBusyError: If a segment could not be queued
+        """
+        results = await asyncio.gather(*(task for task, _ in self.segments))
+        weights = [seconds for _, seconds in self.segments]
+        total = sum(weights) or 1.0
+        longest = max(range(len(results)), key=lambda i: weights[i])
+        detected = language or results[longest].language
+        return VoiceToTextResponse(
+            text=join_texts([r.text for r in results], detected),
+            confidence=round(sum(r.confidence * w for r, w in zip(results, weights)) / total, 2),
+            language=detected,
+            duration_seconds=round(self.seconds, 1)
+        )
+
+    def cancel(self) -> None:
+        for task, _ in self.segments:
+            task.cancel()
+
+
+class StreamingTranscriber:
+    """
+    Split a live PCM stream into utterances and transcribe them incrementally.
+
+    ``feed`` runs energy-based voice activity detection on 20 ms frames at
+    ``target_rate``. Speech closes into a segment after ``segment_pause_ms``
+    of silence or ``max_segment_seconds`` of audio, and the segment is
+    transcribed right away. ``end_silence_ms`` of silence after speech ends
+    the utterance, which is handed back for the final transcript. Partials
+    transcribe at most the last ``partial_max_seconds`` of the open segment.
+    Only the open segment is held in memory.
+    """
+
+    def __init__(
+        self,
+        transcribe: Transcribe,
+        directory: Path,
+        sample_rate: int,
+        language: Optional[str] = None,
+        target_rate: int = 16000,
+        threshold_db: float = -45.0,
+        padding_ms: int = 200,
+        segment_pause_ms: int = 300,
+        end_silence_ms: int = 800,
+        max_segment_seconds: float = 10.0,
+        partial_max_seconds: float = 5.0
+    ):
+        """
+        Initialize streaming transcriber.
+
+        Args:
+            transcribe: Coroutine function transcribing a WAV file
+            directory: Where segment WAV files are written while transcribed
+            sample_rate: Sample rate of the incoming PCM
+            language: Language code, detected by the engine if omitted
+            target_rate: Sample rate segments are transcribed at
+            threshold_db: Frame level (dBFS) below which audio counts as silence
+            padding_ms: Silence kept before speech
+            segment_pause_ms: Pause closing a segment
+            end_silence_ms: Silence ending the utterance
+            max_segment_seconds: Longest segment before it is closed mid-speech
+            partial_max_seconds: Longest audio transcribed for a partial hypothesis
+        """
+        self.transcribe = transcribe
+        self.directory = directory
+        self.language = language
+        self.target_rate = target_rate
+        self.resampler = StreamingResampler(sample_rate, target_rate)
+        self.frame = target_rate * FRAME_MS // 1000
+        self.threshold = 10 ** (threshold_db / 20)
+        self.pause_frames = max(1, segment_pause_ms // FRAME_MS)
+        self.end_frames = max(self.pause_frames, end_silence_ms // FRAME_MS)
+        self.max_segment_frames = int(max_segment_seconds * 1000 / FRAME_MS)
+        self.partial_max_frames = max(1, int(partial_max_seconds * 1000 / FRAME_MS))
+
+        self.pending = np.zeros(0, np.float32)
+        self.preroll: deque = deque(maxlen=max(1, padding_ms // FRAME_MS))
+        self.segment: List[np.ndarray] = []
+        self.silent_frames = 0
+        self.utterance = Utterance(0)
+        # Voiced frames heard so far, to skip partials when nothing changed
+        self.voiced_frames = 0
+        self.partial_at = 0
+        self.last_partial: Optional[str] = None
+        # Hypothesis for the open segment, kept while its audio is unchanged
+        self.segment_text: Optional[str] = None
+
+    @property
+    def speech_seconds(self) -> float:
+        """Audio in the current utterance so far, 0 until speech starts."""
+        return self.utterance.seconds + len(self.segment) * FRAME_MS / 1000
+
+    def feed(self, pcm: bytes) -> List[Utterance]:
+        """
+        Add little-endian 16-bit mono samples.
+
+        Returns:
+            Utterances this audio ended with silence, usually none
+        """
+        samples = np.frombuffer(pcm, "<i2", count=len(pcm) // 2).astype(np.float32) / 32768.0
+        samples = np.concatenate([self.pending, self.resampler.process(samples)])
+        usable = len(samples) - len(samples) % self.frame
+        self.pending = samples[usable:]
+        if not usable:
+            return []
+
+        frames = samples[:usable].reshape(-1, self.frame)
+        voiced = np.mean(frames * frames, axis=1) >= self.threshold ** 2
+        ended = []
+
+        for frame, is_voiced in zip(frames, voiced):
+            if is_voiced:
+                if not self.segment:
+                    self.segment.extend(self.preroll)
+                    self.preroll.clear()
+                self.segment.append(frame)
+                self.silent_frames = 0
+                self.voiced_frames += 1
+            elif self.segment:
+                self.segment.append(frame)
+                self.silent_frames += 1
+                if self.silent_frames >= self.pause_frames:
+                    self._close_segment()
+            else:
+                self.preroll.append(frame)
+                if self.utterance.segments:
+                    self.silent_frames += 1
+                    if self.silent_frames >= self.end_frames:
+                        ended.append(self.end_utterance())
+
+            if len(self.segment) >= self.max_segment_frames:
+                self._close_segment()
+
+        return ended
+
+    def end_utterance(self) -> Optional[Utterance]:
+        """
+        Close the current utterance and start a new one.
+
+        Returns:
+            The utterance, with all of its segments submitted for
+            transcription, or None if no speech was heard
+        """
+        if self.segment:
+            self._close_segment()
+        if not self.utterance.segments:
+            return None
+        utterance = self.utterance
+        self._next_utterance()
+        return utterance
+
+    def discard_utterance(self) -> None:
+        """Drop the current utterance, cancelling its transcriptions."""
+        self.utterance.cancel()
+        self.segment = []
+        self.segment_text = None
+        self._next_utterance()
+
+    async def partial(self) -> Optional[str]:
+        """
+        Current hypothesis for the utterance being spoken.
+
+        The open segment is transcribed whole while it is shorter than
+        ``partial_max_seconds``, then only its latest ``partial_max_seconds``,
+        which overlap the audio of the previous partial.
+
+        Returns:
+            Finished segments plus a transcription of the open segment, or
+            None when nothing changed since the last partial
+        """
+        texts = [result.text for result in self.utterance.committed()]
+        segment = self.segment
+        if segment and self.voiced_frames != self.partial_at:
+            self.partial_at = self.voiced_frames
+            hypothesis = await self._transcribe(np.concatenate(segment[-self.partial_max_frames:]))
+            if segment is not self.segment:
+                return None
+            self.segment_text = hypothesis.text
+        if self.segment and self.segment_text:
+            texts.append(self.segment_text)
+        text = join_texts(texts, self.language)
+        if not text or text == self.last_partial:
+            return None
+        self.last_partial = text
+        return text
+
+    def cancel(self) -> None:
+        """Stop transcribing the current utterance."""
+        self.utterance.cancel()
+
+    def _close_segment(self) -> None:
+        audio = np.concatenate(self.segment)
+        self.segment = []
+        self.segment_text = None
+        task = asyncio.create_task(self._transcribe(audio))
+        self.utterance.segments.append((task, len(audio) / self.target_rate))
+
+    def _next_utterance(self) -> None:
+        self.utterance = Utterance(self.utterance.index + 1)
+        self.silent_frames = 0
+        self.last_partial = None
+
+    async def _transcribe(self, audio: np.ndarray) -> VoiceToTextResponse:
+        path = self.directory / f"{uuid.uuid4()}.stream.wav"
+        try:
+            await asyncio.to_thread(self._write_wav, path, audio)
+            return await self.transcribe(str(path), self.language)
+        finally:
+            path.unlink(missing_ok=True)
+
+    def _write_wav(self, path: Path, audio: np.ndarray) -> None:
+        with wave.open(str(path), "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(self.target_rate)
+            writer.writeframes((np.clip(audio, -1.0, 32767 / 32768) * 32768).astype("<i2").tobytes())
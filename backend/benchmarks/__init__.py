@@ -0,0 +1,9 @@
+"""Performance benchmarks for the Cal AI backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_export``.
+"""
+
+import os
+
+# Benchmarks hammer endpoints from a single client
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
@@ -0,0 +1,104 @@
+"""Response compression benchmark.
+
+Measures bytes on the wire and CPU per response for a 200-message chat
+history page under each encoding and level, and the cost of serving a
+reused (ETag-cached) compressed body through ``CompressionMiddleware``.
+
+Usage:
+    python -m benchmarks.bench_compression [--meals 500] [--output results.json]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.fixtures import create_sqlite_engine, session_factory, seed_session, write_results
+from app.api.v1 import deps
+from app.core.compression import build_encoders
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 9],
+    "zstd": [1, 3, 10],
+}
+
+
+def cpu_ms(func, iterations: int = 50) -> float:
+    """Average CPU milliseconds per call."""
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return round((time.process_time() - started) * 1000 / iterations, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    from main import app
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    engine, path = create_sqlite_engine()
+    factory = session_factory(engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.get_db] = override_get_db
+    try:
+        with factory() as db:
+            session_id = seed_session(db, args.meals)
+
+        client = TestClient(app)
+        url = f"/api/chat-history?session_id={session_id}&limit={args.limit}"
+        body = client.get(url, headers={"Accept-Encoding": "identity"}).content
+
+        encoders = {}
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                encoder = build_encoders(gzip_level=level, brotli_quality=level, zstd_level=level).get(encoding)
+                if encoder is None:
+                    continue
+                compressed = encoder(body)
+                encoders[f"{encoding}-{level}"] = {
+                    "bytes": len(compressed),
+                    "ratio": round(len(body) / len(compressed), 2),
+                    "cpu_ms": cpu_ms(lambda: encoder(body)),
+                }
+
+        end_to_end = {}
+        for encoding in ("identity", "gzip", "br", "zstd"):
+            headers = {"Accept-Encoding": encoding}
+            response = client.get(url, headers=headers)
+            end_to_end[encoding] = {
+                "wire_bytes": int(response.headers["content-length"]),
+                "content_encoding": response.headers.get("content-encoding"),
+                "request_cpu_ms": cpu_ms(lambda: client.get(url, headers=headers), 20),
+            }
+
+        results = {
+            "benchmark": "compression",
+            "uncompressed_bytes": len(body),
+            "encoders": encoders,
+            "end_to_end_cached": end_to_end,
+        }
+    finally:
+        app.dependency_overrides.pop(deps.get_db, None)
+        engine.dispose()
+        os.remove(path)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
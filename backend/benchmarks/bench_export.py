@@ -0,0 +1,76 @@
+"""Export throughput benchmark.
+
+Measures rows/s, bytes/s and peak Python memory of ``ExportService`` for
+growing session sizes. Peak memory should stay flat as history grows.
+
+Usage:
+    python -m benchmarks.bench_export [--meals 1000 10000] [--output results.json]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from benchmarks.fixtures import create_sqlite_engine, session_factory, seed_session, write_results
+from app.services.export import ExportService
+
+
+def run(meals: int, export_format: str, compress: bool, factory) -> dict:
+    """Export one seeded session and measure it."""
+    with factory() as db:
+        session_id = seed_session(db, meals)
+
+    with factory() as db:
+        service = ExportService(db)
+        started = time.perf_counter()
+        total_bytes = sum(
+            len(chunk) for chunk in service.stream(session_id, export_format, compress=compress)
+        )
+        elapsed = time.perf_counter() - started
+
+        # Separate pass for memory, since tracing distorts timings
+        tracemalloc.start()
+        for _ in service.stream(session_id, export_format, compress=compress):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    messages = meals * 2
+    return {
+        "meals": meals,
+        "messages": messages,
+        "format": export_format,
+        "gzip": compress,
+        "seconds": round(elapsed, 4),
+        "messages_per_second": round(messages / elapsed),
+        "bytes": total_bytes,
+        "mb_per_second": round(total_bytes / elapsed / 1e6, 2),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    engine, path = create_sqlite_engine()
+    factory = session_factory(engine)
+    try:
+        results = [
+            run(meals, export_format, compress, factory)
+            for meals in args.meals
+            for export_format in ("ndjson", "csv")
+            for compress in (False, True)
+        ]
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+    write_results({"benchmark": "export", "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Chat history endpoint microbenchmark.
+
+Times ``GET /api/chat-history`` pages end to end through the ASGI app
+(query, response building, validation and serialization) against a seeded
+ephemeral SQLite file, plus the 304 fast path for conditional GETs of
+history pages and session summaries.
+
+Usage:
+    python -m benchmarks.bench_history [--meals 5000] [--limit 200] [--output results.json]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.fixtures import create_sqlite_engine, session_factory, seed_session, write_results
+from app.api.v1 import deps
+from app.services.chat import ChatService
+
+
+def time_calls(func, iterations: int) -> dict:
+    """Call ``func`` repeatedly and summarize per-call latency in ms."""
+    func()  # Warm up
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meals", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    from main import app
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    engine, path = create_sqlite_engine()
+    factory = session_factory(engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.get_db] = override_get_db
+    try:
+        with factory() as db:
+            session_id = seed_session(db, args.meals)
+
+        client = TestClient(app)
+        url = f"/api/chat-history?session_id={session_id}&limit={args.limit}"
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+
+        etag = response.headers["etag"]
+        summary_url = f"/api/session-summary/{session_id}"
+        summary_etag = client.get(summary_url).headers["etag"]
+
+        def service_only():
+            with factory() as db:
+                ChatService(db).get_chat_history(session_id=session_id, limit=args.limit)
+
+        results = {
+            "benchmark": "chat_history",
+            "messages": args.meals * 2,
+            "limit": args.limit,
+            "response_bytes": len(response.content),
+            "endpoint": time_calls(lambda: client.get(url), args.iterations),
+            "service": time_calls(service_only, args.iterations),
+            "endpoint_not_modified": time_calls(
+                lambda: client.get(url, headers={"If-None-Match": etag}), args.iterations
+            ),
+            "summary": time_calls(lambda: client.get(summary_url), args.iterations),
+            "summary_not_modified": time_calls(
+                lambda: client.get(summary_url, headers={"If-None-Match": summary_etag}), args.iterations
+            ),
+        }
+    finally:
+        app.dependency_overrides.pop(deps.get_db, None)
+        engine.dispose()
+        os.remove(path)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""History import throughput benchmark.
+
+Generates a CSV log and imports it with ``HistoryImportService`` into an
+ephemeral SQLite file, reporting rows/s for several batch sizes.
+
+Usage:
+    python -m benchmarks.bench_import [--rows 50000] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+from datetime import datetime, timedelta
+
+from benchmarks.fixtures import SAMPLE_FOODS, create_sqlite_engine, session_factory, write_results
+from app.services.history_import import HistoryImportService
+
+
+def build_csv(rows: int, items_per_meal: int = 3) -> bytes:
+    """Build a CSV log with ``rows`` food rows."""
+    start = datetime(2020, 1, 1)
+    lines = ["date,meal,food,quantity,unit,kcal,protein,carbs,fat"]
+    for i in range(rows):
+        meal = i // items_per_meal
+        name, name_cn, amount, unit, calories, protein, carbs, fat = SAMPLE_FOODS[i % len(SAMPLE_FOODS)]
+        timestamp = (start + timedelta(hours=meal * 6)).isoformat()
+        lines.append(f"{timestamp},餐 {meal},{name_cn},{amount},{unit},{calories},{protein},{carbs},{fat}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def run(data: bytes, batch_size: int, factory) -> dict:
+    """Import one generated file and return the final progress."""
+    with factory() as db:
+        service = HistoryImportService(db, batch_size=batch_size, commit_every=10)
+        session_id = service.get_or_create_session(None)
+        updates = 0
+        async for result in service.import_file(io.BytesIO(data), "csv", session_id):
+            updates += 1
+
+    return {
+        "batch_size": batch_size,
+        "rows": result.rows_read,
+        "meals": result.meals_imported,
+        "seconds": result.seconds,
+        "rows_per_second": result.rows_per_second,
+        "progress_updates": updates
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    data = build_csv(args.rows)
+    engine, path = create_sqlite_engine()
+    factory = session_factory(engine)
+    try:
+        results = [asyncio.run(run(data, batch_size, factory)) for batch_size in args.batch_sizes]
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+    write_results({"benchmark": "import", "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
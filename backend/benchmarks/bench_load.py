@@ -0,0 +1,332 @@
+"""End-to-end load benchmark for the public endpoints.
+
+Drives a weighted mix of analyze-meal, chat-history, session-summary and
+voice-to-text requests at a fixed arrival rate against the application,
+either in-process (through the ASGI interface) or as a ``uvicorn``
+subprocess. The AI provider is replaced by a local fake server with a
+configurable delay, and the database is an ephemeral SQLite file seeded
+with a few sessions.
+
+Requests are sent open loop: each one starts at its scheduled time whether
+or not earlier ones have finished, and latency is measured from that time,
+so a server falling behind shows up as latency rather than as a lower send
+rate. Reported: p50/p95/p99 latency, throughput, error rate and RSS, per
+endpoint and overall.
+
+Usage:
+    python -m benchmarks.bench_load [--rps 20] [--duration 30] [--mode inprocess|uvicorn]
+        [--mix analyze_meal=2,chat_history=5,session_summary=2,voice_to_text=1]
+        [--ai-latency 0.2] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.fixtures import create_sqlite_engine, session_factory, seed_session, write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = "analyze_meal=2,chat_history=5,session_summary=2,voice_to_text=1"
+
+MEALS = [
+    "I had 2 scrambled eggs and a slice of whole wheat toast",
+    "午饭吃了番茄牛肉和一碗米饭",
+    "A turkey sandwich with lettuce and a glass of milk",
+    "晚饭吃了一碗牛肉面加一个煎蛋",
+]
+
+# ID3 tag followed by an MPEG frame header, so the upload passes format sniffing
+AUDIO = b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff\xfb\x90\x00" + bytes(8192)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``name=weight,...`` into a weight per endpoint."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def analyze_meal(client: httpx.AsyncClient, session_id: str):
+    return client.post("/api/analyze-meal", json={
+        "message": random.choice(MEALS), "session_id": session_id, "language": "auto"
+    })
+
+
+def chat_history(client: httpx.AsyncClient, session_id: str):
+    return client.get("/api/chat-history", params={"session_id": session_id, "limit": 50})
+
+
+def session_summary(client: httpx.AsyncClient, session_id: str):
+    return client.get(f"/api/session-summary/{session_id}")
+
+
+def voice_to_text(client: httpx.AsyncClient, session_id: str):
+    return client.post("/api/voice-to-text", files={"audio": ("meal.mp3", AUDIO, "audio/mpeg")})
+
+
+ENDPOINTS: Dict[str, Callable] = {
+    "analyze_meal": analyze_meal,
+    "chat_history": chat_history,
+    "session_summary": session_summary,
+    "voice_to_text": voice_to_text,
+}
+
+
+def memory_mb(pids: List[int]) -> float:
+    """Resident set size of ``pids`` in MB, from /proc where available."""
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            if pid == os.getpid():
+                # Peak rather than current RSS, where /proc is unavailable (kB on Linux, bytes on macOS)
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                total_kb += peak // 1024 if sys.platform == "darwin" else peak
+    return round(total_kb / 1024, 1)
+
+
+def process_tree(pid: int) -> List[int]:
+    """``pid`` and its child processes (uvicorn workers)."""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        children = []
+    return [pid, *children]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    return round(samples[min(len(samples) - 1, int(len(samples) * q))], 2)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round((count - errors) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    sessions: List[str],
+    mix: Dict[str, float],
+    rps: float,
+    duration: float,
+    pids: List[int]
+) -> Dict[str, Any]:
+    """Send requests at ``rps`` for ``duration`` seconds and summarize them."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    results: Dict[str, Tuple[List[float], List[str]]] = {name: ([], []) for name in names}
+    rss_samples = [memory_mb(pids)]
+
+    async def one(name: str, scheduled: float) -> None:
+        latencies, errors = results[name]
+        try:
+            response = await ENDPOINTS[name](client, random.choice(sessions))
+            if response.status_code >= 400:
+                errors.append(f"HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    async def sample_memory() -> None:
+        while True:
+            await asyncio.sleep(0.5)
+            rss_samples.append(memory_mb(pids))
+
+    sampler = asyncio.create_task(sample_memory())
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(rps * duration)):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = random.choices(names, weights)[0]
+        tasks.append(asyncio.create_task(one(name, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    rss_samples.append(memory_mb(pids))
+
+    all_latencies = [ms for latencies, _ in results.values() for ms in latencies]
+    all_errors = [error for _, errors in results.values() for error in errors]
+    return {
+        **summarize(all_latencies, len(all_errors), elapsed),
+        "elapsed_s": round(elapsed, 2),
+        "error_kinds": {kind: all_errors.count(kind) for kind in sorted(set(all_errors))},
+        "endpoints": {
+            name: summarize(latencies, len(errors), elapsed)
+            for name, (latencies, errors) in results.items()
+        },
+        "rss_mb": {"start": rss_samples[0], "peak": max(rss_samples), "end": rss_samples[-1]},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_inprocess(args, sessions: List[str], mix: Dict[str, float]) -> Dict[str, Any]:
+    # Settings were loaded when the fixtures imported the app, before the
+    # environment pointed at the fake provider; apply it to them directly
+    from app.core.config import settings
+    settings.AI_PROVIDER = "anthropic"
+    settings.ANTHROPIC_API_KEY = os.environ["ANTHROPIC_API_KEY"]
+    settings.LOG_LEVEL = os.environ["LOG_LEVEL"]
+
+    from main import app
+    from app.api.v1 import deps
+
+    engine, _ = create_sqlite_engine(args.database)
+    factory = session_factory(engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_session_factory] = lambda: factory
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+                return await drive(client, sessions, mix, args.rps, args.duration, [os.getpid()])
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+async def run_uvicorn(args, sessions: List[str], mix: Dict[str, float]) -> Dict[str, Any]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy()
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            for _ in range(200):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise SystemExit("uvicorn did not start")
+            return await drive(client, sessions, mix, args.rps, args.duration, process_tree(server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target arrival rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, name=weight,...")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--meals", type=int, default=200, help="Meals seeded per session")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="Fake provider delay in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (uvicorn mode)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+
+    engine, path = create_sqlite_engine()
+    factory = session_factory(engine)
+    with factory() as db:
+        sessions = [seed_session(db, args.meals) for _ in range(args.sessions)]
+    engine.dispose()
+
+    with FakeProvider(latency=args.ai_latency) as provider:
+        # Read by the settings and SDK clients of the app under test
+        os.environ.update({
+            "DATABASE_URL": f"sqlite:///{path}",
+            "AI_PROVIDER": "anthropic",
+            "ANTHROPIC_API_KEY": "bench",
+            "ANTHROPIC_BASE_URL": provider.url,
+            "OPENAI_BASE_URL": f"{provider.url}/v1",
+            "LOG_LEVEL": "WARNING",
+        })
+        try:
+            args.database = path
+            runner = run_uvicorn if args.mode == "uvicorn" else run_inprocess
+            load = asyncio.run(runner(args, sessions, mix))
+        finally:
+            os.remove(path)
+        ai_calls = len(provider.requests)
+
+    results = {
+        "benchmark": "load",
+        "commit": git_commit(),
+        "mode": args.mode,
+        "workers": args.workers if args.mode == "uvicorn" else None,
+        "target_rps": args.rps,
+        "duration_s": args.duration,
+        "mix": mix,
+        "ai_latency_ms": args.ai_latency * 1000,
+        "ai_calls": ai_calls,
+        "seeded": {"sessions": args.sessions, "meals_per_session": args.meals},
+        **load,
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
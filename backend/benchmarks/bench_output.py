@@ -0,0 +1,118 @@
+"""Meal analysis output size benchmark.
+
+Writes the same analyses (1 to 20 food items) in the verbose key format the
+``full`` profile asks for and in the positional short-key format of the
+``compact`` and ``minimal`` profiles, and reports estimated output tokens
+for each. Generation time is estimated from the tokens at ``--tokens-per-second``,
+since output tokens are produced one at a time. The time to expand a short
+answer back into ``food_items`` is measured, and each expansion is checked
+to give the same food items as the verbose answer.
+
+Usage:
+    python -m benchmarks.bench_output [--items 1 3 8 20] [--tokens-per-second 80]
+        [--output results.json]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fixtures import write_results
+from app.services.ai_prompts import SHORT_FOOD_FIELDS, estimate_tokens, expand_meal_analysis
+
+FOODS = [
+    ("Rice", "米饭", "1", "碗", 232, 4.3, 51.0, 0.4, 0.6, 0.1, 2),
+    ("Beef noodles", "牛肉面", "1", "碗", 550, 28.0, 70.0, 16.0, 3.0, 4.0, 1800),
+    ("Fried egg", "煎蛋", "1", "个", 90, 6.3, 0.4, 6.8, None, None, None),
+    ("Soy milk", "豆浆", "250", "ml", 80, 7.0, 4.0, 4.0, 1.0, 2.0, 30),
+    ("Steamed bun", "包子", "2", "个", 460, 16.0, 70.0, 12.0, 2.5, 6.0, 900),
+    ("Stir-fried greens", "炒青菜", "150", "g", 95, 3.0, 6.0, 7.0, 3.5, 2.0, 420),
+    ("Latte", "拿铁", "1", "杯", 190, 10.0, 18.0, 7.0, 0.0, 17.0, 150),
+    ("Apple", "苹果", "1", "个", 95, 0.5, 25.0, 0.3, 4.4, 19.0, 2),
+]
+NOTES = "蛋白质充足，蔬菜偏少；份量按常见一碗估算。"
+REPLY = "这顿饭营养搭配不错！蛋白质充足，可以再加一些绿叶蔬菜。😊"
+
+
+def verbose_answer(rows: List[tuple]) -> Dict[str, Any]:
+    """An answer in the ``full`` profile's format, including the fields nothing stores."""
+    return {
+        "input_type": "food",
+        "food_items": [
+            {field: value for field, value in zip(SHORT_FOOD_FIELDS, row) if value is not None}
+            for row in rows
+        ],
+        "analysis_notes": NOTES,
+        "ai_response": REPLY,
+        "suggestions": ["多吃绿叶蔬菜", "主食换成杂粮", "少喝含糖饮料"],
+        "health_score": 7,
+    }
+
+
+def short_answer(rows: List[tuple], notes: bool) -> Dict[str, Any]:
+    """An answer in the positional format, trailing unknown values left out."""
+    answer: Dict[str, Any] = {"f": [], "r": REPLY}
+    for row in rows:
+        row = list(row)
+        while row[-1] is None:
+            row.pop()
+        answer["f"].append(row)
+    if notes:
+        answer["n"] = NOTES
+    return answer
+
+
+def expand_us(text: str, iterations: int = 2000) -> float:
+    """Average microseconds to parse and expand a short answer."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        expand_meal_analysis(json.loads(text))
+    return round((time.perf_counter() - started) * 1e6 / iterations, 2)
+
+
+def run(item_counts: List[int], tokens_per_second: float) -> Dict[str, Any]:
+    results = {}
+    for count in item_counts:
+        rows = [FOODS[i % len(FOODS)] for i in range(count)]
+        verbose = verbose_answer(rows)
+        formats = {
+            "full": verbose,
+            "compact": short_answer(rows, notes=True),
+            "minimal": short_answer(rows, notes=False),
+        }
+
+        expanded = expand_meal_analysis(formats["compact"])
+        assert expanded["food_items"] == verbose["food_items"]
+
+        baseline = None
+        sizes = {}
+        for profile, answer in formats.items():
+            text = json.dumps(answer, ensure_ascii=False, separators=(",", ":"))
+            tokens = estimate_tokens(text)
+            baseline = baseline or tokens
+            sizes[profile] = {
+                "output_tokens": tokens,
+                "generation_s": round(tokens / tokens_per_second, 2),
+                "saved_tokens": baseline - tokens,
+                "saved_s": round((baseline - tokens) / tokens_per_second, 2),
+            }
+            if profile != "full":
+                sizes[profile]["expand_us"] = expand_us(text)
+        results[f"{count}_items"] = sizes
+
+    return {"tokens_per_second": tokens_per_second, "items": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 3, 8, 20])
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    write_results(run(args.items, args.tokens_per_second), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Audio preprocessing benchmark.
+
+Synthesizes voice-memo-like recordings (44.1 kHz stereo WAV with leading
+and trailing silence and pauses between bursts of "speech"), runs them
+through ``preprocess_audio`` and reports the audio seconds removed and the
+preprocessing time. Transcription is simulated by a delay proportional to
+audio duration (``--rtf``, the engine's real-time factor), giving the
+end-to-end speedup from transcribing the trimmed audio instead.
+
+Usage:
+    python -m benchmarks.bench_preprocess [--clips 10] [--seconds 20] [--rtf 0.3]
+        [--output results.json]
+"""
+
+import argparse
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.fixtures import write_results
+from app.services.audio_preprocessing import preprocess_audio
+
+SOURCE_RATE = 44100
+
+
+def synthesize(path: Path, seconds: float, rng: np.random.Generator) -> None:
+    """Write a stereo recording: room noise, with speech-like bursts in the middle half."""
+    frames = int(seconds * SOURCE_RATE)
+    signal = rng.normal(0, 10 ** (-60 / 20), frames).astype(np.float32)
+
+    position = int(seconds * 0.25 * SOURCE_RATE)
+    end = int(seconds * 0.75 * SOURCE_RATE)
+    while position < end:
+        burst = min(int(rng.uniform(0.8, 2.5) * SOURCE_RATE), end - position)
+        t = np.arange(burst) / SOURCE_RATE
+        pitch = rng.uniform(100, 250)
+        envelope = np.sin(np.pi * t / t[-1]) ** 0.5 * 10 ** (rng.uniform(-30, -12) / 20)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        signal[position:position + burst] += (envelope * voiced).astype(np.float32)
+        position += burst + int(rng.uniform(0.3, 1.5) * SOURCE_RATE)
+
+    stereo = np.repeat(np.clip(signal, -1, 1), 2)
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(SOURCE_RATE)
+        writer.writeframes((stereo * 32767).astype("<i2").tobytes())
+
+
+def run(clips: int, seconds: float, rtf: float, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    input_total = output_total = preprocess_total = 0.0
+    per_clip: List[Dict[str, float]] = []
+
+    with tempfile.TemporaryDirectory(prefix="cal-ai-bench-") as directory:
+        for i in range(clips):
+            source = Path(directory) / f"clip{i}.wav"
+            synthesize(source, seconds * rng.uniform(0.5, 1.5), rng)
+
+            started = time.perf_counter()
+            input_seconds, output_seconds = preprocess_audio(
+                str(source), "wav", str(source.with_suffix(".16k.wav"))
+            )
+            elapsed = time.perf_counter() - started
+
+            input_total += input_seconds
+            output_total += output_seconds
+            preprocess_total += elapsed
+            per_clip.append({
+                "input_s": round(input_seconds, 2),
+                "output_s": round(output_seconds, 2),
+                "preprocess_ms": round(elapsed * 1000, 2),
+            })
+
+    baseline = input_total * rtf
+    processed = output_total * rtf + preprocess_total
+    return {
+        "audio_seconds": {
+            "input": round(input_total, 2),
+            "output": round(output_total, 2),
+            "removed": round(input_total - output_total, 2),
+            "removed_fraction": round(1 - output_total / input_total, 4) if input_total else 0.0,
+        },
+        "preprocess_ms_per_audio_second": round(preprocess_total * 1000 / input_total, 3) if input_total else 0.0,
+        "simulated_transcription_s": {
+            "original": round(baseline, 2),
+            "preprocessed": round(processed, 2),
+            "speedup": round(baseline / processed, 2) if processed else 0.0,
+        },
+        "clips": per_clip,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Mean clip length")
+    parser.add_argument("--rtf", type=float, default=0.3, help="Simulated engine real-time factor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "preprocess",
+        "rtf": args.rtf,
+        **run(args.clips, args.seconds, args.rtf, args.seed),
+    }
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Meal analysis prompt size benchmark.
+
+Renders the meal analysis prompt for a set of typical inputs (short and
+long, English and Chinese, with and without session context and a voice
+transcript) under each profile and reports estimated input tokens, the
+static prefix's share of them and the rendering time.
+
+Usage:
+    python -m benchmarks.bench_prompts [--budget 2000] [--iterations 2000]
+        [--output results.json]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict
+
+from benchmarks.fixtures import write_results
+from app.services.ai_prompts import PROMPT_PROFILES, _get_encoding, prompt_manager
+
+CONTEXT = {
+    "user_goals": "减脂，每天1600千卡",
+    "dietary_restrictions": "乳糖不耐受",
+    "daily_intake": "1240"
+}
+TRANSCRIPT = {"language": "zh", "confidence": 0.64}
+
+CASES = {
+    "short_en": ("a banana", "en", None, None),
+    "meal_en": (
+        "I had 2 scrambled eggs, 2 slices of whole wheat toast with butter, and a glass of orange juice",
+        "en", CONTEXT, None
+    ),
+    "meal_zh": ("午饭吃了一碗牛肉面，加了一个卤蛋，还喝了一杯无糖豆浆", "zh", CONTEXT, None),
+    "voice_zh": ("晚饭吃了一碗牛肉面加一个煎蛋", "auto", CONTEXT, TRANSCRIPT),
+    "long_zh": ("早餐：两个包子、一杯豆浆；午餐：宫保鸡丁盖饭、紫菜蛋花汤；晚餐：清蒸鱼、炒青菜、一碗米饭。" * 5, "zh", CONTEXT, None),
+}
+
+
+def render_ms(profile: str, case: tuple, budget: int, iterations: int) -> float:
+    """Average milliseconds to render one prompt."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        prompt_manager.build_meal_analysis_prompt(*case, profile=profile, token_budget=budget)
+    return round((time.perf_counter() - started) * 1000 / iterations, 4)
+
+
+def run(budget: int, iterations: int) -> Dict[str, Any]:
+    profiles = {}
+    for profile in PROMPT_PROFILES:
+        prefix_tokens = prompt_manager.meal_analysis_prefix_tokens[profile]
+        cases = {}
+        for name, case in CASES.items():
+            prompt = prompt_manager.build_meal_analysis_prompt(*case, profile=profile, token_budget=budget)
+            cases[name] = {
+                "tokens": prompt.tokens,
+                "chars": len(prompt.text),
+                "prefix_share": round(prefix_tokens / prompt.tokens, 2),
+                "dropped": list(prompt.dropped),
+                "render_ms": render_ms(profile, case, budget, iterations),
+            }
+        profiles[profile] = {
+            "prefix_tokens": prefix_tokens,
+            "mean_tokens": round(statistics.mean(case["tokens"] for case in cases.values()), 1),
+            "cases": cases,
+        }
+
+    full = profiles["full"]["mean_tokens"]
+    for profile in profiles.values():
+        profile["saved_vs_full"] = round(1 - profile["mean_tokens"] / full, 3)
+
+    return {
+        "token_budget": budget,
+        "tokenizer": "tiktoken cl100k_base" if _get_encoding() else "character estimate",
+        "profiles": profiles,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    write_results(run(args.budget, args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
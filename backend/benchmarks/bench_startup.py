@@ -0,0 +1,192 @@
+"""Cold start benchmark with a regression budget.
+
+Profiles ``import main`` with ``python -X importtime`` and times app startup
+(lifespan with ``init_db``) plus the first request on a fresh and on an
+already initialized database, each in a new interpreter. Every timing is
+the median of ``--runs`` runs, reported with its spread (a robust standard
+deviation, 1.4826 times the median absolute deviation). Results are
+checked against ``startup_budget.json``; the script exits non-zero when a
+budget is exceeded or a module that must load lazily is imported at
+startup.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--output results.json]
+    python -m benchmarks.bench_startup --update-budget [--runs 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.fixtures import write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+
+# A new budget allows the median plus this many spreads, and at least
+# BUDGET_MIN_HEADROOM of the median so a quiet run does not leave no margin
+BUDGET_SPREADS = 4
+BUDGET_MIN_HEADROOM = 0.1
+BUDGET_MIN_RUNS = 5
+
+FIRST_REQUEST_SCRIPT = """
+import json, logging, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+logging.disable(logging.CRITICAL)
+client = TestClient(main.app)
+client_ready = time.perf_counter()
+client.__enter__()
+lifespan_done = time.perf_counter()
+assert client.get("/health").status_code == 200
+first_request = time.perf_counter()
+client.__exit__(None, None, None)
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (lifespan_done - client_ready) * 1000,
+    "first_request_ms": (first_request - lifespan_done) * 1000,
+}))
+"""
+
+
+def run_python(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """Map module names to self and cumulative import microseconds."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {"self": int(self_us), "cumulative": int(cumulative_us)}
+    return modules
+
+
+def summarize(samples: List[Dict[str, float]]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Median and spread (1.4826 x median absolute deviation) of each timing."""
+    medians, spreads = {}, {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        median = statistics.median(values)
+        medians[key] = round(median, 1)
+        spreads[key] = round(1.4826 * statistics.median(abs(value - median) for value in values), 2)
+    return medians, spreads
+
+
+def profile_imports(runs: int, env: Dict[str, str]) -> Dict[str, Any]:
+    """Import profile of ``main``: median timings over ``runs``, modules of the median run."""
+    profiles = []
+    for _ in range(runs):
+        modules = parse_importtime(run_python(["-X", "importtime", "-c", "import main"], env).stderr)
+        app_self_us = sum(
+            timing["self"] for name, timing in modules.items()
+            if name == "main" or name.startswith("app.")
+        )
+        profiles.append(({
+            "import_main_ms": modules["main"]["cumulative"] / 1000,
+            "app_self_ms": app_self_us / 1000,
+        }, modules))
+
+    medians, spreads = summarize([timings for timings, _ in profiles])
+    _, typical = min(profiles, key=lambda profile: abs(profile[0]["import_main_ms"] - medians["import_main_ms"]))
+    slowest = sorted(typical.items(), key=lambda item: item[1]["self"], reverse=True)[:15]
+    return {
+        **medians,
+        "modules_loaded": len(typical),
+        "slowest_self_ms": {name: round(timing["self"] / 1000, 1) for name, timing in slowest},
+        "spread": spreads,
+        # A lazy module imported in any run is a failure
+        "loaded": set().union(*(modules for _, modules in profiles)),
+    }
+
+
+def time_first_request(runs: int, env: Dict[str, str], fresh: bool) -> Dict[str, Any]:
+    """Median startup and first request timings over ``runs``, with their spread."""
+    handle, path = tempfile.mkstemp(prefix="cal-ai-bench-", suffix=".db")
+    os.close(handle)
+    env = {**env, "DATABASE_URL": f"sqlite:///{path}"}
+    try:
+        samples = []
+        for _ in range(runs):
+            if fresh:
+                os.truncate(path, 0)
+            samples.append(json.loads(run_python(["-c", FIRST_REQUEST_SCRIPT], env).stdout.strip().splitlines()[-1]))
+        medians, spreads = summarize(samples)
+        return {**medians, "spread": spreads}
+    finally:
+        os.remove(path)
+
+
+def check_budget(results: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """Describe every budget the results exceed."""
+    failures = []
+    for key, limit in budget["max_ms"].items():
+        section, metric = key.split(".")
+        value = results[section][metric]
+        if value > limit:
+            failures.append(f"{key} = {value} ms exceeds budget of {limit} ms")
+    for module in budget["lazy_modules"]:
+        if any(name == module or name.startswith(module + ".") for name in results["loaded_at_import"]):
+            failures.append(f"{module} is imported at startup but must load lazily")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--update-budget", action="store_true", help="Rewrite the budget from this run")
+    args = parser.parse_args()
+    if args.update_budget and args.runs < BUDGET_MIN_RUNS:
+        parser.error(f"--update-budget needs at least {BUDGET_MIN_RUNS} runs to measure the spread")
+
+    env = {**os.environ, "DEBUG": "false", "RATE_LIMIT_ENABLED": "false"}
+    budget = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+
+    imports = profile_imports(args.runs, env)
+    loaded = imports.pop("loaded")
+    results = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "imports": imports,
+        "fresh_db": time_first_request(args.runs, env, fresh=True),
+        "existing_db": time_first_request(args.runs, env, fresh=False),
+        "loaded_at_import": sorted(
+            name for name in loaded
+            if any(name == module or name.startswith(module + ".") for module in budget["lazy_modules"])
+        ),
+    }
+
+    if args.update_budget:
+        for key in budget["max_ms"]:
+            section, metric = key.split(".")
+            median, spread = results[section][metric], results[section]["spread"][metric]
+            budget["max_ms"][key] = round(median + max(BUDGET_SPREADS * spread, BUDGET_MIN_HEADROOM * median), 1)
+        BUDGET_PATH.write_text(json.dumps(budget, indent=2) + "\n", encoding="utf-8")
+
+    failures = check_budget(results, budget)
+    results["budget_failures"] = failures
+    write_results(results, args.output)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Local stand-in for the AI provider APIs.
+
+Serves Anthropic ``/v1/messages`` and OpenAI ``/v1/chat/completions`` with a
+canned meal analysis after a configurable delay, so benchmarks exercise the
+real SDK clients and HTTP path without network access or API costs. Point
+the application at it with ``ANTHROPIC_BASE_URL`` / ``OPENAI_BASE_URL``.
+
+Prompt caching is imitated in the reported usage: a system prompt seen
+before counts as read from the cache (Anthropic only when it carries
+``cache_control``). Like the real providers, prompts below the minimum
+cacheable length are never cached: 1024 tokens, 2048 for Anthropic's
+Haiku models. OpenAI caches in 128-token steps past the minimum. Token
+counts are rough, a quarter of the characters.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+ANALYSIS = {
+    "food_items": [
+        {
+            "name": "Tomato beef", "name_cn": "番茄牛肉", "amount": "200", "unit": "g",
+            "calories": 260, "protein": 30.0, "carbs": 10.0, "fat": 16.0, "fiber": 2.0
+        },
+        {
+            "name": "Rice", "name_cn": "米饭", "amount": "150", "unit": "g",
+            "calories": 174, "protein": 3.9, "carbs": 38.9, "fat": 0.5, "fiber": 0.6
+        }
+    ],
+    "analysis_notes": "营养均衡，建议多吃蔬菜。",
+    "ai_response": "这顿饭营养搭配不错！蛋白质充足，可以再加一些绿叶蔬菜。😊"
+}
+
+
+# Shortest cacheable prompt prefix in tokens
+CACHE_MIN_TOKENS = 1024
+HAIKU_CACHE_MIN_TOKENS = 2048
+OPENAI_CACHE_STEP_TOKENS = 128
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _anthropic_cache_min_tokens(model: str) -> int:
+    return HAIKU_CACHE_MIN_TOKENS if "haiku" in model else CACHE_MIN_TOKENS
+
+
+class FakeProvider:
+    """
+    Threaded HTTP server answering like the AI provider APIs.
+
+    Each call sleeps ``latency`` seconds, varied uniformly by ``jitter``
+    (a fraction of the latency). Request bodies are kept in ``requests``
+    and the usage reported for them in ``usage``, so callers can inspect
+    what the application sent.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.25, analysis: Optional[Dict] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.analysis = analysis or ANALYSIS
+        self.requests: List[Dict] = []
+        self.usage: List[Dict] = []
+        self._cached: Set[str] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeProvider":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeProvider":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _respond(self, path: str, body: Dict) -> Dict:
+        with self._lock:
+            self.requests.append(body)
+            usage = self._usage(path, body)
+            self.usage.append(usage)
+        delay = self.latency * (1 + random.uniform(-self.jitter, self.jitter))
+        time.sleep(max(delay, 0.0))
+
+        text = json.dumps(self.analysis, ensure_ascii=False)
+        if path.endswith("/chat/completions"):
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+        return {
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage
+        }
+
+    def _usage(self, path: str, body: Dict) -> Dict:
+        """Token usage as the provider would report it, imitating prompt caching."""
+        output_tokens = _tokens(json.dumps(self.analysis, ensure_ascii=False))
+
+        if path.endswith("/chat/completions"):
+            messages = body.get("messages", [])
+            system = "".join(m["content"] for m in messages if m.get("role") == "system")
+            prompt_tokens = sum(_tokens(m.get("content") or "") for m in messages)
+            cached = 0
+            if system and _tokens(system) >= CACHE_MIN_TOKENS:
+                if system in self._cached:
+                    steps = (_tokens(system) - CACHE_MIN_TOKENS) // OPENAI_CACHE_STEP_TOKENS
+                    cached = CACHE_MIN_TOKENS + steps * OPENAI_CACHE_STEP_TOKENS
+                self._cached.add(system)
+            return {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached}
+            }
+
+        system = body.get("system") or []
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        user_tokens = sum(_tokens(json.dumps(m.get("content"), ensure_ascii=False)) for m in body.get("messages", []))
+        system_tokens = sum(_tokens(block.get("text", "")) for block in system)
+        usage = {"input_tokens": user_tokens + system_tokens, "output_tokens": output_tokens}
+        cacheable = system_tokens >= _anthropic_cache_min_tokens(body.get("model", ""))
+        if cacheable and any("cache_control" in block for block in system):
+            key = json.dumps(system, sort_keys=True, ensure_ascii=False)
+            kind = "cache_read_input_tokens" if key in self._cached else "cache_creation_input_tokens"
+            self._cached.add(key)
+            usage[kind] = system_tokens
+            usage["input_tokens"] = user_tokens
+        return usage
+
+    def _handler(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                payload = json.dumps(provider._respond(self.path, body)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,122 @@
+"""Shared fixtures for benchmarks."""
+
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import Base
+from app.models import Message, NutritionInfo, FoodItem, UserSession
+from app.models.message import MessageRole
+
+SAMPLE_FOODS = [
+    ("Rice", "米饭", "150", "g", 174, 3.9, 38.9, 0.5),
+    ("Stir-fried bok choy", "清炒白菜", "200", "g", 124, 3.0, 6.4, 9.0),
+    ("Tomato beef", "番茄牛肉", "200", "g", 260, 30.0, 10.0, 16.0),
+    ("Egg", "鸡蛋", "1", "个", 78, 6.3, 0.6, 5.3),
+    ("Milk", "牛奶", "250", "ml", 105, 8.5, 12.5, 8.0),
+]
+
+
+def create_sqlite_engine(path: Optional[str] = None) -> Tuple[Engine, str]:
+    """Create an engine on an ephemeral SQLite file with all tables."""
+    if path is None:
+        handle, path = tempfile.mkstemp(prefix="cal-ai-bench-", suffix=".db")
+        os.close(handle)
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine, path
+
+
+def session_factory(engine: Engine) -> sessionmaker:
+    """Session factory matching the application's settings."""
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+def seed_session(
+    db: Session,
+    meals: int,
+    items_per_meal: int = 3,
+    session_id: Optional[str] = None
+) -> str:
+    """
+    Insert a session with ``meals`` analyzed meals using bulk inserts.
+
+    Each meal adds a user message, an assistant message and its nutrition
+    info with ``items_per_meal`` food items.
+    """
+    session_id = session_id or str(uuid.uuid4())
+    start = datetime.utcnow() - timedelta(minutes=meals * 2)
+    db.execute(insert(UserSession), [{
+        "id": session_id,
+        "session_token": str(uuid.uuid4()),
+        "created_at": start,
+        "last_activity": start
+    }])
+
+    messages, nutrition, items = [], [], []
+    for i in range(meals):
+        nutrition_id = str(uuid.uuid4())
+        foods = [SAMPLE_FOODS[(i + j) % len(SAMPLE_FOODS)] for j in range(items_per_meal)]
+        nutrition.append({
+            "id": nutrition_id,
+            "total_calories": sum(food[4] for food in foods),
+            "total_protein": sum(food[5] for food in foods),
+            "total_carbs": sum(food[6] for food in foods),
+            "total_fat": sum(food[7] for food in foods),
+            "analysis_notes": "营养均衡，建议多吃蔬菜。",
+            "created_at": start
+        })
+        for name, name_cn, amount, unit, calories, protein, carbs, fat in foods:
+            items.append({
+                "id": str(uuid.uuid4()),
+                "nutrition_info_id": nutrition_id,
+                "name": name,
+                "name_cn": name_cn,
+                "amount": amount,
+                "unit": unit,
+                "calories": calories,
+                "protein": protein,
+                "carbs": carbs,
+                "fat": fat
+            })
+        timestamp = start + timedelta(minutes=i * 2)
+        messages.append({
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "content": "、".join(food[1] for food in foods),
+            "role": MessageRole.USER,
+            "timestamp": timestamp
+        })
+        messages.append({
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "content": "这顿饭营养搭配不错！蛋白质充足，可以再加一些绿叶蔬菜。😊",
+            "role": MessageRole.ASSISTANT,
+            "timestamp": timestamp + timedelta(seconds=5),
+            "nutrition_data_id": nutrition_id
+        })
+
+    for table, rows in ((NutritionInfo, nutrition), (FoodItem, items), (Message, messages)):
+        for offset in range(0, len(rows), 5000):
+            db.execute(insert(table), rows[offset:offset + 5000])
+    db.commit()
+    return session_id
+
+
+def write_results(results: Dict[str, Any], output: Optional[str]) -> None:
+    """Print results as JSON and optionally write them to a file."""
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1 @@
+"""Microbenchmarks for per-request CPU paths, run with pytest-benchmark."""
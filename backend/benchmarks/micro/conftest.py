@@ -0,0 +1,108 @@
+"""Realistic fixtures for the hot path microbenchmarks."""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.fixtures import SAMPLE_FOODS, session_factory, seed_session
+from app.core.database import Base
+from app.models import FoodItem, NutritionInfo
+from app.services.session_manager import SessionManager
+
+CJK_DESCRIPTION = (
+    "早餐吃了两个茶叶蛋、一根油条和一杯无糖豆浆；午饭在食堂吃了一碗米饭、宫保鸡丁、"
+    "清炒西兰花和番茄蛋花汤，饭后吃了一个苹果；下午茶喝了一杯少糖珍珠奶茶，"
+    "还吃了半块芝士蛋糕。晚饭打算吃清蒸鲈鱼和凉拌黄瓜。"
+)
+
+
+def food_item_data(index: int) -> dict:
+    name, name_cn, amount, unit, calories, protein, carbs, fat = SAMPLE_FOODS[index % len(SAMPLE_FOODS)]
+    return {
+        "name": f"{name} {index}",
+        "name_cn": f"{name_cn}{index}",
+        "amount": amount,
+        "unit": unit,
+        "calories": calories,
+        "protein": protein,
+        "carbs": carbs,
+        "fat": fat,
+        "fiber": 1.5,
+        "sugar": 2.0,
+        "sodium": 320
+    }
+
+
+@pytest.fixture(scope="session")
+def ai_result() -> dict:
+    """A parsed analysis of a 20-item meal."""
+    return {
+        "input_type": "food",
+        "food_items": [food_item_data(i) for i in range(20)],
+        "analysis_notes": "蛋白质充足，碳水偏高，建议晚餐减少主食并增加绿叶蔬菜。",
+        "ai_response": "今天的饮食整体不错！😊 午餐搭配均衡，下午茶的奶茶糖分略高，可以换成无糖茶。",
+        "suggestions": ["晚餐多吃蔬菜", "奶茶选无糖", "餐后散步 20 分钟"],
+        "health_score": 7
+    }
+
+
+@pytest.fixture(scope="session")
+def ai_response_text(ai_result) -> str:
+    """Raw model output: JSON wrapped in prose, as providers return it."""
+    return (
+        "好的，下面是这顿饭的营养分析：\n\n```json\n"
+        + json.dumps(ai_result, ensure_ascii=False, indent=2)
+        + "\n```\n\n希望对你有帮助！"
+    )
+
+
+@pytest.fixture
+def nutrition(ai_result) -> NutritionInfo:
+    """A transient 20-item nutrition record, not attached to a session."""
+    info = NutritionInfo(analysis_notes=ai_result["analysis_notes"])
+    info.food_items = [FoodItem(**item) for item in ai_result["food_items"]]
+    info.calculate_totals()
+    return info
+
+
+@pytest.fixture(scope="session")
+def memory_factory():
+    """Session factory for an in-memory SQLite database shared across connections."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield session_factory(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def large_session(memory_factory) -> str:
+    """ID of a session with 10,000 messages (5,000 analyzed meals)."""
+    with memory_factory() as db:
+        return seed_session(db, 5000)
+
+
+@pytest.fixture
+def db(memory_factory):
+    session = memory_factory()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def busy_session_manager() -> SessionManager:
+    """Session manager holding a profile, today's intake and a full message window."""
+    manager = SessionManager()
+    manager.set_user_profile("bench", {"goals": "减脂增肌", "restrictions": "乳糖不耐受"})
+    for i in range(12):
+        manager.add_message("bench", {"type": "user" if i % 2 == 0 else "assistant", "content": CJK_DESCRIPTION})
+        manager.update_daily_intake("bench", {"total_calories": 520.0, "total_protein": 30.0})
+    return manager
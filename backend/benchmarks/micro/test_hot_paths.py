@@ -0,0 +1,59 @@
+"""Microbenchmarks for the CPU work done on every request.
+
+Run from the backend directory and compare against the stored baseline:
+
+    pytest benchmarks/micro --benchmark-storage=benchmarks/micro/baselines \
+        --benchmark-compare=0001 --benchmark-compare-fail=mean:25%
+"""
+
+import pytest
+
+from app.services.ai_integration import AnthropicClient
+from app.services.ai_prompts import prompt_manager
+from app.services.chat import ChatService
+from app.services.meal_analysis import MealAnalysisService
+
+from benchmarks.micro.conftest import CJK_DESCRIPTION
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_meal_analysis_prompt(benchmark, busy_session_manager):
+    context = busy_session_manager.get_context_for_ai("bench")
+    prompt = benchmark(prompt_manager.get_meal_analysis_prompt, CJK_DESCRIPTION, "zh", context)
+    assert CJK_DESCRIPTION in prompt
+
+
+def test_parse_ai_response(benchmark, ai_response_text):
+    client = AnthropicClient()
+    result = benchmark(client._parse_ai_response, ai_response_text)
+    assert len(result["food_items"]) == 20
+
+
+def test_create_nutrition_info(benchmark, db, ai_result):
+    service = MealAnalysisService(db)
+    nutrition = benchmark.pedantic(
+        service._create_nutrition_info, args=(ai_result,),
+        setup=db.rollback, rounds=200, warmup_rounds=5
+    )
+    assert len(nutrition.food_items) == 20
+
+
+def test_nutrition_to_schema(benchmark, db, nutrition):
+    schema = benchmark(MealAnalysisService(db)._nutrition_to_schema, nutrition)
+    assert len(schema.food_items) == 20
+
+
+def test_calculate_totals(benchmark, nutrition):
+    benchmark(nutrition.calculate_totals)
+    assert nutrition.total_sodium == 20 * 320
+
+
+def test_chat_history_page(benchmark, db, large_session):
+    history = benchmark(ChatService(db).get_chat_history, session_id=large_session, limit=50)
+    assert history.total == 10000 and len(history.messages) == 50
+
+
+def test_context_for_ai(benchmark, busy_session_manager):
+    context = benchmark(busy_session_manager.get_context_for_ai, "bench")
+    assert len(context["conversation_history"]) == 5
@@ -1,6 +1,8 @@
 """Main FastAPI application entry point."""
 
+import asyncio
 import logging
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,13 +11,26 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
-from app.core.database import init_db
-from app.api.v1.endpoints import meal, chat, voice, health
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from app.core.logging_config import RequestContextMiddleware, configure_logging
+from app.core.compression import CompressionMiddleware
+from app.core.rate_limit import RateLimitMiddleware, InMemoryBackend, RedisBackend
+from app.core.responses import ORJSONResponse
+from app.core.timing import ServerTimingMiddleware, instrument_engine
+from app.core.metrics import MetricsMiddleware, instrument_pool, register_store, mark_worker_dead
+from app.core.profiling import ProfilingMiddleware, profile_store
+from app.core.database import engine, init_db
+from app.api.v1.endpoints import meal, chat, voice, health, food, export, history_import, metrics, chat_socket, voice_socket, admin
+from app.services.session_manager import session_manager
+from app.services.food_frequency import food_frequency_tracker
+from app.services.transcription import transcription_pool
+from app.services.audio_store import get_audio_store
+from app.services.transcription_cache import prune_transcription_cache
+
+# Configure logging; records are written by a background thread
+configure_logging(
+    level=settings.LOG_LEVEL,
+    json_format=settings.LOG_FORMAT == "json",
+    sql_echo=settings.LOG_SQL
 )
 
 logger = logging.getLogger(__name__)
@@ -27,16 +42,35 @@ async def lifespan(app: FastAPI):
     Application lifespan events.
     """
     # Startup
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
     
     # Initialize database
     init_db()
     logger.info("Database initialized")
     
+    # Load transcription models in the background; startup does not wait
+    prewarm = settings.TRANSCRIPTION_PREWARM
+    if prewarm is None:
+        prewarm = settings.TRANSCRIPTION_ENGINE != "mock"
+    if prewarm:
+        warm_task = asyncio.create_task(transcription_pool.warm())
+    
+    # Remove staged audio abandoned by crashed or dropped requests, and old stored transcripts
+    janitor_task = asyncio.create_task(
+        get_audio_store(settings.AUDIO_STAGING_DIR).run_janitor(
+            settings.AUDIO_STAGING_JANITOR_SECONDS, prune_transcription_cache
+        )
+    )
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    if prewarm:
+        warm_task.cancel()
+    janitor_task.cancel()
+    transcription_pool.shutdown()
+    mark_worker_dead(os.getpid())
 
 
 # Create FastAPI application
@@ -45,11 +79,37 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Cal AI Backend Service - Intelligent calorie tracking and nutritional analysis",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None
 )
 
-# Configure CORS
+# Configure response compression
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        cache_max_bytes=settings.COMPRESSION_CACHE_MB * 1024 * 1024
+    )
+
+# Configure rate limiting (added after compression so it rejects cheaply)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_per_minute=settings.MAX_REQUESTS_PER_MINUTE,
+        routes=settings.RATE_LIMIT_ROUTES,
+        backend=(
+            RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+            if settings.RATE_LIMIT_BACKEND == "redis" else InMemoryBackend()
+        ),
+        trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+        max_sockets_per_client=settings.RATE_LIMIT_SOCKETS_PER_CLIENT
+    )
+
+# Configure CORS (outside rate limiting, so 429 responses carry CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -58,6 +118,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Configure metrics collection
+if settings.METRICS_ENABLED:
+    instrument_pool(engine)
+    register_store("session_contexts", lambda: len(session_manager.sessions))
+    register_store("daily_intake", lambda: len(session_manager.daily_intake))
+    register_store("user_profiles", lambda: len(session_manager.user_profiles))
+    register_store("food_frequency_sessions", lambda: len(food_frequency_tracker.sessions))
+    app.add_middleware(MetricsMiddleware)
+
+# Profile requests that opt in with the admin token
+if settings.ADMIN_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        token=settings.ADMIN_TOKEN,
+        max_per_hour=settings.PROFILING_MAX_PER_HOUR
+    )
+
+# Configure request phase timing (outside every middleware but the request
+# context, so the total covers them all)
+if settings.SERVER_TIMING_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(ServerTimingMiddleware)
+
+# Tag log records with request and session IDs (outermost, so the access
+# log line written by Server-Timing carries them too)
+app.add_middleware(RequestContextMiddleware)
+
 
 # Exception handlers
 @app.exception_handler(StarletteHTTPException)
@@ -97,7 +185,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle general exceptions."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -111,9 +199,16 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 # Include routers
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(meal.router)
 app.include_router(chat.router)
+app.include_router(chat_socket.router)
 app.include_router(voice.router)
+app.include_router(voice_socket.router)
+app.include_router(food.router)
+app.include_router(export.router)
+app.include_router(history_import.router)
+app.include_router(admin.router)
 
 
 # Root endpoint
@@ -136,5 +231,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL.lower()
+        log_level=settings.LOG_LEVEL.lower(),
+        log_config=None  # Logging is configured above
     )
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""Shared test configuration."""
+
+import os
+
+# The suites drive many requests from one client address; rate limiting
+# has its own tests against a dedicated app.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# Transcription workers start on first use instead of with every app lifespan
+os.environ.setdefault("TRANSCRIPTION_PREWARM", "false")
@@ -0,0 +1,26 @@
+"""Tiny transcription engine for tests, importable from pool workers."""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.services.transcription_engines import TranscriptionEngine
+
+
+class StubEngine(TranscriptionEngine):
+    """Reports the file size and the worker that loaded it; ``model_path`` sets a delay."""
+
+    name = "stub"
+
+    def load(self) -> None:
+        self.loads = getattr(self, "loads", 0) + 1
+        self.delay = float(self.model_path or 0)
+
+    def transcribe(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        time.sleep(self.delay)
+        return {
+            "text": f"{os.path.getsize(path)} bytes in worker {os.getpid()} loaded {self.loads}x",
+            "language": language or "en",
+            "confidence": 1.0,
+            "duration_seconds": 2.0
+        }
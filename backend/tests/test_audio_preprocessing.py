@@ -0,0 +1,130 @@
+"""Tests for audio preprocessing."""
+
+import asyncio
+import wave
+
+import numpy as np
+import pytest
+
+from app.services.audio_preprocessing import (
+    AudioDecodeError,
+    StreamingResampler,
+    iter_wav_blocks,
+    preprocess_audio
+)
+from app.services.voice import StagedAudio, VoiceService
+
+
+def tone(seconds: float, rate: int, level_db: float = -12.0, frequency: float = 440.0) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (10 ** (level_db / 20) * np.sqrt(2) * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def silence(seconds: float, rate: int) -> np.ndarray:
+    return np.zeros(int(seconds * rate), np.float32)
+
+
+def write_wav(path, samples: np.ndarray, rate: int, channels: int = 1, width: int = 2) -> str:
+    interleaved = np.repeat(samples, channels)
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(width)
+        writer.setframerate(rate)
+        if width == 1:
+            writer.writeframes((interleaved * 127 + 128).astype(np.uint8).tobytes())
+        elif width == 2:
+            writer.writeframes((interleaved * 32767).astype("<i2").tobytes())
+        else:
+            pcm = (interleaved * 8388607).astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3]
+            writer.writeframes(pcm.tobytes())
+    return str(path)
+
+
+def read_wav(path: str):
+    with wave.open(path, "rb") as reader:
+        samples = np.frombuffer(reader.readframes(reader.getnframes()), "<i2") / 32768.0
+        return reader.getframerate(), reader.getnchannels(), samples
+
+
+class TestPreprocessAudio:
+    """Test the full preprocessing pass."""
+    
+    def test_converts_trims_and_normalizes(self, tmp_path):
+        rate = 44100
+        clip = np.concatenate([silence(1.5, rate), tone(2.0, rate), silence(1.5, rate)])
+        source = write_wav(tmp_path / "in.wav", clip, rate, channels=2)
+        
+        input_seconds, output_seconds = preprocess_audio(source, "wav", str(tmp_path / "out.wav"))
+        
+        out_rate, channels, samples = read_wav(str(tmp_path / "out.wav"))
+        assert (out_rate, channels) == (16000, 1)
+        assert input_seconds == pytest.approx(5.0, abs=0.01)
+        # 2s of speech plus 200ms of padding on each side
+        assert output_seconds == pytest.approx(2.4, abs=0.05)
+        assert len(samples) / out_rate == pytest.approx(output_seconds, abs=0.01)
+        speech = samples[int(0.3 * out_rate):int(2.1 * out_rate)]
+        assert 20 * np.log10(np.sqrt(np.mean(speech ** 2))) == pytest.approx(-20.0, abs=0.5)
+    
+    def test_shortens_long_pauses(self, tmp_path):
+        rate = 16000
+        clip = np.concatenate([tone(1.0, rate), silence(3.0, rate), tone(1.0, rate)])
+        source = write_wav(tmp_path / "in.wav", clip, rate)
+        
+        _, output_seconds = preprocess_audio(source, "wav", str(tmp_path / "out.wav"))
+        
+        # The 3s pause keeps 200ms after and before speech
+        assert output_seconds == pytest.approx(2.4, abs=0.05)
+    
+    def test_quiet_recording_is_not_amplified_into_clipping(self, tmp_path):
+        rate = 16000
+        clip = np.concatenate([tone(1.0, rate, level_db=-3.0)])
+        source = write_wav(tmp_path / "in.wav", clip, rate)
+        
+        preprocess_audio(source, "wav", str(tmp_path / "out.wav"))
+        
+        _, _, samples = read_wav(str(tmp_path / "out.wav"))
+        assert np.max(np.abs(samples)) <= 0.99
+    
+    @pytest.mark.parametrize("width", [1, 3])
+    def test_decodes_other_sample_widths(self, tmp_path, width):
+        clip = tone(0.5, 8000, level_db=-6.0)
+        _, blocks = iter_wav_blocks(write_wav(tmp_path / "in.wav", clip, 8000, width=width))
+        decoded = np.concatenate([block[:, 0] for block in blocks])
+        assert np.allclose(decoded, clip, atol=0.02)
+    
+    def test_rejects_undecodable_input(self, tmp_path):
+        path = tmp_path / "in.wav"
+        path.write_bytes(b"RIFF\x00\x00\x00\x00WAVEjunk")
+        with pytest.raises(AudioDecodeError):
+            preprocess_audio(str(path), "wav", str(tmp_path / "out.wav"))
+
+
+def test_resampler_is_block_size_independent():
+    rate = 48000
+    signal = np.random.default_rng(0).standard_normal(rate).astype(np.float32)
+    whole = StreamingResampler(rate, 16000).process(signal)
+    
+    resampler = StreamingResampler(rate, 16000)
+    edges = [0, 1, 777, 5000, 5001, 23456, rate]
+    blocks = [resampler.process(signal[a:b]) for a, b in zip(edges, edges[1:])]
+    
+    assert len(whole) == 16000
+    assert np.allclose(np.concatenate(blocks), whole, atol=1e-5)
+
+
+def test_resampler_filters_above_new_nyquist():
+    rate = 48000
+    high = tone(1.0, rate, level_db=0.0, frequency=12000)
+    output = StreamingResampler(rate, 16000).process(high)[200:]
+    assert np.sqrt(np.mean(output ** 2)) < 0.05
+
+
+def test_voice_service_falls_back_without_decoder(tmp_path, monkeypatch):
+    """Test formats that cannot be decoded here are transcribed unprocessed."""
+    path = tmp_path / "clip.mp3"
+    path.write_bytes(b"ID3" + bytes(100))
+    monkeypatch.setattr("shutil.which", lambda name: None)
+    
+    staged = StagedAudio(path, "clip.mp3", "mp3", 103)
+    assert asyncio.run(VoiceService().preprocess(staged)) is None
+    assert [p.name for p in tmp_path.iterdir()] == ["clip.mp3"]
@@ -0,0 +1,187 @@
+"""Tests for the audio staging store."""
+
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from main import app
+from app.core.config import settings
+from app.services.audio_store import AudioStore, StagingFullError, get_audio_store
+
+client = TestClient(app)
+
+DIGEST = "ab" * 32
+MP3 = b"ID3\x04\x00\x00\x00\x00\x00\x00" + bytes(4096)
+
+
+async def stage(store: AudioStore, data: bytes, digest: str = DIGEST):
+    async with store.open_partial() as partial:
+        await partial.write(data)
+    return store.commit(partial, digest, "wav")
+
+
+def age(path, seconds: float) -> None:
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestReferences:
+    """Test content-addressed staging with reference counts."""
+    
+    def test_identical_uploads_share_content(self, tmp_path):
+        store = AudioStore(tmp_path)
+        first, first_deduplicated = asyncio.run(stage(store, b"RIFF audio"))
+        second, second_deduplicated = asyncio.run(stage(store, b"RIFF audio"))
+        
+        assert (first_deduplicated, second_deduplicated) == (False, True)
+        assert first != second
+        assert second.read_bytes() == b"RIFF audio"
+        assert store.references(DIGEST, "wav") == 2
+        assert not list(tmp_path.glob("*.part"))
+        assert (store.used_bytes, store.files) == (10, 1)
+        
+        store.release(first)
+        assert second.read_bytes() == b"RIFF audio"
+        assert store.references(DIGEST, "wav") == 1
+        
+        store.release(second)
+        assert list(tmp_path.iterdir()) == []
+        assert (store.used_bytes, store.files) == (0, 0)
+    
+    def test_release_is_idempotent(self, tmp_path):
+        store = AudioStore(tmp_path)
+        handle, _ = asyncio.run(stage(store, b"RIFF audio"))
+        store.release(handle)
+        store.release(handle)
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_failed_write_is_removed(self, tmp_path):
+        store = AudioStore(tmp_path)
+        
+        async def fail():
+            async with store.open_partial() as partial:
+                await partial.write(b"RIFF")
+                raise ValueError("not audio")
+        
+        with pytest.raises(ValueError):
+            asyncio.run(fail())
+        assert list(tmp_path.iterdir()) == []
+        assert (store.used_bytes, store.files) == (0, 0)
+
+
+class TestQuota:
+    """Test backpressure when staging storage is full."""
+    
+    def test_rejects_write_over_quota(self, tmp_path):
+        store = AudioStore(tmp_path, quota_bytes=100, quota_wait=0)
+        asyncio.run(stage(store, bytes(80), digest="1" * 64))
+        rejected = REGISTRY.get_sample_value("audio_staging_rejected_total") or 0
+        
+        with pytest.raises(StagingFullError):
+            asyncio.run(stage(store, bytes(40), digest="2" * 64))
+        
+        assert REGISTRY.get_sample_value("audio_staging_rejected_total") == rejected + 1
+        assert not list(tmp_path.glob("*.part"))
+        assert store.used_bytes == 80
+    
+    def test_waits_for_space_to_be_released(self, tmp_path):
+        store = AudioStore(tmp_path, quota_bytes=100, quota_wait=2.0)
+        
+        async def run():
+            held, _ = await stage(store, bytes(80), digest="1" * 64)
+            asyncio.get_running_loop().call_later(0.1, store.release, held)
+            started = time.monotonic()
+            await stage(store, bytes(40), digest="2" * 64)
+            return time.monotonic() - started
+        
+        waited = asyncio.run(run())
+        assert 0.1 <= waited < 1.0
+        assert store.used_bytes == 40
+    
+    def test_counts_files_written_by_others(self, tmp_path):
+        """Test a full quota rescans the directory before rejecting."""
+        (tmp_path / "other-worker.wav").write_bytes(bytes(90))
+        store = AudioStore(tmp_path, quota_bytes=100, quota_wait=0)
+        
+        with pytest.raises(StagingFullError):
+            asyncio.run(stage(store, bytes(20)))
+        
+        (tmp_path / "other-worker.wav").unlink()
+        asyncio.run(stage(store, bytes(20)))
+    
+    def test_endpoint_returns_503_when_full(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "AUDIO_STAGING_QUOTA_MB", 0)
+        monkeypatch.setattr(settings, "AUDIO_STAGING_QUOTA_WAIT_SECONDS", 0)
+        
+        response = client.post("/api/voice-to-text", files={"audio": ("meal.mp3", MP3, "audio/mpeg")})
+        
+        assert response.status_code == 503
+        assert response.json()["error"] == "storage_full"
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestJanitor:
+    """Test removal of abandoned staged files."""
+    
+    def test_sweeps_only_expired_files(self, tmp_path):
+        store = AudioStore(tmp_path, ttl=60)
+        abandoned = tmp_path / "crashed.part"
+        abandoned.write_bytes(bytes(50))
+        age(abandoned, 120)
+        handle, _ = asyncio.run(stage(store, bytes(30)))
+        
+        assert store.sweep() == (1, 50)
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted([handle.name, f"{DIGEST}.wav"])
+        assert (store.used_bytes, store.files) == (30, 1)
+        
+        gauge = REGISTRY.get_sample_value("audio_staging_bytes")
+        assert gauge == 30
+    
+    def test_new_reference_keeps_content_fresh(self, tmp_path):
+        """Test re-staging old content protects it from the janitor."""
+        store = AudioStore(tmp_path, ttl=60)
+        first, _ = asyncio.run(stage(store, bytes(30)))
+        age(first, 120)
+        second, deduplicated = asyncio.run(stage(store, bytes(30)))
+        
+        assert deduplicated
+        assert store.sweep() == (0, 0)
+        assert second.exists()
+    
+    def test_janitor_runs_in_background(self, tmp_path):
+        store = AudioStore(tmp_path, ttl=60)
+        abandoned = tmp_path / "crashed.part"
+        abandoned.write_bytes(bytes(50))
+        age(abandoned, 120)
+        
+        async def run():
+            janitor = asyncio.create_task(store.run_janitor(0.01))
+            await asyncio.sleep(0.05)
+            janitor.cancel()
+        
+        asyncio.run(run())
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_janitor_runs_other_cleanups(self, tmp_path):
+        store = AudioStore(tmp_path, ttl=60)
+        calls = []
+        
+        def failing():
+            raise RuntimeError("database locked")
+        
+        async def run():
+            janitor = asyncio.create_task(store.run_janitor(0.01, failing, lambda: calls.append(1)))
+            await asyncio.sleep(0.05)
+            janitor.cancel()
+        
+        asyncio.run(run())
+        assert len(calls) > 1
+
+
+def test_store_is_shared_per_directory(tmp_path):
+    assert get_audio_store(str(tmp_path)) is get_audio_store(str(tmp_path))
@@ -0,0 +1,168 @@
+"""Tests for the chat WebSocket channel."""
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.websockets import WebSocketDisconnect
+
+from main import app
+from app.core.config import settings
+from app.core.database import Base
+from app.core.rate_limit import RateLimitMiddleware
+from app.services.ai_integration import AIIntegrationService
+from app.api.v1 import deps
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[deps.get_db] = override_get_db
+app.dependency_overrides[deps.get_session_factory] = lambda: TestingSessionLocal
+
+client = TestClient(app)
+
+AI_RESULT = {
+    "food_items": [{
+        "name": "Beef noodles", "name_cn": "牛肉面", "amount": "1", "unit": "bowl",
+        "calories": 550, "protein": 28, "carbs": 70, "fat": 16
+    }],
+    "analysis_notes": "Hearty.",
+    "ai_response": "A bowl of beef noodles."
+}
+
+
+@pytest.fixture
+def slow_ai(monkeypatch):
+    """Replace the provider with a slow fake that records concurrency."""
+    state = {"running": 0, "peak": 0}
+    
+    async def analyze_meal(self, description, language="auto", session_id=None, transcript=None):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        return AI_RESULT
+    
+    monkeypatch.setattr(AIIntegrationService, "analyze_meal", analyze_meal)
+    return state
+
+
+def receive_until(websocket, frame_type: str, count: int = 1) -> list:
+    """Collect frames until ``count`` frames of a type have arrived."""
+    frames = []
+    while sum(frame["type"] == frame_type for frame in frames) < count:
+        frames.append(websocket.receive_json())
+    return frames
+
+
+class TestChatSocket:
+    """Test meal analysis over the chat WebSocket."""
+    
+    def test_analyzes_meal_with_client_id(self, slow_ai):
+        """Test replies are tagged with the client message ID."""
+        session_id = f"ws-session-{uuid.uuid4()}"
+        with client.websocket_connect(f"/ws/chat/{session_id}") as websocket:
+            assert websocket.receive_json() == {"type": "ready", "session_id": session_id}
+            websocket.send_json({"type": "meal", "id": "m1", "message": "一碗牛肉面"})
+            
+            frames = receive_until(websocket, "intake")
+            stages = [frame["stage"] for frame in frames if frame["type"] == "progress"]
+            assert stages == ["queued", "analyzing"]
+            
+            result = next(frame for frame in frames if frame["type"] == "result")
+            assert result["id"] == "m1"
+            assert result["data"]["session_id"] == session_id
+            assert result["data"]["nutrition"]["total_calories"] == 550
+            
+            intake = frames[-1]
+            assert intake["id"] == "m1"
+            assert intake["data"]["meals"] == 1
+            assert intake["data"]["calories"] == 550
+        
+        history = client.get(f"/api/chat-history?session_id={session_id}").json()
+        assert history["total"] == 2
+    
+    def test_caps_concurrent_analyses(self, slow_ai, monkeypatch):
+        """Test analyses overlap but never exceed the per-socket cap."""
+        monkeypatch.setattr(settings, "WS_MAX_CONCURRENT_ANALYSES", 2)
+        
+        with client.websocket_connect("/ws/chat/ws-session-2") as websocket:
+            websocket.receive_json()
+            for index in range(4):
+                websocket.send_json({"type": "meal", "id": f"m{index}", "message": f"meal {index}"})
+            
+            frames = receive_until(websocket, "result", count=4)
+            results = {frame["id"] for frame in frames if frame["type"] == "result"}
+            assert results == {"m0", "m1", "m2", "m3"}
+        
+        assert slow_ai["peak"] == 2
+    
+    def test_rejects_meals_when_busy(self, slow_ai, monkeypatch):
+        """Test meals beyond the pending limit get a busy error."""
+        monkeypatch.setattr(settings, "WS_MAX_PENDING_MESSAGES", 1)
+        
+        with client.websocket_connect("/ws/chat/ws-session-3") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "meal", "id": "first", "message": "rice"})
+            websocket.send_json({"type": "meal", "id": "second", "message": "soup"})
+            
+            frames = receive_until(websocket, "result")
+            errors = [frame for frame in frames if frame["type"] == "error"]
+            assert errors[0]["id"] == "second"
+            assert errors[0]["code"] == "busy"
+    
+    def test_meals_share_the_analyze_meal_rate_limit(self, slow_ai):
+        """Test meals over the analyze-meal limit are rejected, not analyzed."""
+        limited = TestClient(RateLimitMiddleware(app, routes={"/api/analyze-meal": 1}))
+        
+        with limited.websocket_connect("/ws/chat/ws-session-6") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "meal", "id": "first", "message": "rice"})
+            websocket.send_json({"type": "meal", "id": "second", "message": "soup"})
+            
+            frames = receive_until(websocket, "result")
+            errors = [frame for frame in frames if frame["type"] == "error"]
+            assert [error["id"] for error in errors] == ["second"]
+            assert errors[0]["code"] == "rate_limited"
+            assert errors[0]["retry_after"] >= 1
+        
+        assert limited.post("/api/analyze-meal", json={"message": "rice"}).status_code == 429
+    
+    def test_ping_and_invalid_frames(self):
+        with client.websocket_connect("/ws/chat/ws-session-4") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "ping", "id": "p1"})
+            assert websocket.receive_json() == {"type": "pong", "id": "p1"}
+            
+            websocket.send_text("not json")
+            assert websocket.receive_json()["code"] == "invalid_frame"
+    
+    def test_closes_idle_socket(self, monkeypatch):
+        """Test the server pings and then closes a silent client."""
+        monkeypatch.setattr(settings, "WS_HEARTBEAT_SECONDS", 0.05)
+        monkeypatch.setattr(settings, "WS_IDLE_TIMEOUT_SECONDS", 0.08)
+        
+        with client.websocket_connect("/ws/chat/ws-session-5") as websocket:
+            websocket.receive_json()
+            assert websocket.receive_json() == {"type": "ping"}
+            with pytest.raises(WebSocketDisconnect) as disconnect:
+                websocket.receive_json()
+            assert disconnect.value.code == 1001
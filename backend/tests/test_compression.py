@@ -0,0 +1,78 @@
+"""Tests for response compression middleware."""
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = "营养分析 nutrition analysis " * 200
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/large")
+async def large():
+    return PlainTextResponse(BODY, headers={"ETag": 'W/"1"'})
+
+
+@app.get("/small")
+async def small():
+    return PlainTextResponse("ok")
+
+
+@app.get("/stream")
+async def stream():
+    return StreamingResponse(iter([BODY.encode("utf-8")] * 2), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation."""
+    
+    def test_prefers_server_order_on_ties(self):
+        assert negotiate_encoding("gzip, br, zstd", {"gzip": 1, "br": 1, "zstd": 1}) == "zstd"
+    
+    def test_honors_q_values(self):
+        assert negotiate_encoding("gzip;q=1.0, br;q=0.5", {"gzip": 1, "br": 1}) == "gzip"
+        assert negotiate_encoding("*;q=0.5, gzip;q=0", {"gzip": 1, "br": 1}) == "br"
+        assert negotiate_encoding("identity", {"gzip": 1}) is None
+
+
+class TestCompressionMiddleware:
+    """Test compression of responses."""
+    
+    def test_compresses_large_body(self):
+        """Test large text bodies are gzipped and marked with Vary."""
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(BODY.encode("utf-8"))
+        assert response.text == BODY
+    
+    def test_small_and_streamed_bodies_pass_through(self):
+        """Test bodies below the threshold and streams are not compressed."""
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in streamed.headers
+        assert streamed.text == BODY * 2
+    
+    def test_reuses_compressed_body_for_same_etag(self):
+        """Test an ETagged body is compressed once per encoding."""
+        inner = FastAPI()
+        inner.get("/large")(large)
+        compression = CompressionMiddleware(inner, minimum_size=500)
+        cached_client = TestClient(compression)
+        
+        for _ in range(3):
+            response = cached_client.get("/large", headers={"Accept-Encoding": "gzip"})
+            assert response.text == BODY
+        
+        assert compression.stats["gzip"]["responses"] == 3
+        assert compression.stats["gzip"]["cache_hits"] == 2
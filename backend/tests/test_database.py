@@ -0,0 +1,52 @@
+"""Tests for database initialization."""
+
+from sqlalchemy import create_engine, inspect, text, update
+
+from app.core.database import (
+    init_db,
+    schema_fingerprint,
+    schema_version_table,
+    stored_schema_fingerprint,
+)
+
+
+def create_engine_at(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'init.db'}")
+
+
+class TestInitDb:
+    """Test schema creation is skipped when the fingerprint matches."""
+    
+    def test_records_fingerprint(self, tmp_path):
+        engine = create_engine_at(tmp_path)
+        assert stored_schema_fingerprint(engine) is None
+        
+        init_db(engine)
+        
+        assert stored_schema_fingerprint(engine) == schema_fingerprint(engine)
+        assert inspect(engine).has_table("messages")
+    
+    def test_skips_when_fingerprint_matches(self, tmp_path):
+        engine = create_engine_at(tmp_path)
+        init_db(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE food_items"))
+        
+        init_db(engine)
+        assert not inspect(engine).has_table("food_items")
+    
+    def test_reinitializes_on_schema_change(self, tmp_path):
+        """Test a stale fingerprint runs create_all and adds new columns."""
+        engine = create_engine_at(tmp_path)
+        init_db(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE food_items"))
+            connection.execute(text("ALTER TABLE user_sessions DROP COLUMN version"))
+            connection.execute(update(schema_version_table).values(fingerprint="stale"))
+        
+        init_db(engine)
+        
+        inspector = inspect(engine)
+        assert inspector.has_table("food_items")
+        assert "version" in {column["name"] for column in inspector.get_columns("user_sessions")}
+        assert stored_schema_fingerprint(engine) == schema_fingerprint(engine)
@@ -0,0 +1,91 @@
+"""Tests for streaming history export."""
+
+import csv
+import gzip
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from app.core.database import Base
+from app.api.v1 import deps
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[deps.get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def create_session_with_meals(count: int = 2) -> str:
+    """Analyze a few meals in one session and return its ID."""
+    session_id = None
+    for i in range(count):
+        response = client.post(
+            "/api/analyze-meal",
+            json={"message": f"午餐 {i}", "session_id": session_id}
+        )
+        session_id = response.json()["session_id"]
+    return session_id
+
+
+class TestExport:
+    """Test history export endpoint."""
+    
+    def test_export_ndjson(self):
+        """Test NDJSON export nests food items under each message."""
+        session_id = create_session_with_meals()
+        
+        response = client.get(f"/api/export/{session_id}?format=ndjson")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 4
+        assert records[0]["content"] == "午餐 0"
+        assert records[0]["nutrition"] is None
+        assert records[1]["role"] == "assistant"
+        assert len(records[1]["nutrition"]["food_items"]) == 1
+    
+    def test_export_csv_gzip(self):
+        """Test gzipped CSV export has one row per food item."""
+        session_id = create_session_with_meals()
+        
+        response = client.get(f"/api/export/{session_id}?format=csv&compress=true")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode("utf-8"))))
+        assert len(rows) == 4
+        assert rows[1]["food_name"] == "Estimated meal"
+    
+    def test_export_unknown_session(self):
+        """Test exporting a missing session."""
+        response = client.get("/api/export/does-not-exist")
+        
+        assert response.status_code == 404
+    
+    def test_export_invalid_format(self):
+        """Test exporting with an unsupported format."""
+        response = client.get("/api/export/any?format=xml")
+        
+        assert response.status_code == 422
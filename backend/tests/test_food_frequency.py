@@ -0,0 +1,136 @@
+"""Tests for frequent foods and one-tap re-logging."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from app.core.database import Base
+from app.api.v1 import deps
+from app.services.ai_integration import AIIntegrationService
+from app.services.food_frequency import FoodFrequencyTracker, _SessionFoods
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[deps.get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def make_item(item_id: str, name: str, calories: float = 100):
+    """Build a stand-in for a FoodItem row."""
+    return SimpleNamespace(
+        id=item_id, name=name, name_cn=None, amount="1", unit="serving",
+        calories=calories, protein=1, carbs=1, fat=1,
+        fiber=None, sugar=None, sodium=None
+    )
+
+
+class TestFoodFrequencyTracker:
+    """Test decayed frequency counters."""
+    
+    def test_recent_logs_outrank_old_frequent_ones(self):
+        """Test that decay lets a recent food overtake an older frequent one."""
+        tracker = FoodFrequencyTracker(top_k=5, half_life_days=7)
+        start = datetime(2024, 1, 1)
+        tracker.sessions["s"] = _SessionFoods(start)
+        
+        tracker.record_items("s", [make_item("a1", "Oatmeal")] * 3, start)
+        tracker.record_items("s", [make_item("b1", "Salad")] * 2, start + timedelta(days=28))
+        
+        frequent = tracker.get_frequent("s")
+        assert [item["key"] for item in frequent] == ["salad", "oatmeal"]
+        assert frequent[1]["count"] == 3
+        assert tracker.get_recent_names("s") == ["Salad", "Oatmeal"]
+    
+    def test_unloaded_session_is_not_recorded(self):
+        """Test that records for unloaded sessions are left to hydration."""
+        tracker = FoodFrequencyTracker()
+        tracker.record_items("missing", [make_item("a1", "Rice")])
+        
+        assert not tracker.is_loaded("missing")
+        assert tracker.get_frequent("missing") == []
+
+
+    def test_least_recently_used_sessions_are_dropped(self):
+        """Test the session cap evicts the coldest session, which rehydrates on use."""
+        tracker = FoodFrequencyTracker(max_sessions=2)
+        db = TestingSessionLocal()
+        try:
+            for session_id in ("lru-a", "lru-b"):
+                tracker.ensure_loaded(db, session_id)
+            tracker.ensure_loaded(db, "lru-a")
+            tracker.ensure_loaded(db, "lru-c")
+            
+            assert list(tracker.sessions) == ["lru-a", "lru-c"]
+            tracker.ensure_loaded(db, "lru-b")
+            assert tracker.is_loaded("lru-b")
+            assert not tracker.is_loaded("lru-a")
+        finally:
+            db.close()
+
+
+class TestFrequentFoodsEndpoints:
+    """Test frequent foods and relog endpoints."""
+    
+    def test_relog_reuses_stored_nutrition(self, monkeypatch):
+        """Test that relogging a suggestion skips the AI call."""
+        meal_response = client.post(
+            "/api/analyze-meal",
+            json={"message": "A bowl of noodles"}
+        )
+        assert meal_response.status_code == 200
+        session_id = meal_response.json()["session_id"]
+        
+        response = client.get(f"/api/foods/frequent?session_id={session_id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["frequent"]) == 1
+        suggestion = data["frequent"][0]
+        
+        async def fail_analyze(*args, **kwargs):
+            raise AssertionError("AI should not be called when relogging")
+        monkeypatch.setattr(AIIntegrationService, "analyze_meal", fail_analyze)
+        
+        relog = client.post(
+            "/api/foods/relog",
+            json={"session_id": session_id, "food_item_ids": [suggestion["food_item_id"]]}
+        )
+        assert relog.status_code == 200
+        assert relog.json()["nutrition"]["total_calories"] == suggestion["calories"]
+        
+        data = client.get(f"/api/foods/frequent?session_id={session_id}").json()
+        assert data["frequent"][0]["count"] == 2
+    
+    def test_relog_unknown_item(self):
+        """Test relogging a food item from another session."""
+        meal_response = client.post(
+            "/api/analyze-meal",
+            json={"message": "An apple"}
+        )
+        session_id = meal_response.json()["session_id"]
+        
+        response = client.post(
+            "/api/foods/relog",
+            json={"session_id": session_id, "food_item_ids": ["not-a-food"]}
+        )
+        assert response.status_code == 404
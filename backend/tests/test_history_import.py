@@ -0,0 +1,162 @@
+"""Tests for bulk history import."""
+
+import asyncio
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from app.core.database import Base
+from app.api.v1 import deps
+from app.services import history_import
+from app.core.config import settings
+from app.services.history_import import HistoryImportService, iter_json_records
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[deps.get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+CSV_LOG = """date,meal,food,quantity,unit,kcal,protein,carbs,fat
+2024-03-01T08:00:00,早餐,鸡蛋,2,个,156,12.6,1.2,10.6
+2024-03-01T08:00:00,早餐,牛奶,250,ml,105,8.5,12.5,8
+2024-03-01T12:30:00,午餐,米饭,150,g,174,3.9,38.9,0.5
+2024-03-01T12:30:00,午餐,神秘酱料,1,勺,,,,
+"""
+
+
+class TestJsonParsing:
+    """Test streaming JSON record parsing."""
+    
+    def test_array_and_ndjson_across_chunks(self, monkeypatch):
+        """Test records split across read boundaries are decoded."""
+        monkeypatch.setattr(history_import, "READ_CHUNK_SIZE", 7)
+        records = [{"name": "苹果", "calories": 95}, {"name": "Toast", "calories": 80}]
+        
+        array = io.BytesIO(json.dumps(records, ensure_ascii=False).encode("utf-8"))
+        ndjson = io.BytesIO("\n".join(json.dumps(r, ensure_ascii=False) for r in records).encode("utf-8"))
+        
+        assert list(iter_json_records(array)) == records
+        assert list(iter_json_records(ndjson)) == records
+
+
+class TestHistoryImport:
+    """Test history import endpoint."""
+    
+    def test_import_csv(self):
+        """Test CSV rows are grouped into meals and rows without nutrition skipped."""
+        response = client.post(
+            "/api/import",
+            files={"file": ("log.csv", CSV_LOG.encode("utf-8"), "text/csv")}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["done"] is True
+        assert data["rows_read"] == 4
+        assert data["meals_imported"] == 2
+        assert data["food_items_imported"] == 3
+        assert data["rows_skipped"] == 1
+        
+        history = client.get(f"/api/chat-history?session_id={data['session_id']}").json()
+        assert history["total"] == 4
+        assert history["messages"][0]["content"] == "早餐"
+        assert history["messages"][1]["nutrition_data"]["total_calories"] == 261
+    
+    def test_import_json_with_local_lookup(self):
+        """Test foods without nutrition are filled from stored foods."""
+        client.post(
+            "/api/import",
+            files={"file": ("log.csv", CSV_LOG.encode("utf-8"), "text/csv")}
+        )
+        records = [
+            {"timestamp": "2024-03-02T08:00:00Z", "food_items": [
+                {"name": "鸡蛋", "amount": "2"},
+                {"name": "Coffee", "calories": 5, "protein": 0.3, "carbs": 0, "fat": 0}
+            ]}
+        ]
+        
+        response = client.post(
+            "/api/import",
+            data={"missing_nutrition": "local"},
+            files={"file": ("log.json", json.dumps(records).encode("utf-8"), "application/json")}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["meals_imported"] == 1
+        assert data["food_items_imported"] == 2
+        assert data["rows_skipped"] == 0
+    
+    def test_parsing_and_inserts_run_off_the_event_loop(self, monkeypatch):
+        """Test the blocking parts of an import run in worker threads."""
+        calls = []
+        parse_food_item = history_import._parse_food_item
+        insert_batch = HistoryImportService._insert_batch
+        
+        def parse_spy(row):
+            calls.append(("parse", on_event_loop()))
+            return parse_food_item(row)
+        
+        def insert_spy(self, *args):
+            calls.append(("insert", on_event_loop()))
+            return insert_batch(self, *args)
+        
+        monkeypatch.setattr(history_import, "_parse_food_item", parse_spy)
+        monkeypatch.setattr(HistoryImportService, "_insert_batch", insert_spy)
+        monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 1)
+        
+        response = client.post("/api/import", files={"file": ("log.csv", CSV_LOG.encode("utf-8"), "text/csv")})
+        
+        assert response.json()["meals_imported"] == 2
+        assert {kind for kind, _ in calls} == {"parse", "insert"}
+        assert not any(loop for _, loop in calls)
+    
+    def test_errors_report_the_failing_row(self, monkeypatch):
+        """Test skipped rows are reported by their own row number, not the batch's last."""
+        monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 5)
+        log = CSV_LOG.replace("2024-03-01T08:00:00,早餐,鸡蛋", "yesterday,早餐,鸡蛋")
+        log += "2024-03-01T19:00:00,晚餐,豆腐,1,块,80,8,2,4\n" * 3
+        
+        response = client.post("/api/import", files={"file": ("log.csv", log.encode("utf-8"), "text/csv")})
+        
+        data = response.json()
+        assert data["rows_read"] == 7
+        assert data["errors"] == ["row 1: invalid timestamp 'yesterday'", "row 4: missing nutrition"]
+    
+    def test_import_unsupported_format(self):
+        """Test uploading an unsupported file type."""
+        response = client.post(
+            "/api/import",
+            files={"file": ("log.xml", b"<log/>", "application/xml")}
+        )
+        
+        assert response.status_code == 400
@@ -0,0 +1,89 @@
+"""Tests for structured, queued logging."""
+
+import atexit
+import io
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.logging_config import (
+    ContextQueueHandler,
+    JSONFormatter,
+    SamplingFilter,
+    configure_logging,
+    request_id_var,
+    session_id_var,
+)
+
+client = TestClient(app)
+
+
+def make_record(message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormatting:
+    """Test record preparation and JSON output."""
+    
+    def test_prepare_captures_context(self):
+        """Test IDs are read from context when the record is queued."""
+        request_token = request_id_var.set("req-1")
+        session_token = session_id_var.set("session-1")
+        try:
+            record = ContextQueueHandler(None).prepare(make_record("Imported %d meals", 3))
+        finally:
+            request_id_var.reset(request_token)
+            session_id_var.reset(session_token)
+        
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry["message"] == "Imported 3 meals"
+        assert entry["request_id"] == "req-1"
+        assert entry["session_id"] == "session-1"
+        assert entry["level"] == "INFO"
+    
+    def test_extra_fields_are_included(self):
+        entry = json.loads(JSONFormatter().format(make_record("GET /health", status=200, duration_ms=1.5)))
+        assert entry["status"] == 200
+        assert entry["duration_ms"] == 1.5
+    
+    def test_sampling(self):
+        sampler = SamplingFilter()
+        assert sampler.filter(make_record("always"))
+        assert sampler.filter(make_record("kept", sample_rate=1.0))
+        assert not sampler.filter(make_record("dropped", sample_rate=0.0))
+
+
+class TestLoggingSetup:
+    """Test the queue-backed logging pipeline."""
+    
+    def test_writes_json_lines_from_listener(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        stream = io.StringIO()
+        try:
+            listener = configure_logging(level="INFO", json_format=True, stream=stream)
+            logging.getLogger("app.test").info("Saved %s", "meal", extra={"meal_count": 2})
+            logging.getLogger("app.test").debug("Hidden")
+            listener.stop()
+            atexit.unregister(listener.stop)
+        finally:
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            for handler in handlers:
+                root.addHandler(handler)
+            root.setLevel(level)
+        
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == ["Saved meal"]
+        assert lines[0]["meal_count"] == 2
+    
+    def test_request_id_header(self):
+        """Test requests get an ID and incoming IDs are reused."""
+        assert len(client.get("/health").headers["X-Request-ID"]) == 32
+        
+        response = client.get("/health", headers={"X-Request-ID": "trace-123"})
+        assert response.headers["X-Request-ID"] == "trace-123"
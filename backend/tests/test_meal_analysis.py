@@ -7,6 +7,8 @@ from sqlalchemy.orm import sessionmaker
 
 from main import app
 from app.core.database import Base, get_db
+from app.api.v1 import deps
+from app.services.ai_integration import AIIntegrationService
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -28,6 +30,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[deps.get_db] = override_get_db
 
 client = TestClient(app)
 
@@ -97,6 +100,23 @@ class TestMealAnalysis:
         assert response2.status_code == 200
         assert response2.json()["session_id"] == session_id
 
+    def test_failed_analysis_leaves_history_unchanged(self, monkeypatch):
+        """Test a failed analysis stores no message and keeps the ETag."""
+        session_id = client.post("/api/analyze-meal", json={"message": "Test meal"}).json()["session_id"]
+        url = f"/api/chat-history?session_id={session_id}"
+        before = client.get(url)
+        
+        async def fail(*args, **kwargs):
+            raise RuntimeError("provider unavailable")
+        
+        monkeypatch.setattr(AIIntegrationService, "analyze_meal", fail)
+        response = client.post("/api/analyze-meal", json={"message": "Another meal", "session_id": session_id})
+        assert response.status_code == 500
+        
+        after = client.get(url, headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 304
+        assert client.get(url).json()["total"] == before.json()["total"]
+
 
 class TestChatHistory:
     """Test chat history endpoints."""
@@ -132,6 +152,65 @@ class TestChatHistory:
         
         assert len(data["messages"]) > 0
         assert data["total"] > 0
+    
+    def test_get_chat_history_not_modified(self):
+        """Test conditional GET returns 304 until the session changes."""
+        meal_response = client.post(
+            "/api/analyze-meal",
+            json={
+                "message": "Test meal"
+            }
+        )
+        session_id = meal_response.json()["session_id"]
+        url = f"/api/chat-history?session_id={session_id}"
+        
+        response = client.get(url)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+        
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        
+        # A different page has a different tag
+        other_page = client.get(f"{url}&limit=10", headers={"If-None-Match": etag})
+        assert other_page.status_code == 200
+        
+        client.post(
+            "/api/analyze-meal",
+            json={
+                "message": "Another meal",
+                "session_id": session_id
+            }
+        )
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        
+        client.delete(f"/api/chat-history/{session_id}")
+        cleared = client.get(url, headers={"If-None-Match": changed.headers["etag"]})
+        assert cleared.status_code == 200
+        assert cleared.json()["total"] == 0
+    
+    def test_get_session_summary_not_modified(self):
+        """Test conditional GET on session summaries."""
+        meal_response = client.post(
+            "/api/analyze-meal",
+            json={
+                "message": "Test meal"
+            }
+        )
+        session_id = meal_response.json()["session_id"]
+        
+        response = client.get(f"/api/session-summary/{session_id}")
+        assert response.status_code == 200
+        assert response.json()["total_meals_analyzed"] == 1
+        
+        not_modified = client.get(
+            f"/api/session-summary/{session_id}",
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
 
 
 class TestHealth:
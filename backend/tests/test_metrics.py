@@ -0,0 +1,89 @@
+"""Tests for Prometheus metrics."""
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from app.core.database import Base
+from app.core.metrics import observe_ai_call
+from app.api.v1 import deps
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[deps.get_db] = override_get_db
+
+client = TestClient(app)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics scrape endpoint."""
+    
+    def test_exposes_text_format(self):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
+    
+    def test_labels_requests_by_route_template(self):
+        """Test paths with IDs are labelled by their route template."""
+        labels = {"method": "GET", "route": "/api/export/{session_id}", "status": "404"}
+        before = sample("http_requests_total", **labels)
+        
+        client.get("/api/export/missing-session-1")
+        client.get("/api/export/missing-session-2")
+        
+        assert sample("http_requests_total", **labels) == before + 2
+        assert sample("http_request_duration_seconds_count", **labels) >= 2
+        assert "missing-session" not in client.get("/metrics").text
+    
+    def test_counts_etag_revalidations(self):
+        """Test conditional GETs are reported as cache hits and misses."""
+        session_id = client.post("/api/analyze-meal", json={"message": "一个苹果"}).json()["session_id"]
+        etag = client.get(f"/api/chat-history?session_id={session_id}").headers["ETag"]
+        
+        hits = sample("cache_requests_total", cache="etag", result="hit")
+        misses = sample("cache_requests_total", cache="etag", result="miss")
+        client.get(f"/api/chat-history?session_id={session_id}", headers={"If-None-Match": etag})
+        client.get(f"/api/chat-history?session_id={session_id}", headers={"If-None-Match": 'W/"stale"'})
+        
+        assert sample("cache_requests_total", cache="etag", result="hit") == hits + 1
+        assert sample("cache_requests_total", cache="etag", result="miss") == misses + 1
+
+
+class TestAIMetrics:
+    """Test AI provider call instrumentation."""
+    
+    def test_records_latency_and_errors(self):
+        labels = {"provider": "test", "model": "fake-model"}
+        
+        with observe_ai_call("test", "fake-model"):
+            pass
+        with pytest.raises(TimeoutError):
+            with observe_ai_call("test", "fake-model"):
+                raise TimeoutError()
+        
+        assert sample("ai_request_duration_seconds_count", **labels) == 2
+        assert sample("ai_request_errors_total", error="TimeoutError", **labels) == 1
@@ -0,0 +1,121 @@
+"""Tests for per-request profiling and the admin profile endpoints."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware, profile_store
+
+TOKEN = "test-admin-token"
+
+
+def make_client(store: ProfileStore, max_per_hour: int = 20) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, token=TOKEN, max_per_hour=max_per_hour)
+
+    @app.get("/api/chat-history/{session_id}")
+    async def history(session_id: str):
+        await asyncio.sleep(0.01)
+        return {"session_id": session_id}
+
+    return TestClient(app)
+
+
+class TestProfilingMiddleware:
+    """Test opting requests into profiling."""
+    
+    def test_profiles_request_with_token(self, tmp_path):
+        """Test a request with the token stores a speedscope profile."""
+        store = ProfileStore(str(tmp_path))
+        response = make_client(store).get("/api/chat-history/abc", headers={"X-Profile": TOKEN})
+        
+        assert response.status_code == 200
+        name = response.headers["X-Profile-ID"]
+        assert name.endswith("-GET_api_chat_history_abc.speedscope.json")
+        profile = json.loads(store.path(name).read_text())
+        assert profile["$schema"].startswith("https://www.speedscope.app/")
+    
+    def test_query_flag_opts_in(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        response = make_client(store).get("/api/chat-history/abc", params={"profile": TOKEN})
+        assert "X-Profile-ID" in response.headers
+        assert len(store.list()) == 1
+    
+    def test_wrong_or_missing_token_is_not_profiled(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        client = make_client(store)
+        
+        assert "X-Profile-ID" not in client.get("/api/chat-history/abc").headers
+        response = client.get("/api/chat-history/abc", headers={"X-Profile": "guess"})
+        assert response.status_code == 200
+        assert "X-Profile-ID" not in response.headers
+        assert store.list() == []
+    
+    def test_global_budget_limits_profiles(self, tmp_path):
+        """Test requests beyond the hourly budget run unprofiled."""
+        store = ProfileStore(str(tmp_path))
+        client = make_client(store, max_per_hour=2)
+        
+        headers = {"X-Profile": TOKEN}
+        responses = [client.get("/api/chat-history/abc", headers=headers) for _ in range(3)]
+        
+        assert all(r.status_code == 200 for r in responses)
+        assert ["X-Profile-ID" in r.headers for r in responses] == [True, True, False]
+        assert len(store.list()) == 2
+
+
+class TestProfileStore:
+    """Test profile retention and lookup."""
+    
+    def test_keeps_newest_files(self, tmp_path):
+        store = ProfileStore(str(tmp_path), max_files=2)
+        for i in range(3):
+            store.save(f"p{i}.speedscope.json", "{}")
+        
+        assert sorted(p["name"] for p in store.list()) == ["p1.speedscope.json", "p2.speedscope.json"]
+    
+    def test_rejects_unsafe_names(self, tmp_path):
+        store = ProfileStore(str(tmp_path / "profiles"))
+        (tmp_path / "secret.speedscope.json").write_text("{}")
+        
+        assert store.path("../secret.speedscope.json") is None
+        assert store.path("main.py") is None
+
+
+class TestAdminEndpoints:
+    """Test listing and downloading profiles."""
+    
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+        monkeypatch.setattr(profile_store, "directory", tmp_path)
+        profile_store.save("20240115T123000-1a2b3c4d-GET_health.speedscope.json", '{"profiles": []}')
+        return TestClient(main.app)
+    
+    def test_lists_and_downloads_profiles(self, client):
+        headers = {"X-Admin-Token": TOKEN}
+        response = client.get("/api/admin/profiles", headers=headers)
+        assert response.status_code == 200
+        name = response.json()[0]["name"]
+        
+        response = client.get(f"/api/admin/profiles/{name}", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"profiles": []}
+        
+        response = client.get("/api/admin/profiles/missing.speedscope.json", headers=headers)
+        assert response.status_code == 404
+    
+    def test_requires_admin_token(self, client):
+        assert client.get("/api/admin/profiles").status_code == 403
+        response = client.get("/api/admin/profiles", headers={"X-Admin-Token": "guess"})
+        assert response.status_code == 403
+    
+    def test_hidden_without_admin_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        response = TestClient(main.app).get("/api/admin/profiles", headers={"X-Admin-Token": ""})
+        assert response.status_code == 404
@@ -0,0 +1,171 @@
+"""Tests for provider prompt caching of the static meal analysis prompt."""
+
+import asyncio
+import json
+import urllib.request
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.services import ai_integration
+from app.services.ai_integration import ANTHROPIC_CACHE_MIN_TOKENS, AnthropicClient, OpenAIClient
+from app.services.ai_prompts import PROMPT_PROFILES, estimate_tokens, prompt_manager
+from benchmarks.fake_provider import FakeProvider
+
+REQUESTS = [
+    ("I had 2 scrambled eggs and toast", "en", None),
+    ("午饭吃了一碗牛肉面", "zh", None),
+    ("晚饭吃了一碗牛肉面加一个煎蛋", "auto", {"language": "zh", "confidence": 0.55}),
+]
+
+# About 1600 tokens: over the 1024-token minimum, under Haiku's 2048
+LONG_PREFIX = "Reference portions: one bowl of cooked rice is about 150 g. " * 107
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Point both SDK clients at a local fake provider."""
+    with FakeProvider(latency=0, jitter=0) as fake:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", fake.url)
+        monkeypatch.setenv("OPENAI_BASE_URL", f"{fake.url}/v1")
+        monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+        ai_integration.get_anthropic_client.cache_clear()
+        ai_integration.get_openai_client.cache_clear()
+        yield fake
+    ai_integration.get_anthropic_client.cache_clear()
+    ai_integration.get_openai_client.cache_clear()
+
+
+@pytest.fixture
+def long_prefix(monkeypatch):
+    """Stand in a compact-profile prefix long enough to cache."""
+    monkeypatch.setattr(settings, "PROMPT_PROFILE", "compact")
+    monkeypatch.setitem(prompt_manager.meal_analysis_prefixes, "compact", LONG_PREFIX)
+    monkeypatch.setitem(prompt_manager.meal_analysis_prefix_tokens, "compact", estimate_tokens(LONG_PREFIX))
+
+
+def analyze_all(client) -> None:
+    async def run():
+        for description, language, transcript in REQUESTS:
+            result = await client.analyze_meal(description, language, transcript)
+            assert result["food_items"]
+    asyncio.run(run())
+
+
+def cached_tokens(provider_name: str, model: str) -> float:
+    return REGISTRY.get_sample_value(
+        "ai_tokens_total", {"provider": provider_name, "model": model, "kind": "cache_read"}
+    ) or 0
+
+
+class TestPromptCache:
+    """Test the static prompt is sent as an identical prefix, marked only when cacheable."""
+
+    def test_anthropic_system_prefix_is_byte_identical(self, provider):
+        analyze_all(AnthropicClient())
+
+        systems = {json.dumps(body["system"], ensure_ascii=False) for body in provider.requests}
+        assert len(systems) == 1
+        assert "用户输入：" not in provider.requests[0]["system"][0]["text"]
+
+        users = [body["messages"][0]["content"] for body in provider.requests]
+        assert users[0].endswith("用户输入：I had 2 scrambled eggs and toast")
+        assert "置信度：0.55" in users[2]
+
+    def test_default_prompt_and_model_are_not_cached(self, provider):
+        """Test the shipped configuration: caching is inactive, not silently ignored by the provider."""
+        client = AnthropicClient()
+        assert client.model == settings.MEAL_ANALYSIS_MODEL
+        assert prompt_manager.meal_analysis_prefix_tokens[settings.PROMPT_PROFILE] < client.cache_min_tokens
+        
+        analyze_all(client)
+        
+        system = provider.requests[0]["system"][0]
+        assert system["text"] == prompt_manager.meal_analysis_prefixes[settings.PROMPT_PROFILE]
+        assert all("cache_control" not in body["system"][0] for body in provider.requests)
+        assert all("cache_read_input_tokens" not in usage for usage in provider.usage)
+    
+    def test_current_profiles_are_too_short_to_cache(self, provider, monkeypatch):
+        monkeypatch.setattr(settings, "MEAL_ANALYSIS_MODEL", "claude-3-5-sonnet-20241022")
+        for profile in PROMPT_PROFILES:
+            assert prompt_manager.meal_analysis_prefix_tokens[profile] < ANTHROPIC_CACHE_MIN_TOKENS
+
+        analyze_all(AnthropicClient())
+
+        assert all("cache_control" not in body["system"][0] for body in provider.requests)
+        assert all("cache_read_input_tokens" not in usage for usage in provider.usage)
+
+    def test_long_prefix_is_marked_and_read_from_cache(self, provider, long_prefix, monkeypatch):
+        monkeypatch.setattr(settings, "MEAL_ANALYSIS_MODEL", "claude-3-5-sonnet-20241022")
+        client = AnthropicClient()
+        before = cached_tokens("anthropic", client.model)
+
+        analyze_all(client)
+
+        assert provider.requests[0]["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_creation_input_tokens" in provider.usage[0]
+        assert all(usage["cache_read_input_tokens"] > 0 for usage in provider.usage[1:])
+        assert cached_tokens("anthropic", client.model) == before + sum(
+            usage["cache_read_input_tokens"] for usage in provider.usage[1:]
+        )
+
+    def test_haiku_needs_a_longer_prefix(self, provider, long_prefix, monkeypatch):
+        monkeypatch.setattr(settings, "MEAL_ANALYSIS_MODEL", "claude-3-haiku-20240307")
+
+        analyze_all(AnthropicClient())
+
+        assert all("cache_control" not in body["system"][0] for body in provider.requests)
+
+    def test_cache_markers_can_be_disabled(self, provider, long_prefix, monkeypatch):
+        monkeypatch.setattr(settings, "MEAL_ANALYSIS_MODEL", "claude-3-5-sonnet-20241022")
+        monkeypatch.setattr(settings, "PROMPT_CACHE_ENABLED", False)
+
+        analyze_all(AnthropicClient())
+
+        assert all("cache_control" not in body["system"][0] for body in provider.requests)
+        assert all("cache_read_input_tokens" not in usage for usage in provider.usage)
+
+    def test_openai_caches_only_long_system_messages(self, provider, monkeypatch):
+        client = OpenAIClient()
+        before = cached_tokens("openai", client.model)
+
+        analyze_all(client)
+
+        systems = {body["messages"][0]["content"] for body in provider.requests}
+        assert len(systems) == 1
+        assert provider.requests[0]["messages"][0]["role"] == "system"
+        assert cached_tokens("openai", client.model) == before
+
+        monkeypatch.setattr(settings, "PROMPT_PROFILE", "compact")
+        monkeypatch.setitem(prompt_manager.meal_analysis_prefixes, "compact", LONG_PREFIX)
+        analyze_all(client)
+        assert cached_tokens("openai", client.model) > before
+
+
+class TestFakeProviderCache:
+    """Test the fake provider applies the providers' minimum cacheable length."""
+
+    def post(self, provider, system: str, model: str) -> dict:
+        body = {
+            "model": model,
+            "max_tokens": 100,
+            "system": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": "rice"}],
+        }
+        request = urllib.request.Request(
+            f"{provider.url}/v1/messages", json.dumps(body).encode(), {"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)["usage"]
+
+    def test_short_prefix_is_never_cached(self, provider):
+        usages = [self.post(provider, "You are a nutritionist.", "claude-3-5-sonnet-20241022") for _ in range(2)]
+        assert all("cache_read_input_tokens" not in usage for usage in usages)
+
+    def test_minimum_depends_on_model(self, provider):
+        sonnet = [self.post(provider, LONG_PREFIX, "claude-3-5-sonnet-20241022") for _ in range(2)]
+        haiku = [self.post(provider, LONG_PREFIX, "claude-3-haiku-20240307") for _ in range(2)]
+        assert sonnet[1]["cache_read_input_tokens"] > 0
+        assert all("cache_read_input_tokens" not in usage for usage in haiku)
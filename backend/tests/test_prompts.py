@@ -0,0 +1,131 @@
+"""Tests for meal analysis prompt profiles, token budgeting and compact output."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.meal import FoodItemSchema
+from app.services import ai_integration
+from app.services.ai_integration import AnthropicClient
+from app.services.ai_prompts import PROMPT_PROFILES, estimate_tokens, expand_meal_analysis, prompt_manager
+from benchmarks.fake_provider import FakeProvider
+
+CONTEXT = {
+    "user_goals": "减脂",
+    "dietary_restrictions": "乳糖不耐受",
+    "daily_intake": "1240"
+}
+
+
+class TestPromptProfiles:
+    """Test the full, compact and minimal meal analysis prompts."""
+
+    def test_smaller_profiles_use_fewer_tokens(self):
+        sizes = [
+            prompt_manager.build_meal_analysis_prompt("一碗牛肉面", "zh", CONTEXT, profile=profile).tokens
+            for profile in PROMPT_PROFILES
+        ]
+        assert sizes == sorted(sizes, reverse=True)
+        assert sizes[-1] < sizes[0] / 2
+
+    def test_every_profile_ends_with_the_request(self):
+        for profile in PROMPT_PROFILES:
+            prompt = prompt_manager.get_meal_analysis_prompt("一碗牛肉面", "en", CONTEXT, profile=profile)
+            assert prompt.startswith(prompt_manager.meal_analysis_prefixes[profile])
+            assert "Please respond in English" in prompt
+            assert "饮食限制：乳糖不耐受" in prompt
+            assert prompt.endswith("用户输入：一碗牛肉面")
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            prompt_manager.build_meal_analysis_prompt("a banana", "en", profile="tiny")
+
+    def test_estimate_counts_cjk_characters(self):
+        assert estimate_tokens("牛肉面") >= 3
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("牛肉面 beef noodles，加蛋") == estimate_tokens("牛肉面，加蛋") + estimate_tokens(" beef noodles")
+
+
+class TestTokenBudget:
+    """Test prompts are cut down to the token budget."""
+
+    def test_fits_without_trimming(self):
+        prompt = prompt_manager.build_meal_analysis_prompt("一碗牛肉面", "zh", CONTEXT, profile="compact")
+        assert prompt.dropped == ()
+        assert prompt.tokens <= 2000
+
+    def test_exact_budget_keeps_everything(self):
+        full = prompt_manager.build_meal_analysis_prompt("I had a bowl of beef noodles", "en", CONTEXT, profile="compact")
+        
+        prompt = prompt_manager.build_meal_analysis_prompt(
+            "I had a bowl of beef noodles", "en", CONTEXT, profile="compact", token_budget=full.tokens
+        )
+        assert prompt == full
+    
+    def test_drops_optional_context_first(self):
+        full = prompt_manager.build_meal_analysis_prompt("一碗牛肉面", "zh", CONTEXT, profile="compact")
+        budget = full.tokens - 3
+
+        prompt = prompt_manager.build_meal_analysis_prompt(
+            "一碗牛肉面", "zh", CONTEXT, profile="compact", token_budget=budget
+        )
+        assert prompt.dropped == ("user_goals",)
+        assert prompt.tokens <= budget
+        assert "用户目标" not in prompt.text
+        assert "饮食限制：乳糖不耐受" in prompt.text
+
+    def test_shortens_input_as_a_last_resort(self):
+        base = prompt_manager.build_meal_analysis_prompt("", "zh", profile="minimal").tokens
+
+        prompt = prompt_manager.build_meal_analysis_prompt(
+            "牛肉面" * 500, "zh", CONTEXT, profile="minimal", token_budget=base + 50
+        )
+        assert prompt.dropped == ("user_goals", "daily_intake", "dietary_restrictions", "description")
+        assert base < prompt.tokens <= base + 50
+        assert "用户输入：牛肉面" in prompt.text
+
+
+class TestCompactOutput:
+    """Test short-key answers are expanded into food items."""
+
+    def test_expands_positional_items(self):
+        result = expand_meal_analysis({
+            "f": [["Rice", "米饭", "1", "碗", 232, 4.3, 51, 0.4, 0.6], ["Egg", None, "1", "个", 90, 6.3, 0.4, 6.8]],
+            "n": "份量按一碗估算",
+            "r": "不错！"
+        })
+        assert result["ai_response"] == "不错！"
+        assert result["analysis_notes"] == "份量按一碗估算"
+        rice, egg = [FoodItemSchema.model_validate(item) for item in result["food_items"]]
+        assert rice.calories == 232 and rice.fiber == 0.6 and rice.sodium is None
+        assert egg.name_cn is None and egg.fat == 6.8
+
+    def test_verbose_answers_are_unchanged(self):
+        answer = {"food_items": [{"name": "Rice", "calories": 232}], "ai_response": "ok"}
+        assert expand_meal_analysis(answer) is answer
+
+    def test_output_limit_follows_profile(self, monkeypatch):
+        monkeypatch.setitem(settings.MAX_TOKENS_BY_PROFILE, "minimal", 321)
+        assert prompt_manager.build_meal_analysis_prompt("rice", "en", profile="minimal").max_tokens == 321
+        monkeypatch.delitem(settings.MAX_TOKENS_BY_PROFILE, "full")
+        assert prompt_manager.build_meal_analysis_prompt("rice", "en", profile="full").max_tokens == settings.MAX_TOKENS
+
+    def test_provider_answer_is_expanded(self, monkeypatch):
+        answer = {"f": [["Beef noodles", "牛肉面", "1", "bowl", 550, 28, 70, 16]], "r": "A bowl of beef noodles."}
+        with FakeProvider(latency=0, jitter=0, analysis=answer) as provider:
+            monkeypatch.setenv("ANTHROPIC_BASE_URL", provider.url)
+            monkeypatch.setattr(settings, "ANTHROPIC_API_KEY", "test-key")
+            monkeypatch.setattr(settings, "PROMPT_PROFILE", "compact")
+            ai_integration.get_anthropic_client.cache_clear()
+            try:
+                result = asyncio.run(AnthropicClient().analyze_meal("一碗牛肉面", "zh"))
+            finally:
+                ai_integration.get_anthropic_client.cache_clear()
+
+        assert provider.requests[0]["max_tokens"] == settings.MAX_TOKENS_BY_PROFILE["compact"]
+        assert result["ai_response"] == "A bowl of beef noodles."
+        assert result["food_items"] == [{
+            "name": "Beef noodles", "name_cn": "牛肉面", "amount": "1", "unit": "bowl",
+            "calories": 550, "protein": 28, "carbs": 70, "fat": 16
+        }]
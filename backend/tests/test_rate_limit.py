@@ -0,0 +1,190 @@
+"""Tests for rate limiting middleware."""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.rate_limit import InMemoryBackend, RateLimitMiddleware
+
+app = FastAPI()
+app.add_middleware(
+    RateLimitMiddleware,
+    default_per_minute=5,
+    routes={"/api/analyze-meal": 2, "/health": 0},
+    trust_forwarded=True,
+    max_sockets_per_client=2
+)
+
+
+@app.post("/api/analyze-meal")
+async def analyze():
+    return {"ok": True}
+
+
+@app.get("/api/chat-history")
+async def history():
+    return {"ok": True}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "healthy"}
+
+
+@app.websocket("/ws/echo")
+async def echo(websocket: WebSocket):
+    """Charge the route named by each frame and report the decision."""
+    await websocket.accept()
+    try:
+        while True:
+            allowed, retry_after = await websocket.state.rate_limit(await websocket.receive_text(), "socket-session")
+            await websocket.send_json({"allowed": allowed, "retry_after": retry_after})
+    except WebSocketDisconnect:
+        pass
+
+
+client = TestClient(app)
+
+
+def from_ip(ip: str) -> dict:
+    return {"X-Forwarded-For": ip}
+
+
+class TestRateLimitMiddleware:
+    """Test request limiting and headers."""
+    
+    def test_limits_ai_route_per_ip(self):
+        """Test the strict AI route limit returns 429 with Retry-After."""
+        headers = from_ip("10.0.0.1")
+        assert client.post("/api/analyze-meal", headers=headers).status_code == 200
+        response = client.post("/api/analyze-meal", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == "2"
+        assert response.headers["RateLimit-Remaining"] == "0"
+        
+        response = client.post("/api/analyze-meal", headers=headers)
+        assert response.status_code == 429
+        assert response.json()["error"] == "rate_limited"
+        assert int(response.headers["Retry-After"]) >= 1
+    
+    def test_route_groups_have_separate_buckets(self):
+        """Test exhausting the AI route leaves other routes available."""
+        headers = from_ip("10.0.0.2")
+        for _ in range(2):
+            client.post("/api/analyze-meal", headers=headers)
+        assert client.post("/api/analyze-meal", headers=headers).status_code == 429
+        
+        response = client.get("/api/chat-history", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == "5"
+    
+    def test_unlimited_route(self):
+        """Test a zero limit disables limiting."""
+        for _ in range(20):
+            response = client.get("/health", headers=from_ip("10.0.0.3"))
+            assert response.status_code == 200
+        assert "RateLimit-Limit" not in response.headers
+    
+    def test_session_bucket_spans_addresses(self):
+        """Test one session is limited even across client addresses."""
+        for index in range(2):
+            headers = {**from_ip(f"10.1.0.{index}"), "X-Session-ID": "session-a"}
+            assert client.post("/api/analyze-meal", headers=headers).status_code == 200
+        
+        headers = {**from_ip("10.1.0.9"), "X-Session-ID": "session-a"}
+        assert client.post("/api/analyze-meal", headers=headers).status_code == 429
+        
+        headers = {**from_ip("10.1.0.9"), "X-Session-ID": "session-b"}
+        assert client.post("/api/analyze-meal", headers=headers).status_code == 200
+
+
+class TestSocketLimits:
+    """Test WebSockets share route buckets and are capped per client."""
+    
+    def test_frames_charge_the_route_bucket(self):
+        headers = from_ip("10.2.0.1")
+        with client.websocket_connect("/ws/echo", headers=headers) as websocket:
+            for _ in range(2):
+                websocket.send_text("/api/analyze-meal")
+                assert websocket.receive_json()["allowed"]
+            websocket.send_text("/api/analyze-meal")
+            denied = websocket.receive_json()
+            assert not denied["allowed"]
+            assert denied["retry_after"] > 0
+            
+            websocket.send_text("/health")
+            assert websocket.receive_json()["allowed"]
+        
+        # The socket spent the same bucket an HTTP request would use
+        assert client.post("/api/analyze-meal", headers=headers).status_code == 429
+    
+    def test_caps_open_sockets_per_client(self):
+        headers = from_ip("10.2.0.2")
+        with client.websocket_connect("/ws/echo", headers=headers), \
+                client.websocket_connect("/ws/echo", headers=headers):
+            with pytest.raises(WebSocketDisconnect) as rejected:
+                with client.websocket_connect("/ws/echo", headers=headers):
+                    pass
+            assert rejected.value.code == 1008
+            
+            with client.websocket_connect("/ws/echo", headers=from_ip("10.2.0.3")) as other:
+                other.send_text("/health")
+                assert other.receive_json()["allowed"]
+        
+        with client.websocket_connect("/ws/echo", headers=headers) as websocket:
+            websocket.send_text("/health")
+            assert websocket.receive_json()["allowed"]
+
+
+class TestInMemoryBackend:
+    """Test the sharded token bucket store."""
+    
+    def test_refills_lazily(self):
+        backend = InMemoryBackend(shards=1)
+        assert asyncio.run(backend.acquire("key", 1, 1.0))[0]
+        allowed, _, retry_after = asyncio.run(backend.acquire("key", 1, 1.0))
+        assert not allowed
+        assert 0 < retry_after <= 1.0
+        
+        # Pretend the bucket was last touched a second ago
+        backend.shards[0]["key"][1] -= 1.0
+        assert asyncio.run(backend.acquire("key", 1, 1.0))[0]
+    
+    def test_evicts_full_buckets(self):
+        backend = InMemoryBackend(shards=1, max_buckets_per_shard=2)
+        asyncio.run(backend.acquire("a", 1, 1.0))
+        asyncio.run(backend.acquire("b", 1, 1.0))
+        backend.shards[0]["a"][1] -= 5.0
+        
+        asyncio.run(backend.acquire("c", 1, 1.0))
+        assert set(backend.shards[0]) == {"b", "c"}
+
+
+def test_app_rejections_carry_cors_headers(tmp_path):
+    """Test a browser can read the 429 from the real app: CORS wraps rate limiting."""
+    script = """
+import json
+from fastapi.testclient import TestClient
+import main
+client = TestClient(main.app)
+headers = {"Origin": "http://localhost:3000"}
+responses = [client.get("/api/no-such-route", headers=headers) for _ in range(2)]
+print(json.dumps([[r.status_code, r.headers.get("access-control-allow-origin")] for r in responses]))
+"""
+    env = {
+        **os.environ,
+        "RATE_LIMIT_ENABLED": "true",
+        "MAX_REQUESTS_PER_MINUTE": "1",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'cors.db'}",
+    }
+    output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    first, second = json.loads(output.stdout.strip().splitlines()[-1])
+    assert first == [404, "http://localhost:3000"]
+    assert second == [429, "http://localhost:3000"]
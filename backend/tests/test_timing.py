@@ -0,0 +1,81 @@
+"""Tests for Server-Timing request phases."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app as main_app
+from app.core.database import Base
+from app.core.timing import ServerTimingMiddleware, instrument_engine, timed
+from app.api.v1 import deps
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+instrument_engine(engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+main_app.dependency_overrides[deps.get_db] = override_get_db
+
+app = FastAPI()
+app.add_middleware(ServerTimingMiddleware, access_log=False)
+
+
+@app.get("/phases")
+async def phases():
+    with timed("prompt"):
+        pass
+    for _ in range(2):
+        with timed("ai"):
+            pass
+    return {"ok": True}
+
+
+def parse_server_timing(value: str) -> dict:
+    """Map metric names to their parameters."""
+    metrics = {}
+    for entry in value.split(","):
+        name, *params = entry.strip().split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestServerTiming:
+    """Test phase recording and the Server-Timing header."""
+    
+    def test_records_phases(self):
+        """Test phases are summed and counted per request."""
+        response = TestClient(app).get("/phases")
+        metrics = parse_server_timing(response.headers["Server-Timing"])
+        assert set(metrics) == {"prompt", "ai", "total"}
+        assert metrics["ai"]["desc"] == '"2x"'
+        assert float(metrics["total"]["dur"]) >= float(metrics["ai"]["dur"])
+    
+    def test_timed_is_noop_outside_request(self):
+        """Test timing outside a request records nothing."""
+        with timed("db") as phase:
+            pass
+        assert not hasattr(phase, "timings")
+    
+    def test_endpoint_reports_db_and_serialization(self):
+        """Test real endpoints report SQL and serialization time."""
+        client = TestClient(main_app)
+        response = client.post("/api/analyze-meal", json={"message": "一碗米饭"})
+        assert response.status_code == 200
+        
+        metrics = parse_server_timing(response.headers["Server-Timing"])
+        assert {"db", "serialize", "total"} <= set(metrics)
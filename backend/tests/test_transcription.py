@@ -0,0 +1,141 @@
+"""Tests for the transcription process pool."""
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from app.api.v1 import deps
+from app.core.config import settings
+from app.core.database import Base
+from app.services import voice
+from app.services.transcription import TranscriptionBusyError, TranscriptionPool
+from app.services.transcription_engines import MockEngine, load_engine_class
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+MP3 = b"ID3\x04\x00\x00\x00\x00\x00\x00" + bytes(1000)
+STUB = "tests.stub_engine:StubEngine"
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "clip.mp3"
+    path.write_bytes(MP3)
+    return str(path)
+
+
+def run_pool(pool: TranscriptionPool, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            pool.shutdown()
+    return asyncio.run(main())
+
+
+class TestTranscriptionPool:
+    """Test running engines in worker processes."""
+    
+    def test_engine_loads_once_per_worker(self, audio_file):
+        pool = TranscriptionPool(engine=STUB, workers=1)
+        
+        async def transcribe_twice():
+            await pool.warm()
+            return [await pool.transcribe(audio_file, "zh") for _ in range(2)]
+        
+        first, second = run_pool(pool, transcribe_twice())
+        assert first.text.startswith(f"{len(MP3)} bytes")
+        assert first.text.endswith("loaded 1x")
+        assert first.text == second.text
+        assert first.language == "zh"
+    
+    def test_rejects_when_queue_full(self, audio_file):
+        pool = TranscriptionPool(engine=STUB, model_path="0.3", workers=1, max_queue=1)
+        
+        async def burst():
+            return await asyncio.gather(
+                *(pool.transcribe(audio_file) for _ in range(3)),
+                return_exceptions=True
+            )
+        
+        results = run_pool(pool, burst())
+        assert sum(isinstance(r, TranscriptionBusyError) for r in results) == 1
+        assert sum(not isinstance(r, Exception) for r in results) == 2
+    
+    def test_reports_queue_wait_and_real_time_factor(self, audio_file):
+        labels = {"engine": STUB}
+        before = REGISTRY.get_sample_value("transcription_real_time_factor_count", labels) or 0
+        pool = TranscriptionPool(engine=STUB, workers=1)
+        
+        run_pool(pool, pool.transcribe(audio_file))
+        
+        assert REGISTRY.get_sample_value("transcription_real_time_factor_count", labels) == before + 1
+        assert REGISTRY.get_sample_value("transcription_queue_wait_seconds_count", labels) == before + 1
+    
+    def test_resolves_engine_names(self):
+        assert load_engine_class("mock") is MockEngine
+        with pytest.raises(ValueError):
+            load_engine_class("no-such-engine")
+    
+    def test_mock_engine_runs_without_workers(self, audio_file):
+        pool = TranscriptionPool(engine="mock", workers=2)
+        
+        async def warm_and_transcribe():
+            await pool.warm()
+            return await pool.transcribe(audio_file)
+        
+        response = run_pool(pool, warm_and_transcribe())
+        assert response.text
+        assert pool.in_process
+        assert pool._executor is None
+    
+    def test_worker_module_imports_only_the_engine(self):
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, app.services.transcription_engines; print(' '.join(sys.modules))"],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        for heavy in ("sqlalchemy", "pydantic", "prometheus_client", "app.core.metrics", "app.core.timing"):
+            assert heavy not in loaded
+
+
+def test_voice_endpoint_uses_pool(tmp_path, monkeypatch):
+    """Test uploads are transcribed by the configured pool and timed."""
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    # A cache hit from an earlier run would skip the pool
+    monkeypatch.setattr(settings, "TRANSCRIPTION_CACHE_ENABLED", False)
+    
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, deps.get_db, override_get_db)
+    pool = TranscriptionPool(engine=STUB, workers=1)
+    monkeypatch.setattr(voice, "transcription_pool", pool)
+    try:
+        response = client.post("/api/voice-to-text", files={"audio": ("meal.mp3", MP3, "audio/mpeg")})
+    finally:
+        pool.shutdown()
+    
+    assert response.status_code == 200
+    assert response.json()["text"].startswith(f"{len(MP3)} bytes")
+    assert "queue;dur=" in response.headers["Server-Timing"]
+    assert "transcribe;dur=" in response.headers["Server-Timing"]
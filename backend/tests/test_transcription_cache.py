@@ -0,0 +1,239 @@
+"""Tests for the transcription cache."""
+
+import asyncio
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from app.api.v1 import deps
+from app.core.config import settings
+from app.core.database import Base
+from app.models.transcription import CachedTranscription
+from app.schemas.voice import VoiceToTextResponse
+from app.services import voice
+from app.services.transcription_cache import TranscriptionCache, TranscriptionKey
+from app.services.voice import VoiceService
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+TOKEN = "test-admin-token"
+
+
+def clip() -> bytes:
+    """MP3-looking bytes unique to each test."""
+    return b"ID3\x04\x00\x00\x00\x00\x00\x00" + uuid.uuid4().bytes + bytes(4096)
+
+
+@pytest.fixture
+def fake_pool(tmp_path, monkeypatch):
+    """Stage into a temporary directory and count transcriptions."""
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    # Preprocessing time counts as compute time; keep it out of the totals
+    monkeypatch.setattr(settings, "AUDIO_PREPROCESSING_ENABLED", False)
+    calls = []
+    
+    async def run(path, language=None):
+        calls.append(path)
+        await asyncio.sleep(0.05)
+        return VoiceToTextResponse(
+            text=f"transcript {len(calls)}", confidence=0.9, language=language or "en", duration_seconds=3.0
+        ), 1.5
+    
+    monkeypatch.setattr(voice.transcription_pool, "run", run)
+    
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    monkeypatch.setitem(app.dependency_overrides, deps.get_db, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, deps.get_session_factory, lambda: TestingSessionLocal)
+    return calls
+
+
+def cache_hits() -> float:
+    return REGISTRY.get_sample_value(
+        "cache_requests_total", {"cache": "transcription", "result": "hit"}
+    ) or 0
+
+
+class TestTranscriptionCache:
+    """Test repeated uploads are not transcribed again."""
+    
+    def test_retried_upload_is_served_from_cache(self, fake_pool, tmp_path):
+        audio = clip()
+        hits = cache_hits()
+        
+        first = client.post("/api/voice-to-text", files={"audio": ("meal.mp3", audio, "audio/mpeg")})
+        second = client.post("/api/voice-to-text", files={"audio": ("retry.mp3", audio, "audio/mpeg")})
+        other = client.post("/api/voice-to-text", files={"audio": ("other.mp3", clip(), "audio/mpeg")})
+        
+        assert first.json() == second.json()
+        assert other.json()["text"] != first.json()["text"]
+        assert len(fake_pool) == 2
+        assert cache_hits() == hits + 1
+        assert "cache;dur=" in second.headers["Server-Timing"]
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_concurrent_identical_uploads_share_one_transcription(self, fake_pool, tmp_path):
+        audio = clip()
+        
+        async def run():
+            async def upload():
+                async def chunks():
+                    yield audio
+                db = TestingSessionLocal()
+                service = VoiceService(db, TestingSessionLocal)
+                staged = await service.stage_upload(chunks(), "meal.mp3")
+                try:
+                    return await service.transcribe_audio(staged)
+                finally:
+                    service.release(staged)
+                    db.close()
+            return await asyncio.gather(*(upload() for _ in range(3)))
+        
+        results = asyncio.run(run())
+        assert len(fake_pool) == 1
+        assert len({result.text for result in results}) == 1
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_transcript_is_stored_after_the_starting_request_goes_away(self, fake_pool):
+        audio = clip()
+        
+        async def run():
+            async def chunks():
+                yield audio
+            db = TestingSessionLocal()
+            service = VoiceService(db, TestingSessionLocal)
+            staged = await service.stage_upload(chunks(), "meal.mp3")
+            request = asyncio.create_task(service.transcribe_audio(staged))
+            await asyncio.sleep(0.01)
+            request.cancel()
+            db.close()
+            service.release(staged)
+            await asyncio.gather(*voice._in_flight.values())
+            return staged.content_hash
+        
+        content_hash = asyncio.run(run())
+        key = TranscriptionKey(
+            content_hash, voice.transcription_pool.engine, voice.transcription_pool.model_path or "", ""
+        )
+        with TestingSessionLocal() as db:
+            assert TranscriptionCache(db).get(key).text == "transcript 1"
+    
+    def test_requested_language_is_part_of_the_key(self, fake_pool):
+        async def run():
+            async def chunks():
+                yield audio
+            service = VoiceService(TestingSessionLocal(), TestingSessionLocal)
+            staged = await service.stage_upload(chunks(), "meal.mp3")
+            try:
+                return [await service.transcribe_audio(staged, language) for language in ("zh", None, "zh")]
+            finally:
+                service.release(staged)
+        
+        audio = clip()
+        zh, detected, zh_again = asyncio.run(run())
+        assert len(fake_pool) == 2
+        assert zh == zh_again
+        assert zh.language == "zh"
+    
+    def test_stats_report_hits_and_time_saved(self, fake_pool, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+        with TestingSessionLocal() as db:
+            before = TranscriptionCache(db).stats()
+        
+        audio = clip()
+        for _ in range(3):
+            client.post("/api/voice-to-text", files={"audio": ("meal.mp3", audio, "audio/mpeg")})
+        
+        response = client.get("/api/admin/transcription-cache", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["entries"] == before.entries + 1
+        assert stats["hits"] == before.hits + 2
+        assert stats["compute_seconds_saved"] == pytest.approx(before.compute_seconds_saved + 3.0)
+        assert 0 < stats["hit_rate"] <= 1
+    
+    def test_service_without_db_does_not_cache(self, fake_pool):
+        async def run():
+            async def chunks():
+                yield audio
+            service = VoiceService()
+            staged = await service.stage_upload(chunks(), "meal.mp3")
+            try:
+                return [await service.transcribe_audio(staged) for _ in range(2)]
+            finally:
+                service.release(staged)
+        
+        audio = clip()
+        asyncio.run(run())
+        assert len(fake_pool) == 2
+
+
+class TestPruning:
+    """Test old and excess transcripts are removed."""
+    
+    @pytest.fixture
+    def cache(self):
+        isolated = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=isolated)
+        with sessionmaker(bind=isolated)() as db:
+            yield TranscriptionCache(db)
+    
+    def add(self, cache, name, days_ago):
+        key = TranscriptionKey(name, "mock", "", "")
+        cache.put(key, VoiceToTextResponse(text=name, confidence=0.9, language="en"), 1.0)
+        entry = cache.db.get(CachedTranscription, key)
+        entry.last_used_at = datetime.utcnow() - timedelta(days=days_ago)
+        cache.db.commit()
+        return key
+    
+    def test_removes_entries_unused_for_too_long(self, cache):
+        old = self.add(cache, "old", days_ago=40)
+        recent = self.add(cache, "recent", days_ago=2)
+        
+        assert cache.prune(max_entries=100, max_age=timedelta(days=30)) == 1
+        assert cache.get(old) is None
+        assert cache.get(recent) is not None
+    
+    def test_keeps_the_most_recently_used_entries(self, cache):
+        keys = [self.add(cache, f"clip-{days}", days_ago=days) for days in (5, 1, 3, 2)]
+        
+        assert cache.prune(max_entries=2, max_age=timedelta(days=30)) == 2
+        assert [cache.get(key) is not None for key in keys] == [False, True, False, True]
+        assert cache.prune(max_entries=2, max_age=timedelta(days=30)) == 0
+
+
+def test_staged_file_is_named_by_content_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    audio = clip()
+    
+    async def run():
+        async def chunks():
+            yield audio
+        return await VoiceService().stage_upload(chunks(), "meal.mp3")
+    
+    staged = asyncio.run(run())
+    assert staged.content_hash == hashlib.sha256(audio).hexdigest()
+    assert (tmp_path / f"{staged.content_hash}.mp3").read_bytes() == audio
+    VoiceService().release(staged)
+    assert list(tmp_path.iterdir()) == []
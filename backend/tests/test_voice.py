@@ -0,0 +1,121 @@
+"""Tests for streaming audio uploads."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.config import settings
+from app.core.uploads import UploadTooLargeError
+from app.services.voice import VoiceService, sniff_audio_format
+
+client = TestClient(app)
+
+MP3 = b"ID3\x04\x00\x00\x00\x00\x00\x00" + bytes(4096)
+WAV = b"RIFF\x24\x00\x00\x00WAVEfmt " + bytes(64)
+BOUNDARY = "cal-ai-test-boundary"
+
+
+@pytest.fixture(autouse=True)
+def staging_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "MAX_AUDIO_SIZE_MB", 1)
+    return tmp_path
+
+
+def multipart_body(data: bytes, filename: str = "meal.mp3") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="audio"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class TestVoiceUpload:
+    """Test the /api/voice-to-text upload path."""
+    
+    def test_transcribes_and_cleans_up(self, staging_dir):
+        response = client.post("/api/voice-to-text", files={"audio": ("meal.mp3", MP3, "audio/mpeg")})
+        assert response.status_code == 200
+        assert response.json()["text"]
+        assert list(staging_dir.iterdir()) == []
+    
+    def test_rejects_by_magic_bytes_not_extension(self, staging_dir):
+        response = client.post("/api/voice-to-text", files={"audio": ("meal.mp3", b"not audio at all", "audio/mpeg")})
+        assert response.status_code == 400
+        assert response.json()["error"] == "invalid_input"
+        assert list(staging_dir.iterdir()) == []
+    
+    def test_rejects_declared_oversize_body(self):
+        body = multipart_body(MP3 + bytes(2 * 1024 * 1024))
+        response = client.post(
+            "/api/voice-to-text",
+            content=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        )
+        assert response.status_code == 413
+        assert response.json()["error"] == "file_too_large"
+    
+    def test_aborts_chunked_oversize_body(self, staging_dir):
+        """Test a body without Content-Length is cut off once it passes the limit."""
+        def chunks():
+            yield multipart_body(b"")[:-len(f"\r\n--{BOUNDARY}--\r\n")] + MP3
+            for _ in range(64):
+                yield bytes(64 * 1024)
+        
+        response = client.post(
+            "/api/voice-to-text",
+            content=chunks(),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        )
+        assert response.status_code == 413
+        assert list(staging_dir.iterdir()) == []
+    
+    def test_requires_multipart_audio_field(self):
+        response = client.post("/api/voice-to-text", files={"file": ("meal.mp3", MP3, "audio/mpeg")})
+        assert response.status_code == 400
+        response = client.post("/api/voice-to-text", content=MP3, headers={"Content-Type": "audio/mpeg"})
+        assert response.status_code == 400
+
+
+class TestStageUpload:
+    """Test staging audio streams."""
+    
+    def test_stops_reading_past_limit(self, staging_dir):
+        consumed = []
+        
+        async def chunks():
+            yield MP3
+            for i in range(100):
+                consumed.append(i)
+                yield bytes(256 * 1024)
+        
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(VoiceService().stage_upload(chunks(), "meal.mp3"))
+        assert len(consumed) == 4
+        assert list(staging_dir.iterdir()) == []
+    
+    def test_stages_small_chunks(self, staging_dir):
+        async def chunks():
+            for i in range(0, len(WAV), 5):
+                yield WAV[i:i + 5]
+        
+        staged = asyncio.run(VoiceService().stage_upload(chunks(), "note.m4a"))
+        assert staged.audio_format == "wav"
+        assert staged.path.suffix == ".wav"
+        assert staged.path.read_bytes() == WAV
+        assert staged.size_bytes == len(WAV)
+
+
+@pytest.mark.parametrize("head, expected", [
+    (MP3[:12], "mp3"),
+    (b"\xff\xfb\x90\x00" + bytes(8), "mp3"),
+    (WAV[:12], "wav"),
+    (b"\x00\x00\x00\x20ftypM4A ", "m4a"),
+    (b"\x1a\x45\xdf\xa3" + bytes(8), "webm"),
+    (b"OggS" + bytes(8), None),
+    (b"", None),
+])
+def test_sniff_audio_format(head, expected):
+    assert sniff_audio_format(head) == expected
@@ -0,0 +1,156 @@
+"""Tests for the one-shot voice-to-meal endpoint."""
+
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from app.api.v1 import deps
+from app.core.config import settings
+from app.core.database import Base
+from app.models.message import Message
+from app.schemas.voice import VoiceToTextResponse
+from app.services import voice
+from app.services.ai_integration import AIIntegrationService
+from app.services.ai_prompts import prompt_manager
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+AI_RESULT = {
+    "food_items": [{
+        "name": "Beef noodles", "name_cn": "牛肉面", "amount": "1", "unit": "bowl",
+        "calories": 550, "protein": 28, "carbs": 70, "fat": 16
+    }],
+    "analysis_notes": "Hearty.",
+    "ai_response": "A bowl of beef noodles."
+}
+
+
+def clip() -> bytes:
+    """MP3-looking bytes unique to each test."""
+    return b"ID3\x04\x00\x00\x00\x00\x00\x00" + uuid.uuid4().bytes + bytes(4096)
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """Fake transcription and AI provider, recording what the AI was given."""
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    state = {"transcript": VoiceToTextResponse(
+        text="晚饭吃了一碗牛肉面", confidence=0.62, language="zh", duration_seconds=2.5
+    ), "calls": []}
+
+    async def run(path, language=None):
+        return state["transcript"], 1.0
+
+    async def analyze_meal(self, description, language="auto", session_id=None, transcript=None):
+        state["calls"].append({"description": description, "language": language, "transcript": transcript})
+        if state.get("fail"):
+            raise RuntimeError("provider down")
+        return AI_RESULT
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(voice.transcription_pool, "run", run)
+    monkeypatch.setattr(AIIntegrationService, "analyze_meal", analyze_meal)
+    monkeypatch.setitem(app.dependency_overrides, deps.get_db, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, deps.get_session_factory, lambda: TestingSessionLocal)
+    return state
+
+
+def post_meal(**params):
+    response = client.post("/api/voice-meal", params=params, files={"audio": ("meal.mp3", clip(), "audio/mpeg")})
+    lines = [json.loads(line) for line in response.text.splitlines()] if response.status_code == 200 else []
+    return response, lines
+
+
+class TestVoiceMeal:
+    """Test transcription and analysis in a single request."""
+
+    def test_streams_transcript_then_result(self, pipeline, tmp_path):
+        response, lines = post_meal()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [line["type"] for line in lines] == ["transcript", "result"]
+        assert lines[0]["data"]["text"] == "晚饭吃了一碗牛肉面"
+        assert lines[1]["data"]["nutrition"]["total_calories"] == 550
+        assert list(tmp_path.iterdir()) == []
+
+        session_id = lines[1]["data"]["session_id"]
+        _, again = post_meal(session_id=session_id)
+        assert again[1]["data"]["session_id"] == session_id
+        with TestingSessionLocal() as db:
+            contents = [m.content for m in db.query(Message).filter(Message.session_id == session_id)]
+        assert contents.count("晚饭吃了一碗牛肉面") == 2
+
+    def test_transcript_language_and_confidence_reach_the_ai(self, pipeline):
+        post_meal(language="en")
+
+        call = pipeline["calls"][-1]
+        assert call["description"] == "晚饭吃了一碗牛肉面"
+        assert call["language"] == "en"
+        assert call["transcript"] == {"language": "zh", "confidence": 0.62}
+
+    def test_analysis_failure_follows_the_transcript(self, pipeline):
+        pipeline["fail"] = True
+        response, lines = post_meal()
+
+        assert response.status_code == 200
+        assert [line["type"] for line in lines] == ["transcript", "error"]
+        assert lines[1]["code"] == "analysis_failed"
+
+    def test_no_speech_is_not_analyzed(self, pipeline):
+        pipeline["transcript"] = VoiceToTextResponse(text="  ", confidence=0.1, language="en")
+        response, _ = post_meal()
+
+        assert response.status_code == 422
+        assert response.json()["error"] == "no_speech"
+        assert pipeline["calls"] == []
+
+    def test_invalid_audio_gets_upload_error(self, pipeline):
+        response = client.post("/api/voice-meal", files={"audio": ("meal.mp3", b"not audio", "audio/mpeg")})
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "invalid_input"
+        assert pipeline["calls"] == []
+
+
+class TestTranscriptPrompt:
+    """Test how spoken input is described to the model."""
+
+    def test_low_confidence_asks_for_misheard_words(self):
+        prompt = prompt_manager.get_meal_analysis_prompt(
+            "牛肉面", "auto", transcript={"language": "zh", "confidence": 0.62}
+        )
+        assert "置信度：0.62" in prompt
+        assert "转写可能有误" in prompt
+        # The detected language picks the reply language
+        assert "请用中文回复" in prompt
+
+    def test_confident_transcript_keeps_requested_language(self):
+        prompt = prompt_manager.get_meal_analysis_prompt(
+            "beef noodles", "en", transcript={"language": "zh", "confidence": 0.95}
+        )
+        assert "Please respond in English" in prompt
+        assert "转写可能有误" not in prompt
+
+    def test_typed_input_has_no_transcript_note(self):
+        assert "语音转写" not in prompt_manager.get_meal_analysis_prompt("beef noodles", "en")
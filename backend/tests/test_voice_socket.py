@@ -0,0 +1,214 @@
+"""Tests for streaming transcription over the voice WebSocket."""
+
+import asyncio
+import time
+import wave
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from main import app
+from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware
+from app.schemas.voice import VoiceToTextResponse
+from app.services.transcription import transcription_pool
+from app.services.voice_stream import StreamingTranscriber, join_texts
+
+client = TestClient(app)
+
+
+def pcm(seconds: float, rate: int = 16000, level_db: float = -12.0) -> bytes:
+    """16-bit mono PCM: a tone, or silence when ``level_db`` is None."""
+    t = np.arange(int(seconds * rate)) / rate
+    if level_db is None:
+        samples = np.zeros_like(t)
+    else:
+        samples = 10 ** (level_db / 20) * np.sqrt(2) * np.sin(2 * np.pi * 300 * t)
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+def chunks(data: bytes, size: int = 3200):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+async def fake_transcribe(path: str, language=None) -> VoiceToTextResponse:
+    """Report the duration of the segment it was given, after a short delay."""
+    with wave.open(path, "rb") as reader:
+        seconds = reader.getnframes() / reader.getframerate()
+        assert reader.getframerate() == 16000
+    await asyncio.sleep(0.01)
+    return VoiceToTextResponse(
+        text=f"<{seconds:.1f}s>", confidence=0.9, language=language or "en", duration_seconds=seconds
+    )
+
+
+@pytest.fixture
+def staging_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_STAGING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "VOICE_WS_PARTIAL_INTERVAL_MS", 50)
+    monkeypatch.setattr(transcription_pool, "transcribe", fake_transcribe)
+    return tmp_path
+
+
+class TestStreamingTranscriber:
+    """Test segmentation and incremental transcription."""
+    
+    def test_segments_on_pauses_and_ends_on_silence(self, tmp_path):
+        async def run():
+            stream = StreamingTranscriber(fake_transcribe, tmp_path, 48000)
+            audio = pcm(1.0, 48000) + pcm(0.5, 48000, None) + pcm(1.5, 48000) + pcm(1.0, 48000, None)
+            ended = []
+            for chunk in chunks(audio, 1920):
+                ended.extend(stream.feed(chunk))
+            
+            assert len(ended) == 1
+            utterance = ended[0]
+            assert len(utterance.segments) == 2
+            return await utterance.result()
+        
+        result = asyncio.run(run())
+        # Segments keep up to 200ms before and 300ms after speech
+        assert result.text == "<1.3s> <2.0s>"
+        assert result.duration_seconds == pytest.approx(3.3, abs=0.1)
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_earlier_segments_finish_while_speaking(self, tmp_path):
+        async def run():
+            stream = StreamingTranscriber(fake_transcribe, tmp_path, 16000)
+            stream.feed(pcm(1.0) + pcm(0.4, level_db=None))
+            await asyncio.sleep(0.1)
+            stream.feed(pcm(0.5))
+            
+            assert [r.text for r in stream.utterance.committed()] == ["<1.3s>"]
+            partial = await stream.partial()
+            utterance = stream.end_utterance()
+            return partial, utterance.index, stream.utterance.index
+        
+        partial, index, next_index = asyncio.run(run())
+        assert partial.startswith("<1.3s> <")
+        assert (index, next_index) == (0, 1)
+    
+    def test_partial_skips_unchanged_audio(self, tmp_path):
+        async def run():
+            stream = StreamingTranscriber(fake_transcribe, tmp_path, 16000)
+            assert await stream.partial() is None
+            stream.feed(pcm(0.5))
+            first = await stream.partial()
+            return first, await stream.partial()
+        
+        first, second = asyncio.run(run())
+        assert first == "<0.5s>"
+        assert second is None
+    
+    def test_partial_transcribes_a_capped_window_of_the_open_segment(self, tmp_path):
+        async def run():
+            stream = StreamingTranscriber(fake_transcribe, tmp_path, 16000, partial_max_seconds=1.0)
+            stream.feed(pcm(0.5))
+            first = await stream.partial()
+            stream.feed(pcm(0.4))
+            second = await stream.partial()
+            stream.feed(pcm(0.4))
+            return first, second, await stream.partial()
+        
+        assert asyncio.run(run()) == ("<0.5s>", "<0.9s>", "<1.0s>")
+    
+    def test_silence_only_is_not_an_utterance(self, tmp_path):
+        async def run():
+            stream = StreamingTranscriber(fake_transcribe, tmp_path, 16000)
+            return stream.feed(pcm(2.0, level_db=None)), stream.end_utterance()
+        
+        assert asyncio.run(run()) == ([], None)
+    
+    def test_join_texts(self):
+        assert join_texts(["I had", " eggs "], "en") == "I had eggs"
+        assert join_texts(["我吃了", "两个鸡蛋"], "zh") == "我吃了两个鸡蛋"
+
+
+class TestVoiceSocket:
+    """Test the /ws/voice endpoint."""
+    
+    def test_partials_then_final_on_silence(self, staging_dir):
+        with client.websocket_connect("/ws/voice?sample_rate=16000&language=en") as websocket:
+            assert websocket.receive_json() == {"type": "ready", "sample_rate": 16000, "language": "en"}
+            for chunk in chunks(pcm(1.0)):
+                websocket.send_bytes(chunk)
+            time.sleep(0.2)
+            for chunk in chunks(pcm(1.0, level_db=None)):
+                websocket.send_bytes(chunk)
+            
+            frames = []
+            while not frames or frames[-1]["type"] != "final":
+                frames.append(websocket.receive_json())
+        
+        partials = [frame for frame in frames if frame["type"] == "partial"]
+        assert partials and all(frame["utterance"] == 0 for frame in partials)
+        final = frames[-1]
+        assert final["utterance"] == 0
+        assert final["data"]["text"] == "<1.3s>"
+        assert final["data"]["language"] == "en"
+        assert list(staging_dir.iterdir()) == []
+    
+    def test_end_frame_finalizes_immediately(self, staging_dir):
+        with client.websocket_connect("/ws/voice?sample_rate=8000") as websocket:
+            websocket.receive_json()
+            websocket.send_bytes(pcm(0.6, 8000))
+            websocket.send_json({"type": "end"})
+            
+            frame = websocket.receive_json()
+            while frame["type"] != "final":
+                frame = websocket.receive_json()
+            assert frame["data"]["text"] == "<0.6s>"
+            
+            websocket.send_bytes(pcm(0.5, 8000))
+            websocket.send_json({"type": "end"})
+            frame = websocket.receive_json()
+            while frame["type"] != "final":
+                frame = websocket.receive_json()
+            assert frame["utterance"] == 1
+    
+    def test_utterances_share_the_voice_rate_limit(self, staging_dir, monkeypatch):
+        """Test each utterance, and each further segment length of audio, is charged."""
+        monkeypatch.setattr(settings, "VOICE_WS_MAX_SEGMENT_SECONDS", 1.0)
+        limited = TestClient(RateLimitMiddleware(app, routes={"/api/voice-to-text": 2}))
+        
+        with limited.websocket_connect("/ws/voice?sample_rate=8000") as websocket:
+            websocket.receive_json()
+            websocket.send_bytes(pcm(0.6, 8000))
+            websocket.send_json({"type": "end"})
+            frame = websocket.receive_json()
+            while frame["type"] != "final":
+                frame = websocket.receive_json()
+            
+            # The second utterance is allowed to start but not to pass one second
+            for chunk in chunks(pcm(1.5, 8000), 1600):
+                websocket.send_bytes(chunk)
+            frame = websocket.receive_json()
+            while frame["type"] != "error":
+                assert frame["type"] == "partial"
+                frame = websocket.receive_json()
+            assert frame["utterance"] == 1
+            assert frame["code"] == "rate_limited"
+            assert frame["retry_after"] >= 1
+        
+        assert limited.post("/api/voice-to-text").status_code == 429
+    
+    def test_ping_and_invalid_frames(self, staging_dir, monkeypatch):
+        monkeypatch.setattr(settings, "VOICE_WS_MAX_FRAME_BYTES", 1024)
+        
+        with client.websocket_connect("/ws/voice") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "ping", "id": "p1"})
+            assert websocket.receive_json() == {"type": "pong", "id": "p1"}
+            
+            websocket.send_text("not json")
+            assert websocket.receive_json()["code"] == "invalid_frame"
+            
+            websocket.send_bytes(bytes(2048))
+            assert websocket.receive_json()["code"] == "frame_too_large"
+    
+    def test_rejects_unsupported_sample_rate(self, staging_dir):
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/ws/voice?sample_rate=1000") as websocket:
+                websocket.receive_json()